@@ -22,11 +22,54 @@ CREATE TABLE sensor (
 );
 
 -- data represents the sensor measurments
--- NOTE: SQLite does not have a DATETIME type.  We use TEXT instead.
+-- NOTE: SQLite does not have a DATETIME type.  We use either ISO8601 TEXT
+-- or INTEGER milliseconds since the epoch (see READINGS_EPOCH_UTC). The
+-- NUMERIC affinity stores both as they are given.
 CREATE TABLE readings (
   id          INTEGER PRIMARY KEY,  -- this column auto increments
   unit        TEXT NOT NULL, -- degC, degF, Kg, ....
   value       REAL NOT NULL, -- measured data
-  utc         TEXT NOT NULL, -- ISO8601 UTC timestamp: "YYYY-MM-DD HH:MM:SS.SSS"
+  utc         NUMERIC NOT NULL, -- ISO8601 UTC timestamp: "YYYY-MM-DD HH:MM:SS.SSS"
+                                -- or epoch milliseconds
   serial      TEXT NOT NULL REFERENCES sensor(serial)
-);
\ No newline at end of file
+);
+
+-- readings are always queried by serial within a utc range, sorted by utc.
+-- The index also covers unit and value so queries never touch the table.
+CREATE INDEX IF NOT EXISTS readings_serial_utc_idx
+  ON readings (serial, utc, unit, value);
+
+-- hourly and daily rollups of the readings, maintained when readings are
+-- added.  bucket is the start of the time bucket in epoch milliseconds.
+CREATE TABLE readings_1h (
+  serial      TEXT NOT NULL,
+  unit        TEXT NOT NULL,
+  bucket      INTEGER NOT NULL,
+  count       INTEGER NOT NULL, -- number of readings in the bucket
+  sum         REAL NOT NULL,    -- sum of the readings values
+  min         REAL NOT NULL,
+  max         REAL NOT NULL,
+  first_utc   INTEGER NOT NULL, -- epoch milliseconds of the first reading
+  first_value REAL NOT NULL,
+  last_utc    INTEGER NOT NULL, -- epoch milliseconds of the last reading
+  last_value  REAL NOT NULL,
+  PRIMARY KEY (serial, unit, bucket)
+);
+
+CREATE TABLE readings_1d (
+  serial      TEXT NOT NULL,
+  unit        TEXT NOT NULL,
+  bucket      INTEGER NOT NULL,
+  count       INTEGER NOT NULL,
+  sum         REAL NOT NULL,
+  min         REAL NOT NULL,
+  max         REAL NOT NULL,
+  first_utc   INTEGER NOT NULL,
+  first_value REAL NOT NULL,
+  last_utc    INTEGER NOT NULL,
+  last_value  REAL NOT NULL,
+  PRIMARY KEY (serial, unit, bucket)
+);
+
+-- schema version matching the last migration in rgapps.dao.sqlitemigrations
+PRAGMA user_version = 3;
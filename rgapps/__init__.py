@@ -4,6 +4,8 @@ This is the top root package for all the Rubens Gomes application code.
 
 Modules:
 -------
+appfactory: a module to create the Flask application
+sensorcollector: a module to poll the sensors concurrently
 
 
 Sub-Packages:
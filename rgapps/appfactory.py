@@ -0,0 +1,140 @@
+"""rgapps.appfactory module
+
+This module contains the Flask application factory.
+
+create_app() builds a fully wired Flask app: JSON provider, request
+logging, compression, routes (and their caches) and request functions.
+It can be called more than once per process (e.g., by tests): the request
+logging, compression and responses cache are configured per app, by the
+given settings.  The SensorDAO, its database connections and its sensor
+cache are shared by the process, and configured by get_settings().
+
+Multi-worker servers (gunicorn, uWSGI) import the app in a master process,
+and fork their workers from it.  The database pools and caches hold locks
+and connections which must not be shared across processes: post_fork()
+resets them in every worker.  create_app() registers it to run in the child
+of every fork; it can also be called by the server post-fork hook, e.g. in
+the gunicorn configuration file:
+
+    from rgapps.appfactory import post_fork
+"""
+import logging
+import os
+import sys
+import threading
+
+from flask import Flask
+
+from rgapps.config import get_settings
+from rgapps.http import compression, jsonprovider, requestlog
+from rgapps.http.flaskfunctions import register_functions
+from rgapps.http.routes import setup_routes
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+__all__ = ["create_app", "post_fork"]
+
+
+# True once post_fork is registered to run after every fork
+_fork_hook_registered = False
+_fork_hook_lock = threading.Lock()
+
+
+def create_app(settings=None):
+    """ Creates and wires a Flask application.
+
+    Parameters
+    ----------
+    settings: Settings (optional)
+        the application settings.  Defaults to get_settings().
+
+    Returns
+    -------
+    Flask:
+        the Flask application.
+    """
+    global _fork_hook_registered
+
+    settings = settings or get_settings()
+
+    logging.info("creating Flask app ...")
+    app = Flask("rgapps",
+                instance_path=settings.flask.instance_path,
+                instance_relative_config=True)
+
+    app.config.update(DEBUG=settings.flask.debug,
+                      TESTING=settings.flask.testing,
+                      JSON_SORT_KEYS=settings.flask.json_sort_keys,
+                      MAX_CONTENT_LENGTH=settings.flask.max_content_length)
+
+    # compact JSON bodies serialized by the fastest JSON library
+    jsonprovider.init_app(app, settings.flask.json_sort_keys)
+
+    # an access log line per request; registered first so that it logs
+    # the response as sent (e.g., compressed)
+    requestlog.init_app(app, settings)
+
+    # gzip (or brotli) compressed response bodies
+    compression.init_app(app, settings)
+
+    with app.app_context():
+        logging.info("Configuring the Flask HTTP routing.")
+        setup_routes(settings)
+
+    logging.info("Setting up the Flask functions.")
+    register_functions(app, settings)
+
+    # the MongoDB server is probed once, at start up, rather than by the
+    # requests; an unreachable or unsupported server is logged
+    if settings.mongodb.mongo_db_enable:
+        from rgapps.dao.mongodb import MongoDB
+        if MongoDB.is_alive():
+            MongoDB.check_server_version()
+
+    with _fork_hook_lock:
+        if not _fork_hook_registered and hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=post_fork)
+            _fork_hook_registered = True
+
+    return app
+
+
+def post_fork(*args):
+    """ Resets the per-process state in a child process, right after a
+    fork: the locks of the caches and database pools are replaced, and the
+    database clients inherited from the parent are dropped.  The arguments,
+    if any, are ignored, so that this function can be used as a server hook
+    (e.g., gunicorn post_fork(server, worker)).
+    """
+    from rgapps.dao.sqlitedb import SQLiteDB
+    from rgapps.http import cache
+
+    SQLiteDB.after_fork()
+
+    # only the modules already imported have any state to reset
+    mongodb = sys.modules.get("rgapps.dao.mongodb")
+    if mongodb is not None:
+        mongodb.MongoDB.after_fork()
+
+    sensordao = sys.modules.get("rgapps.dao.sensordao")
+    caches = list(cache.RESPONSE_CACHES) + list(compression.COMPRESSED_CACHES)
+    if sensordao is not None:
+        caches.append(sensordao.SensorDAO.SENSOR_CACHE)
+
+    for lru_cache in caches:
+        if lru_cache is not None:
+            lru_cache.after_fork()
+
+    logging.debug("per-process state reset in process [{0}]"
+                  .format(os.getpid()))
+    return
+
+
+if __name__ == '__main__':
+    pass
@@ -5,6 +5,7 @@ This package contains configuration related code.
 Modules:
 -------
 config: a module used to load / initialize the configuration file.
+settings: a module with the typed settings built from the configuration file
 
 Sub-Packages:
 ------------
@@ -24,7 +25,7 @@ __maintainer__ = "Rubens Gomes"
 __email__ = "rubens.s.gomes@gmail.com"
 __status__ = "Experimental"
 
-__all__ = ["ini_config"]
+__all__ = ["ini_config", "get_settings", "reload_settings"]
 
 
 def initialize_environment(ini_file_path, log_file_path=None):
@@ -116,6 +117,10 @@ if ini_file is None:
 from rgapps.utils.utility import is_blank
 initialize_environment(ini_file)
 
+# an invalid configuration file fails at start up
+from rgapps.config.settings import get_settings, reload_settings
+get_settings()
+
 
 if __name__ == '__main__':
     pass
@@ -0,0 +1,279 @@
+"""rgapps.config.settings module
+
+This module contains the typed application settings.
+
+The settings are built once from the INI configuration file, validated, and
+kept in an immutable Settings object whose attributes are the sections of
+the file, e.g.:
+
+    settings = get_settings()
+    if settings.sqlite.sqlite_db_enable:
+        path = settings.sqlite.sqlite_db
+
+The option names are lower-cased, and the values are converted to their
+types.  Missing options take their default value, if any.  reload_settings()
+re-reads the INI file, and is called on SIGHUP once install_sighup_handler()
+has been called.  Values read by the modules at start up (e.g., cache sizes)
+are only changed by a restart.
+
+The MQTT and SMS sections are not part of the settings: they are only read
+by the MQTT daemons and the tests, through ini_config.
+"""
+from collections import namedtuple
+import logging
+import signal
+import threading
+
+from six.moves import configparser
+
+from rgapps.config import ini_config, ini_file
+from rgapps.utils.exception import ConfigurationException
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+__all__ = ["Settings", "get_settings", "reload_settings",
+           "install_sighup_handler"]
+
+
+# marks the options without a default value
+REQUIRED = None
+
+LOG_LEVELS = ("CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG")
+
+# attribute -> (INI section, ((option, type, default, choices), ...))
+SCHEMA = (
+    ("flask", ("Flask", (
+        ("DEBUG", bool, False, None),
+        ("TESTING", bool, False, None),
+        ("JSON_SORT_KEYS", bool, False, None),
+        ("MAX_CONTENT_LENGTH", int, 1024, None),
+        ("INSTANCE_PATH", str, REQUIRED, None),
+        ("PORT", int, 8080, None),
+        ("HOST", str, "localhost", None)))),
+    ("logging", ("Logging", (
+        ("WORKING_DIR", str, REQUIRED, None),
+        ("LOG_FILE", str, REQUIRED, None),
+        ("LOG_FILE_MAX_BYTES", int, 1000000, None),
+        ("LOG_BACKUP_COUNT", int, 5, None),
+        ("LOG_LEVEL", str, "INFO", LOG_LEVELS),
+        ("LOG_RESPONSE_BODY", bool, False, None),
+        ("LOG_BODY_MAX_BYTES", int, 1024, None)))),
+    ("email", ("Email", (
+        ("GMAIL_ACCOUNT", str, REQUIRED, None),
+        ("GMAIL_PASSWORD", str, REQUIRED, None),
+        ("RECIPIENT_EMAIL", str, REQUIRED, None)))),
+    ("mongodb", ("MongoDB", (
+        ("MONGO_DB_ENABLE", bool, False, None),
+        ("MONGO_DB", str, "flaskapis", None),
+        ("MONGO_HOST", str, "localhost", None),
+        ("MONGO_PORT", int, 27017, None),
+        ("MONGO_MAX_POOL_SIZE", int, 50, None),
+        ("MONGO_MIN_POOL_SIZE", int, 0, None),
+        ("MONGO_SERVER_SELECTION_TIMEOUT_MS", int, 2000, None)))),
+    ("sqlite", ("SqlLite", (
+        ("SQLITE_DB_ENABLE", bool, False, None),
+        ("SQLITE_DB", str, REQUIRED, None),
+        ("SQLITE_JOURNAL_MODE", str, "WAL", None),
+        ("SQLITE_SYNCHRONOUS", str, "NORMAL", None),
+        ("SQLITE_CACHE_SIZE", int, -8000, None),
+        ("SQLITE_CACHED_STATEMENTS", int, 100, None),
+        ("SQLITE_AUTO_MIGRATE", bool, True, None)))),
+    ("dao", ("DAO", (
+        ("READINGS_BATCH_SIZE", int, 500, None),
+        ("READINGS_EPOCH_UTC", bool, False, None),
+        ("READINGS_AUTO_ROLLUP", bool, False, None),
+        ("READINGS_MAX_PAGE_SIZE", int, 5000, None),
+        ("SENSOR_CACHE_SIZE", int, 1024, None),
+        ("SENSOR_CACHE_TTL", int, 60, None)))),
+    ("rest", ("REST", (
+        ("RESTFUL_APIS", tuple, (), None),
+        ("RESPONSE_CACHE_SIZE", int, 512, None),
+        ("RESPONSE_CACHE_TTL", int, 300, None),
+        ("COMPRESSION_MIN_SIZE", int, 1024, None),
+        ("COMPRESSION_LEVEL", int, 6, tuple(range(1, 10)))))),
+    ("sensor", ("Sensor", (
+        ("SENSOR_REST_API_USERNAME", str, REQUIRED, None),
+        ("SENSOR_REST_API_PASSWORD", str, REQUIRED, None),
+        ("SENSOR_TEMPERATURE_URL", str, REQUIRED, None),
+        ("SENSOR_TEMPERATURE_SERIAL", str, REQUIRED, None),
+        ("SENSOR_PID_FILE", str, REQUIRED, None),
+        ("SENSOR_REQUEST_TIMEOUT", int, 60, None),
+        ("SENSOR_SLEEP_TIME", int, 900, None),
+        ("SENSOR_ENDPOINTS", str, "", None),
+        ("SENSOR_MAX_CONCURRENCY", int, 8, None),
+        ("SENSOR_JITTER", float, 0.1, None),
+        ("SENSOR_WRITE_BATCH_SIZE", int, 100, None),
+        ("SENSOR_WRITE_INTERVAL", int, 5, None)))),
+)
+
+
+def _section_type(attribute, options): #PRIVATE usage only!
+    """ Returns the namedtuple type of the settings of a section.
+    """
+    name = "{0}Settings".format(attribute.capitalize())
+    return namedtuple(name, [option[0].lower() for option in options])
+
+
+SECTION_TYPES = dict((attribute, _section_type(attribute, section[1]))
+                     for (attribute, section) in SCHEMA)
+
+Settings = namedtuple("Settings", [attribute for (attribute, _) in SCHEMA])
+
+# the current settings, and the lock serializing their reloads
+_settings = None
+_settings_lock = threading.RLock()
+
+
+def _value(parser, section, option, kind, default, choices): #PRIVATE usage only!
+    """ Returns the typed value of the given option.
+    """
+    if not parser.has_option(section, option):
+        if default is REQUIRED:
+            raise ConfigurationException("[{0}] {1} is required."
+                                         .format(section, option))
+        return default
+
+    try:
+        if kind is bool:
+            value = parser.getboolean(section, option)
+        elif kind is int:
+            value = parser.getint(section, option)
+        elif kind is float:
+            value = parser.getfloat(section, option)
+        elif kind is tuple:
+            value = tuple(item.strip().upper() for item
+                          in parser.get(section, option).split(",")
+                          if item.strip())
+        else:
+            value = parser.get(section, option)
+    except ValueError as err:
+        raise ConfigurationException("[{0}] {1} is not a valid {2}: {3}"
+                                     .format(section, option, kind.__name__,
+                                             err))
+
+    if kind is str and choices is not None:
+        value = value.strip().upper()
+
+    if choices is not None and value not in choices:
+        raise ConfigurationException("[{0}] {1} [{2}] must be one of {3}."
+                                     .format(section, option, value,
+                                             list(choices)))
+
+    return value
+
+
+def build_settings(parser):
+    """ Builds the settings from the given configuration parser.
+
+    Parameters
+    ----------
+    parser: ConfigParser (required)
+        the parser of the INI configuration file
+
+    Returns
+    -------
+    Settings:
+        the validated settings.
+
+    Raises
+    ------
+    ConfigurationException:
+        if a required option is missing, or an option is not valid.
+    """
+    sections = []
+
+    for (attribute, (section, options)) in SCHEMA:
+        values = [_value(parser, section, *option) for option in options]
+        sections.append(SECTION_TYPES[attribute](*values))
+
+    return Settings(*sections)
+
+
+def get_settings():
+    """ Returns the application settings.
+
+    Returns
+    -------
+    Settings:
+        the settings built from the INI configuration file.
+    """
+    global _settings
+
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = build_settings(ini_config)
+                logging.debug("application settings have been built.")
+
+    return _settings
+
+
+def reload_settings():
+    """ Re-reads the INI configuration file, and replaces the settings.  The
+    current settings are kept if the file is not valid.
+
+    Returns
+    -------
+    Settings:
+        the new settings.
+
+    Raises
+    ------
+    ConfigurationException:
+        if a required option is missing, or an option is not valid.
+    """
+    global _settings
+
+    with _settings_lock:
+        parser = configparser.SafeConfigParser()
+
+        if not parser.read(ini_file):
+            raise ConfigurationException("INI file [{0}] could not be read."
+                                         .format(ini_file))
+
+        settings = build_settings(parser)
+
+        # keep ini_config in sync for the options outside of the settings;
+        # its content is replaced, so that removed options do not survive
+        for section in ini_config.sections():
+            ini_config.remove_section(section)
+        ini_config.defaults().clear()
+        ini_config.read(ini_file)
+        _settings = settings
+
+    logging.info("application settings reloaded from [{0}]".format(ini_file))
+
+    return settings
+
+
+def handle_sighup(signum, frame):
+    """ Signal handler reloading the settings.  Errors are logged, and the
+    current settings kept.
+    """
+    try:
+        reload_settings()
+    except ConfigurationException as err:
+        logging.error("settings not reloaded: {0}".format(err))
+
+    return
+
+
+def install_sighup_handler():
+    """ Reloads the settings on SIGHUP.  Must be called by the main thread,
+    and is ignored on platforms without SIGHUP.
+    """
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, handle_sighup)
+        logging.debug("SIGHUP settings reload handler installed.")
+
+    return
+
+
+if __name__ == '__main__':
+    pass
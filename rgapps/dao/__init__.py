@@ -5,6 +5,9 @@ This package contains the database access objects code.
 Modules:
 -------
 sensordao: a module to place all the database access code for sensor
+sqlitedb: a module to manage the pooled SQLite connections
+sqlitemigrations: a module to apply the SQLite schema migrations
+rollup: a module to aggregate the readings into hourly and daily rollups
 
 Sub-Packages:
 ------------
@@ -17,7 +20,8 @@ __maintainer__ = "Rubens Gomes"
 __email__ = "rubens.s.gomes@gmail.com"
 __status__ = "Experimental"
 
-__all__ = ["sensordao", "mongodb", "mongosensor", "sqlitesensor"]
+__all__ = ["sensordao", "mongodb", "mongosensor", "sqlitesensor",
+           "sqlitedb", "sqlitemigrations", "rollup"]
 
 if __name__ == '__main__':
     pass
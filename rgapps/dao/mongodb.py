@@ -2,10 +2,15 @@
 
 This is where some MongoDB utility code is placed.
 """
+import atexit
 import logging
+import os
+import threading
 
 from pymongo import MongoClient
+from pymongo.errors import PyMongoError
 
+from rgapps.config import get_settings
 from rgapps.utils.exception import IllegalArgumentException
 from rgapps.utils.utility import is_blank
 
@@ -21,33 +26,70 @@ __all__ = ["MongoDB"]
 
 class MongoDB:
     """ A class to provide MongoDB database API code
+
+    A single MongoClient (which owns a pool of connections) is shared by
+    the whole process.  It is created lazily on first use, and re-created
+    in a child process after a fork.
     """
 
+    # the oldest server version supported: the sensor analytics use the
+    # $toLong and $dateFromString aggregation operators
+    MIN_SERVER_VERSION = (4, 0)
+
+    _client_instance = None
+    _client_pid = None
+    _databases = {}
+    _lock = threading.Lock()
+
     @staticmethod
     def _client(): #PRIVATE usage only!
         """
-        Returns a valid and connected MongoClient object.
+        Returns the process-wide MongoClient object.
+
+        The client does not connect to the server when it is created.
+        Connections are opened by its pool on demand.
 
         Returns
         -------
         A MongoClient instance.
-
-        Raises
-        ------
-        Raises MongoDB exception if MongoDB is not up and running, and the
-        client could NOT connect to the database
         """
 
-        # do not wait long to connect to the server
-        # DO NOT set the timeout to 0(zero) as that will cause SocketException
-        # when running Unit Testing having multiple threads.
-        client = MongoClient(serverSelectionTimeoutMS=2)
-
-        # run following call to check the server is up and running
-        info = client.server_info()
-
-        logging.debug("Connected to MongoDB [{0}] with info [{1}]."
-                      .format(client, info))
+        pid = os.getpid()
+
+        if (MongoDB._client_instance is not None
+                and MongoDB._client_pid == pid):
+            return MongoDB._client_instance
+
+        with MongoDB._lock:
+            if (MongoDB._client_instance is not None
+                    and MongoDB._client_pid == pid):
+                return MongoDB._client_instance
+
+            settings = get_settings().mongodb
+            host = settings.mongo_host
+            port = settings.mongo_port
+            max_pool_size = settings.mongo_max_pool_size
+            min_pool_size = settings.mongo_min_pool_size
+            timeout_ms = settings.mongo_server_selection_timeout_ms
+
+            # connect=False: do not open any socket before the first
+            # operation, so that the client is safe to create before a fork.
+            client = MongoClient(host,
+                                 port,
+                                 maxPoolSize=max_pool_size,
+                                 minPoolSize=min_pool_size,
+                                 serverSelectionTimeoutMS=timeout_ms,
+                                 connect=False)
+
+            # a client inherited from the parent process must not be used
+            # (nor closed) in this process; its handles are simply dropped.
+            MongoDB._client_instance = client
+            MongoDB._client_pid = pid
+            MongoDB._databases = {}
+
+            logging.debug("Created MongoClient [{0}] with maxPoolSize [{1}] "
+                          "in process [{2}]."
+                          .format(client, max_pool_size, pid))
 
         return client
 
@@ -55,8 +97,12 @@ class MongoDB:
     @staticmethod
     def database(name):
         """
-        Returns a valid and connected Mongo Database object with
-        the given name.
+        Returns a valid Mongo Database object with the given name.
+
+        The existence of the database is only checked the first time a
+        given name is requested in this process.  The database handle is
+        cached and returned by subsequent calls without any round-trip to
+        the server.
 
         Parameters:
         ----------
@@ -78,22 +124,119 @@ class MongoDB:
 
         client = MongoDB._client()
 
-        db_found = False
-        dbs = client.database_names()
+        db = MongoDB._databases.get(name)
+        if db is not None:
+            return db
 
-        for db_name in dbs:
-            if (db_name == name):
-                db_found = True
-                break
+        if hasattr(client, "list_database_names"):
+            dbs = client.list_database_names()
+        else:
+            dbs = client.database_names()
 
-        if not db_found:
-            client.close()
+        if name not in dbs:
             raise IllegalArgumentException("MongoDB DB name [{0}] not found!"
                                            .format(name))
 
         db = client['{0}'.format(name)]
+        MongoDB._databases[name] = db
 
         logging.debug("MongoDB with database name [{0}] found."
                       .format(name))
 
         return db
+
+
+    @staticmethod
+    def is_alive():
+        """
+        Checks that the MongoDB server is up and running.
+
+        This method sends a ping command to the server.  It is meant to be
+        used by health checks and at start up, and not on every database
+        call.
+
+        Returns
+        -------
+        True if the server responded to the ping; False, otherwise.
+        """
+
+        try:
+            MongoDB._client().admin.command("ping")
+        except PyMongoError as err:
+            logging.warning("MongoDB server is not available: [{0}]"
+                            .format(err))
+            return False
+
+        return True
+
+
+    @staticmethod
+    def check_server_version():
+        """
+        Checks that the MongoDB server is MIN_SERVER_VERSION or later.
+
+        Like is_alive(), this method sends a command to the server, and is
+        meant to be used at start up.
+
+        Returns
+        -------
+        True if the server version is supported; False, otherwise.
+        """
+
+        try:
+            version = MongoDB._client().server_info()["versionArray"]
+        except PyMongoError as err:
+            logging.warning("MongoDB server version not available: [{0}]"
+                            .format(err))
+            return False
+
+        if tuple(version[:2]) < MongoDB.MIN_SERVER_VERSION:
+            logging.error("MongoDB server version [{0}] is not supported. "
+                          "Version [{1}] or later is required."
+                          .format(".".join(str(v) for v in version),
+                                  ".".join(str(v) for v
+                                           in MongoDB.MIN_SERVER_VERSION)))
+            return False
+
+        return True
+
+
+    @staticmethod
+    def after_fork():
+        """
+        Resets the client in a child process, right after a fork.  The lock
+        may have been held by another thread of the parent when it forked.
+        A new client is created on the next database() call.
+        """
+
+        MongoDB._lock = threading.Lock()
+        MongoDB._client_instance = None
+        MongoDB._client_pid = None
+        MongoDB._databases = {}
+
+        return
+
+
+    @staticmethod
+    def close():
+        """
+        Closes the process-wide MongoClient and all its pooled connections.
+        A new client is created on the next database() call.
+        """
+
+        with MongoDB._lock:
+            client = MongoDB._client_instance
+            pid = MongoDB._client_pid
+
+            MongoDB._client_instance = None
+            MongoDB._client_pid = None
+            MongoDB._databases = {}
+
+        if client is not None and pid == os.getpid():
+            client.close()
+            logging.debug("Disconnected from MongoDB")
+
+        return
+
+
+atexit.register(MongoDB.close)
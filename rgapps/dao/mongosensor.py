@@ -2,14 +2,19 @@
 
 This is where all the MongoDB sensor database code is placed.
 """
-import json
 import logging
 
-from bson import json_util
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
 import pymongo
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
-from rgapps.config import ini_config
+from rgapps.config import get_settings
 from rgapps.dao.mongodb import MongoDB
+from rgapps.dao.rollup import Rollup, ROLLUPS
+from rgapps.utils.exception import IllegalArgumentException
+from rgapps.utils.utility import utc_to_epoch_ms, epoch_ms_to_utc
 
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
@@ -21,10 +26,79 @@ __status__ = "Experimental"
 
 __all__ = ["MongoSensor"]
 
+
+# aggregation expression returning the readings utc in epoch milliseconds,
+# whether it is stored as ISO8601 string or already as epoch milliseconds.
+UTC_MS_EXPRESSION = {"$cond": [{"$eq": [{"$type": "$utc"}, "string"]},
+                               {"$toLong": {"$dateFromString":
+                                            {"dateString": "$utc"}}},
+                               "$utc"]}
+
+# aggregate name: $group accumulator expression
+AGGREGATE_EXPRESSIONS = {"avg": {"$avg": "$value"},
+                         "min": {"$min": "$value"},
+                         "max": {"$max": "$value"},
+                         "count": {"$sum": 1},
+                         "first": {"$first": "$value"},
+                         "last": {"$last": "$value"}}
+
 class MongoSensor:
     """ Class to provide sensor MongoDB database API code
     """
 
+    # the MongoDB database for which the indexes have been created
+    _indexed_db = None
+
+    @staticmethod
+    def _database(): #PRIVATE usage only!
+        """
+        Returns the cached MongoDB database configured for the sensors.
+        The sensor indexes are ensured the first time the database is used.
+        """
+        mongodb_name = get_settings().mongodb.mongo_db
+        db = MongoDB.database(mongodb_name)
+
+        if MongoSensor._indexed_db is not db:
+            MongoSensor.create_indexes(db)
+            MongoSensor._indexed_db = db
+
+        return db
+
+
+    @staticmethod
+    def create_indexes(db):
+        """
+        Creates the indexes used by the sensor queries, unless they exist.
+
+        Parameters
+        ----------
+        db:  pymongo Database (required)
+            the MongoDB sensor database
+        """
+
+        # compound index matching the serial / utc range queries and sort
+        db['readings'].create_index([("serial", pymongo.ASCENDING),
+                                     ("utc", pymongo.ASCENDING)],
+                                    name="readings_serial_utc_idx")
+
+        # sensor lookups by serial, e.g. the existence check of every
+        # reading added
+        db['sensors'].create_index([("serial", pymongo.ASCENDING)],
+                                   name="sensors_serial_idx")
+
+        for (name, _) in ROLLUPS:
+            db[name].create_index([("serial", pymongo.ASCENDING),
+                                   ("unit", pymongo.ASCENDING),
+                                   ("bucket", pymongo.ASCENDING)],
+                                  name="{0}_serial_unit_bucket_idx"
+                                  .format(name),
+                                  unique=True)
+
+        logging.debug("MongoDB sensor indexes have been ensured.")
+
+        return
+
+
     @staticmethod
     def add_reading(unit, value, utc, serial):
         """
@@ -46,8 +120,9 @@ class MongoSensor:
             nothing.
         """
 
-        mongodb_name = ini_config.get("MongoDB", "MONGO_DB")
-        db = MongoDB.database(mongodb_name)
+        utc_ms = utc_to_epoch_ms(utc)
+
+        db = MongoSensor._database()
 
         coll = db['readings']
 
@@ -61,13 +136,82 @@ class MongoSensor:
                       "into MongoDB database"
                       .format(result.inserted_id))
 
-        db.client.close()
-
-        logging.debug("Disconnected from MongoDB")
+        MongoSensor.write_rollups(db, [(serial, unit, value, utc_ms)])
 
         return
 
 
+    @staticmethod
+    def add_readings(readings):
+        """
+        Adds the given batch of measurements to sensor database with a
+        single unordered bulk insert.
+
+        Parameters
+        ----------
+        readings:  list (required)
+            list of (unit, value, utc, serial) tuples
+
+        Returns
+        -------
+        list:
+            A list of (index, error) tuples for the readings that could not
+            be inserted.  The list is empty if all readings were inserted.
+        """
+
+        failures = []
+
+        # (index, document, utc_ms) of the readings with a valid utc
+        rows = []
+
+        for index, (unit, value, utc, serial) in enumerate(readings):
+            try:
+                rows.append((index,
+                             {"unit": unit,
+                              "value": value,
+                              "utc": utc,
+                              "serial": serial
+                             },
+                             utc_to_epoch_ms(utc)))
+            except IllegalArgumentException as err:
+                failures.append((index, err.msg))
+
+        if not rows:
+            return failures
+
+        db = MongoSensor._database()
+
+        coll = db['readings']
+
+        # indexes within rows of the documents which failed
+        failed_rows = set()
+
+        try:
+            # ordered=False: keep inserting the remaining documents when
+            # one of them fails.
+            coll.insert_many([document for (_, document, _) in rows],
+                             ordered=False)
+        except BulkWriteError as err:
+            for write_error in err.details.get("writeErrors", []):
+                failed_rows.add(write_error["index"])
+                failures.append((rows[write_error["index"]][0],
+                                 write_error.get("errmsg")))
+
+        MongoSensor.write_rollups(
+            db, [(document["serial"], document["unit"], document["value"],
+                  utc_ms)
+                 for (row, (_, document, utc_ms)) in enumerate(rows)
+                 if row not in failed_rows])
+
+        failures.sort()
+
+        logging.debug("[{0}] sensor readings have been inserted into MongoDB "
+                      "database. [{1}] failed."
+                      .format(len(readings) - len(failures), len(failures)))
+
+        return failures
+
+
     @staticmethod
     def del_readings(serial):
         """
@@ -83,8 +227,7 @@ class MongoSensor:
             nothing.
         """
 
-        mongodb_name = ini_config.get("MongoDB", "MONGO_DB")
-        db = MongoDB.database(mongodb_name)
+        db = MongoSensor._database()
 
         coll = db['readings']
 
@@ -97,9 +240,8 @@ class MongoSensor:
         logging.debug("[{0}] sensor readings have been deleted from " 
                       "MongoDB database".format(result.deleted_count))
 
-        db.client.close()
-
-        logging.debug("Disconnected from MongoDB")
+        for (name, _) in ROLLUPS:
+            db[name].delete_many({"serial": serial})
 
         return
 
@@ -125,8 +267,7 @@ class MongoSensor:
             corresponding values.
         """
 
-        mongodb_name = ini_config.get("MongoDB", "MONGO_DB")
-        db = MongoDB.database(mongodb_name)
+        db = MongoSensor._database()
 
         coll = db['readings']
 
@@ -134,31 +275,384 @@ class MongoSensor:
                        "between [{1}] and [{2}] from MongoDB database."
                       .format(serial, past_datetime, current_datetime))
 
-        cursor = coll.find({ "serial": serial, 
-                             "utc": { "$lt": current_datetime },
-                             "utc": { "$gt": past_datetime }
-                           }).sort("utc", pymongo.ASCENDING)
+        # the ObjectId is left out so that the documents are plain dicts
+        cursor = coll.find({ "serial": serial,
+                             "utc": { "$gte": past_datetime,
+                                      "$lte": current_datetime }
+                           },
+                           {"_id": 0}).sort("utc", pymongo.ASCENDING)
 
-        data = None
+        data = list(cursor)
+
+        logging.debug("[{0}] readings retrieved from MongoDB for sensor with "
+                      "serial [{1}]".format(len(data), serial))
+
+        if not data:
+            data = None
+
+        return data
+
+
+    @staticmethod
+    def get_readings_page(serial, current_datetime, past_datetime, limit,
+                          after=None):
+        """
+        Returns a page of readings using keyset pagination on the
+        (utc, _id) ordering, so that no reading before the page is scanned.
+
+        Parameters
+        ----------
+        serial: str (required)
+            sensor unique serial number
+        current_datetime: str (required)
+            a valid UTC timestamp
+        past_datetime: str (required)
+            a valid UTC timestamp.  With after, it should be the utc of
+            after, unless older, so that the index range starts at the page.
+        limit: int (required)
+            maximum number of readings in the page
+        after: tuple (optional)
+            the (utc, id) key of the last reading of the previous page
+
+        Returns
+        -------
+        tuple:
+            The list of reading dictionaries in the page sorted by utc, and
+            the (utc, id) key of its last reading if there are more
+            readings, None otherwise.
+        """
+
+        db = MongoSensor._database()
+
+        coll = db['readings']
+
+        logging.debug("Retrieving [{0}] readings after [{1}] for sensor with "
+                      "serial [{2}] between [{3}] and [{4}] from MongoDB "
+                      "database."
+                      .format(limit, after, serial, past_datetime,
+                              current_datetime))
+
+        query = {"serial": serial,
+                 "utc": {"$gte": past_datetime, "$lte": current_datetime}}
+
+        if after is not None:
+            (after_utc, after_id) = after
+
+            try:
+                after_id = ObjectId(after_id)
+            except (InvalidId, TypeError):
+                raise IllegalArgumentException("cursor id [{0}] is not valid"
+                                               .format(after_id))
+
+            # together with a past_datetime not older than the previous
+            # page, this is the (utc, _id) > (after_utc, after_id) keyset
+            # condition.
+            query["$or"] = [{"utc": {"$gt": after_utc}},
+                            {"_id": {"$gt": after_id}}]
+
+        cursor = coll.find(query,
+                           {"utc": 1, "serial": 1, "unit": 1, "value": 1}
+                          ).sort([("utc", pymongo.ASCENDING),
+                                  ("_id", pymongo.ASCENDING)]
+                          ).limit(limit + 1)
+
+        data = list(cursor)
+
+        next_key = None
+        if len(data) > limit:
+            data = data[:limit]
+            next_key = (data[-1]["utc"], str(data[-1]["_id"]))
+
+        for reading in data:
+            del reading["_id"]
+
+        return (data, next_key)
+
+
+    @staticmethod
+    def iter_readings(serial, current_datetime, past_datetime):
+        """
+        Returns a generator over the readings of the given sensor.  The
+        documents are fetched from the server-side cursor in batches as they
+        are consumed.
+
+        Parameters
+        ----------
+        serial: str (required)
+            sensor unique serial number
+        current_datetime: str (required)
+            a valid UTC timestamp
+        past_datetime: str (required)
+            a valid UTC timestamp
+
+        Returns
+        -------
+        generator:
+            A generator of reading dictionaries, sorted by utc.
+        """
+
+        db = MongoSensor._database()
 
-        if (cursor.count() > 0):
-            data = list(cursor)
+        coll = db['readings']
+
+        logging.debug("Streaming readings for sensor with serial [{0}] "
+                       "between [{1}] and [{2}] from MongoDB database."
+                      .format(serial, past_datetime, current_datetime))
 
-        logging.debug("Readings [{0}] retrieved from MongoDB for sensor with " 
-                      "serial [{1}]".format(data, serial))
+        # the ObjectId is left out so that the documents are plain JSON
+        cursor = coll.find({ "serial": serial,
+                             "utc": { "$gte": past_datetime,
+                                      "$lte": current_datetime }
+                           },
+                           {"_id": 0, "utc": 1, "serial": 1, "unit": 1,
+                            "value": 1}
+                          ).sort("utc", pymongo.ASCENDING).batch_size(1000)
 
-        db.client.close()
+        try:
+            for reading in cursor:
+                yield reading
+        finally:
+            cursor.close()
 
-        logging.debug("Disconnected from MongoDB")
 
-        if data is not None:
-            # convert any MongoDB ObjectId and others (ie Binary, Code, etc) 
-            # to a string equivalent such as "$oid." and revert back to dict.
-            data = json.loads(json_util.dumps(data))
+    @staticmethod
+    def get_aggregated_readings(serial, current_datetime, past_datetime,
+                                bucket_ms, aggregate):
+        """
+        Returns the readings downsampled into time buckets.
+
+        Parameters
+        ----------
+        serial: str (required)
+            sensor unique serial number
+        current_datetime: str or int (required)
+            a valid UTC timestamp as stored in the database
+        past_datetime: str or int (required)
+            a valid UTC timestamp as stored in the database
+        bucket_ms: int (required)
+            the size of the time buckets in milliseconds
+        aggregate: str (required)
+            a valid AGGREGATE_ENUM name applied to the values of each bucket
+
+        Returns
+        -------
+        list:
+            A list of dictionaries with the "utc" of the start of the bucket
+            in epoch milliseconds, the "serial", "unit" and aggregated
+            "value", sorted by utc.
+        """
+
+        db = MongoSensor._database()
+
+        coll = db['readings']
+
+        logging.debug("Retrieving [{0}] readings in buckets of [{1}] ms "
+                      "for sensor with serial [{2}] between [{3}] and [{4}] "
+                      "from MongoDB database."
+                      .format(aggregate, bucket_ms, serial, past_datetime,
+                              current_datetime))
+
+        bucket = {"$subtract": ["$utc_ms", {"$mod": ["$utc_ms", bucket_ms]}]}
+
+        pipeline = [
+            {"$match": {"serial": serial,
+                        "utc": {"$gte": past_datetime,
+                                "$lte": current_datetime}}},
+            # sorted so that $first and $last follow the readings order
+            {"$sort": {"utc": pymongo.ASCENDING}},
+            {"$project": {"_id": 0, "serial": 1, "unit": 1, "value": 1,
+                          "utc_ms": UTC_MS_EXPRESSION}},
+            {"$group": {"_id": {"bucket": bucket, "unit": "$unit"},
+                        "serial": {"$first": "$serial"},
+                        "value": AGGREGATE_EXPRESSIONS[aggregate]}},
+            {"$sort": {"_id.bucket": pymongo.ASCENDING}},
+            {"$project": {"_id": 0, "utc": "$_id.bucket", "serial": 1,
+                          "unit": "$_id.unit", "value": 1}}
+        ]
+
+        data = list(coll.aggregate(pipeline))
 
         return data
 
 
+    @staticmethod
+    def get_rollups(serial, first_bucket, last_bucket, rollup):
+        """
+        Returns the aggregated buckets of a rollup collection.
+
+        Parameters
+        ----------
+        serial: str (required)
+            sensor unique serial number
+        first_bucket: int (required)
+            start of the first bucket in epoch milliseconds
+        last_bucket: int (required)
+            start of the last bucket in epoch milliseconds
+        rollup: str (required)
+            the name of the rollup collection as defined in ROLLUPS
+
+        Returns
+        -------
+        list:
+            A list of (serial, unit, bucket, [count, sum, min, max,
+            first_utc, first_value, last_utc, last_value]) tuples, sorted by
+            bucket.
+        """
+
+        if rollup not in dict(ROLLUPS):
+            raise IllegalArgumentException("rollup [{0}] is not valid"
+                                           .format(rollup))
+
+        db = MongoSensor._database()
+
+        coll = db[rollup]
+
+        logging.debug("Retrieving buckets between [{0}] and [{1}] for sensor "
+                      "with serial [{2}] from MongoDB rollup [{3}]."
+                      .format(first_bucket, last_bucket, serial, rollup))
+
+        cursor = coll.find({"serial": serial,
+                            "bucket": {"$gte": first_bucket,
+                                       "$lte": last_bucket}},
+                           {"_id": 0}).sort("bucket", pymongo.ASCENDING)
+
+        return [(document["serial"], document["unit"], document["bucket"],
+                 [document["count"], document["sum"], document["min"],
+                  document["max"], document["first"]["utc"],
+                  document["first"]["value"], document["last"]["utc"],
+                  document["last"]["value"]])
+                for document in cursor]
+
+
+    @staticmethod
+    def write_rollups(db, readings):
+        """
+        Merges the given readings into all the rollup collections.
+
+        Parameters
+        ----------
+        db:  pymongo Database (required)
+            the MongoDB sensor database
+        readings: list (required)
+            (serial, unit, value, utc_ms) tuples, where utc_ms is the
+            reading UTC timestamp in epoch milliseconds
+        """
+
+        if not readings:
+            return
+
+        for (name, rollup_ms) in ROLLUPS:
+            # first and last are {utc, value} sub-documents, which $min and
+            # $max compare by utc first.
+            requests = [UpdateOne({"serial": serial,
+                                   "unit": unit,
+                                   "bucket": bucket},
+                                  {"$inc": {"count": entry[0],
+                                            "sum": entry[1]},
+                                   "$min": {"min": entry[2],
+                                            "first": {"utc": entry[4],
+                                                      "value": entry[5]}},
+                                   "$max": {"max": entry[3],
+                                            "last": {"utc": entry[6],
+                                                     "value": entry[7]}}},
+                                  upsert=True)
+                        for ((serial, unit, bucket), entry)
+                        in Rollup.aggregate(readings, rollup_ms).items()]
+
+            db[name].bulk_write(requests, ordered=False)
+
+        return
+
+
+    @staticmethod
+    def rebuild_rollups():
+        """
+        Rebuilds all the rollup collections from the stored readings.
+
+        Returns
+        -------
+        int:
+            the number of readings rolled up.
+        """
+
+        db = MongoSensor._database()
+
+        for (name, _) in ROLLUPS:
+            db[name].delete_many({})
+
+        count = 0
+        readings = []
+
+        for document in db['readings'].find({}, {"_id": 0, "serial": 1,
+                                                 "unit": 1, "value": 1,
+                                                 "utc": 1}):
+            readings.append((document["serial"], document["unit"],
+                             document["value"],
+                             utc_to_epoch_ms(document["utc"])))
+
+            if len(readings) >= 10000:
+                MongoSensor.write_rollups(db, readings)
+                count += len(readings)
+                readings = []
+
+        MongoSensor.write_rollups(db, readings)
+        count += len(readings)
+
+        logging.debug("[{0}] readings have been rolled up in MongoDB database"
+                      .format(count))
+
+        return count
+
+
+    @staticmethod
+    def convert_readings_utc(epoch):
+        """
+        Converts the utc of all stored readings to the given format.
+
+        Parameters
+        ----------
+        epoch: bool (required)
+            True to convert ISO8601 string timestamps to epoch milliseconds;
+            False to convert epoch milliseconds to ISO8601 string timestamps.
+
+        Returns
+        -------
+        int:
+            the number of converted readings.
+        """
+
+        db = MongoSensor._database()
+
+        coll = db['readings']
+
+        if epoch:
+            query = {"utc": {"$type": "string"}}
+            convert = utc_to_epoch_ms
+        else:
+            query = {"utc": {"$type": "number"}}
+            convert = epoch_ms_to_utc
+
+        count = 0
+        requests = []
+
+        for document in coll.find(query, {"utc": 1}):
+            requests.append(UpdateOne({"_id": document["_id"]},
+                                      {"$set": {"utc":
+                                                convert(document["utc"])}}))
+
+            if len(requests) >= 1000:
+                count += coll.bulk_write(requests, ordered=False).modified_count
+                requests = []
+
+        if requests:
+            count += coll.bulk_write(requests, ordered=False).modified_count
+
+        logging.debug("[{0}] readings utc have been converted in MongoDB "
+                      "database".format(count))
+
+        return count
+
+
     @staticmethod
     def add_sensor(serial, geolocation, location, address, state, name,
                     sensor_type, description):
@@ -189,8 +683,7 @@ class MongoSensor:
             nothing.
         """
 
-        mongodb_name = ini_config.get("MongoDB", "MONGO_DB")
-        db = MongoDB.database(mongodb_name)
+        db = MongoSensor._database()
 
         coll = db['sensors']
 
@@ -213,10 +706,6 @@ class MongoSensor:
                       "into MongoDB database"
                       .format(result.inserted_id))
 
-        db.client.close()
-
-        logging.debug("Disconnected from MongoDB")
-
         return
 
 
@@ -235,8 +724,7 @@ class MongoSensor:
             nothing.
         """
 
-        mongodb_name = ini_config.get("MongoDB", "MONGO_DB")
-        db = MongoDB.database(mongodb_name)
+        db = MongoSensor._database()
 
         coll = db['sensors']
 
@@ -248,10 +736,6 @@ class MongoSensor:
         logging.debug("[{0}] sensors have been deleted from MongoDB database"
                       .format(result.deleted_count))
 
-        db.client.close()
-
-        logging.debug("Disconnected from MongoDB")
-
         return
 
 
@@ -273,38 +757,53 @@ class MongoSensor:
             corresponding values.
         """
 
-        mongodb_name = ini_config.get("MongoDB", "MONGO_DB")
-        db = MongoDB.database(mongodb_name)
+        db = MongoSensor._database()
 
         coll = db['sensors']
 
         logging.debug("Retrieving sensor with serial [{0}] "
                       "from MongoDB database.".format(serial))
 
-        cursor = coll.find({"serial": serial})
+        # fetch at most two documents in a single round-trip: at most we
+        # are only allowed to have one sensor per serial.  The _id (the
+        # serial) is left out so that the documents are plain dicts.
+        documents = list(coll.find({"serial": serial}, {"_id": 0}).limit(2))
 
-        # at most we are only allowed to have one sensor per serial
-        if (cursor.count() > 1):
-            db.client.close()
+        if (len(documents) > 1):
             raise RuntimeError(
                     "More than one sensor found in MongoDB [{0}] "
                     "for sensor serial [{1}]"
                     .format(db, serial))
 
         data = None
-        for document in cursor:
+        for document in documents:
             data = document
 
         logging.debug("[{0}] sensors have been retrieved from MongoDB DB"
                       .format(data))
 
-        db.client.close()
+        return data
 
-        logging.debug("Disconnected from MongoDB")
 
-        if data is not None:
-            # convert any MongoDB ObjectId and others (ie Binary, Code, etc) 
-            # to a string equivalent such as "$oid." and revert back to dict.
-            data = json.loads(json_util.dumps(data))
+    @staticmethod
+    def exists(serial):
+        """
+        Checks if a sensor with the given serial is registered.
 
-        return data
+        Parameters
+        ----------
+        serial: str (required)
+            sensor unique serial number
+
+        Returns
+        -------
+        bool:
+            True if the sensor is registered.
+        """
+
+        db = MongoSensor._database()
+
+        # only the _id of the sensor document is fetched
+        document = db['sensors'].find_one({"serial": serial}, {"_id": 1})
+
+        return document is not None
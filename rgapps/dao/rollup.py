@@ -0,0 +1,169 @@
+"""rgapps.dao.rollup module
+
+This is where the code shared by the readings rollups is placed.
+
+A rollup holds, for every sensor serial, unit and fixed time bucket, the
+count, sum, minimum, maximum, first and last of the readings values.  The
+rollups are maintained when the readings are added, so that the readings of
+long durations can be downsampled without scanning the raw readings.
+"""
+from rgapps.utils.exception import IllegalArgumentException
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+__all__ = ["Rollup", "ROLLUPS"]
+
+
+# (table/collection name, bucket size in milliseconds) of every rollup,
+# from the coarsest to the finest.
+ROLLUPS = [("readings_1d", 86400000),
+           ("readings_1h", 3600000)]
+
+
+class Rollup:
+    """ Class to provide the readings rollups API code
+    """
+
+    @staticmethod
+    def choose(bucket_ms):
+        """
+        Returns the coarsest rollup able to answer a query downsampled into
+        buckets of the given size.
+
+        Parameters
+        ----------
+        bucket_ms: int (required)
+            the size of the requested time buckets in milliseconds
+
+        Returns
+        -------
+        tuple:
+            the (name, bucket_ms) of the rollup, or None if the requested
+            buckets are not a multiple of any rollup bucket.
+        """
+
+        for (name, rollup_ms) in ROLLUPS:
+            if bucket_ms % rollup_ms == 0:
+                return (name, rollup_ms)
+
+        return None
+
+
+    @staticmethod
+    def aggregate(readings, bucket_ms):
+        """
+        Aggregates the given readings into buckets of the given size.
+
+        Parameters
+        ----------
+        readings: iterable (required)
+            (serial, unit, value, utc_ms) tuples, where utc_ms is the
+            reading UTC timestamp in epoch milliseconds
+        bucket_ms: int (required)
+            the size of the time buckets in milliseconds
+
+        Returns
+        -------
+        dict:
+            (serial, unit, bucket) keys, where bucket is the start of the
+            bucket in epoch milliseconds, with [count, sum, min, max,
+            first_utc, first_value, last_utc, last_value] values.
+        """
+
+        buckets = dict()
+
+        for (serial, unit, value, utc_ms) in readings:
+            key = (serial, unit, utc_ms - utc_ms % bucket_ms)
+            entry = buckets.get(key)
+
+            if entry is None:
+                buckets[key] = [1, value, value, value,
+                                utc_ms, value, utc_ms, value]
+                continue
+
+            entry[0] += 1
+            entry[1] += value
+            entry[2] = min(entry[2], value)
+            entry[3] = max(entry[3], value)
+
+            if utc_ms < entry[4]:
+                entry[4] = utc_ms
+                entry[5] = value
+
+            if utc_ms >= entry[6]:
+                entry[6] = utc_ms
+                entry[7] = value
+
+        return buckets
+
+
+    @staticmethod
+    def merge(entry, other):
+        """
+        Merges the other aggregated bucket into the given one.
+
+        Parameters
+        ----------
+        entry: list (required)
+            [count, sum, min, max, first_utc, first_value, last_utc,
+            last_value] of a bucket, updated in place
+        other: list (required)
+            [count, sum, min, max, first_utc, first_value, last_utc,
+            last_value] of another bucket
+        """
+
+        entry[0] += other[0]
+        entry[1] += other[1]
+        entry[2] = min(entry[2], other[2])
+        entry[3] = max(entry[3], other[3])
+
+        if other[4] < entry[4]:
+            entry[4] = other[4]
+            entry[5] = other[5]
+
+        if other[6] >= entry[6]:
+            entry[6] = other[6]
+            entry[7] = other[7]
+
+        return
+
+
+    @staticmethod
+    def value(entry, aggregate):
+        """
+        Returns the value of the given aggregate over an aggregated bucket.
+
+        Parameters
+        ----------
+        entry: list (required)
+            [count, sum, min, max, first_utc, first_value, last_utc,
+            last_value] of a bucket
+        aggregate: str (required)
+            a valid AGGREGATE_ENUM name
+        """
+
+        if aggregate == "avg":
+            return entry[1] / entry[0]
+        elif aggregate == "min":
+            return entry[2]
+        elif aggregate == "max":
+            return entry[3]
+        elif aggregate == "count":
+            return entry[0]
+        elif aggregate == "first":
+            return entry[5]
+        elif aggregate == "last":
+            return entry[7]
+
+        raise IllegalArgumentException("aggregate [{0}] is not valid"
+                                       .format(aggregate))
+
+
+if __name__ == '__main__':
+    pass
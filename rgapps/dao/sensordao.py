@@ -4,16 +4,22 @@ This is where all the sensor database code is placed.
 """
 
 
+import base64
+import binascii
+import json
 import logging
+import re
+import sys
 
 import arrow
 
-from rgapps.config import ini_config
-from rgapps.utils.enums import DURATION_ENUM
+from rgapps.config import get_settings
+from rgapps.utils.cache import LRUCache
+from rgapps.utils.enums import AGGREGATE_ENUM, DURATION_ENUM
 from rgapps.utils.exception import IllegalArgumentException
-from rgapps.utils.utility import is_blank, is_number
-from rgapps.dao.mongosensor import MongoSensor
-from rgapps.dao.sqlitesensor import SQLiteSensor
+from rgapps.utils.utility import is_blank, is_number, utc_to_epoch_ms, \
+    utc_to_iso, epoch_ms_to_utc, resolution_to_seconds
+from rgapps.dao.rollup import Rollup
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
 __copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
@@ -25,17 +31,299 @@ __status__ = "Experimental"
 __all__ = ["SensorDAO"]
 
 
+# a timestamp given as a number of milliseconds since the epoch
+EPOCH_MS_PATTERN = re.compile(r"^-?[0-9]+$")
+
+# returned by the sensor cache for the serials not cached
+_NOT_CACHED = object()
+
+
+def _sensor_cache(): #PRIVATE usage only!
+    """
+    Returns the sensor records cache configured by the DAO SENSOR_CACHE_SIZE
+    and SENSOR_CACHE_TTL properties, or None if it is disabled.
+    """
+    settings = get_settings().dao
+    size = settings.sensor_cache_size
+    ttl = settings.sensor_cache_ttl
+
+    if size <= 0:
+        return None
+
+    return LRUCache(size, ttl if ttl > 0 else None)
+
+
+def _sensor_db(): #PRIVATE usage only!
+    """
+    Returns the database of the enabled backend, or None.  Only the module
+    of the enabled backend is imported (e.g., pymongo is not imported when
+    SQLite is used).
+    """
+    if get_settings().sqlite.sqlite_db_enable:
+        from rgapps.dao.sqlitesensor import SQLiteSensor
+        return SQLiteSensor()
+
+    if get_settings().mongodb.mongo_db_enable:
+        from rgapps.dao.mongosensor import MongoSensor
+        return MongoSensor()
+
+    return None
+
+
 
 class SensorDAO:
     """ Class API to provide sensor database API code
     """
 
-    SENSOR_DB = None
     # Strategy design pattern along with duck typing.
-    if (ini_config.getboolean("SqlLite", "SQLITE_DB_ENABLE")):
-        SENSOR_DB = SQLiteSensor()
-    elif (ini_config.getboolean("MongoDB", "MONGO_DB_ENABLE")):
-        SENSOR_DB = MongoSensor()
+    SENSOR_DB = _sensor_db()
+
+    # store readings utc as epoch milliseconds instead of ISO8601 text
+    EPOCH_UTC = get_settings().dao.readings_epoch_utc
+
+    # downsample the readings of long durations by default, so that they
+    # are served by the rollups
+    AUTO_ROLLUP = get_settings().dao.readings_auto_rollup
+
+    # (minimum period in seconds, default resolution) used with AUTO_ROLLUP,
+    # from the longest to the shortest period: daily above 90 days, and
+    # hourly from 30 days.
+    ROLLUP_RESOLUTIONS = [(90 * 86400 + 1, "1d"),
+                          (30 * 86400, "1h")]
+
+    # functions called with the serial of every sensor added or deleted
+    SENSOR_LISTENERS = []
+
+    # serial -> sensor record, or None for the serials not registered
+    SENSOR_CACHE = _sensor_cache()
+
+
+    @staticmethod
+    def sensor_cache_stats():
+        """
+        Returns the statistics of the sensor records cache.
+
+        Returns
+        -------
+        dict:
+            "size": number of serials cached, "hits" and "misses": number
+            of get_sensor calls served, or not, by the cache.  None if the
+            cache is disabled.
+        """
+        cache = SensorDAO.SENSOR_CACHE
+        if cache is None:
+            return None
+
+        return {"size": len(cache), "hits": cache.hits,
+                "misses": cache.misses}
+
+
+    @staticmethod
+    def add_sensor_listener(listener):
+        """
+        Registers a function to be called with the serial of every sensor
+        added or deleted, e.g., to invalidate the caches of sensor data.
+
+        Parameters
+        ----------
+        listener: callable (required)
+            a function taking the sensor serial
+        """
+        if not callable(listener):
+            raise IllegalArgumentException("listener [{0}] is not callable."
+                                           .format(listener))
+
+        if listener not in SensorDAO.SENSOR_LISTENERS:
+            SensorDAO.SENSOR_LISTENERS.append(listener)
+
+        return
+
+
+    @staticmethod
+    def _notify_sensor_listeners(serial): #PRIVATE usage only!
+        """
+        Invalidates the cached sensor record, and calls the sensor listeners
+        with the serial of the changed sensor.
+        """
+        if SensorDAO.SENSOR_CACHE is not None:
+            SensorDAO.SENSOR_CACHE.pop(serial)
+
+        for listener in SensorDAO.SENSOR_LISTENERS:
+            listener(serial)
+
+        return
+
+
+    @staticmethod
+    def _to_storage_utc(utc): #PRIVATE usage only!
+        """
+        Converts the given ISO8601 UTC timestamp to the format stored in
+        the database.
+        """
+        if SensorDAO.EPOCH_UTC:
+            return utc_to_epoch_ms(utc)
+
+        # the stored timestamps are compared as text
+        return utc_to_iso(utc)
+
+
+    @staticmethod
+    def _from_storage_utc(utc): #PRIVATE usage only!
+        """
+        Converts the given UTC timestamp stored in the database to an
+        ISO8601 UTC timestamp.
+        """
+        if SensorDAO.EPOCH_UTC and not isinstance(utc, str):
+            return epoch_ms_to_utc(utc)
+
+        return utc
+
+
+    @staticmethod
+    def _validate_reading(unit, value, utc, serial): #PRIVATE usage only!
+        """
+        Validates the given measurement data.
+
+        Raises
+        ------
+        IllegalArgumentException if any of the measurement data is not valid.
+        """
+
+        if is_blank(unit):
+            raise IllegalArgumentException("unit is required.")
+
+        if value is None:
+            raise IllegalArgumentException("value is required.")
+
+        if not is_number(str(value)):
+            raise IllegalArgumentException("value is not a numeric value.")
+
+        if is_blank(utc):
+            raise IllegalArgumentException("utc is required.")
+
+        if is_blank(serial):
+            raise IllegalArgumentException("serial is required.")
+
+        return
+
+
+    @staticmethod
+    def _encode_cursor(key): #PRIVATE usage only!
+        """
+        Encodes the given (utc, id) key of a reading into an opaque URL safe
+        pagination cursor.
+        """
+        text = json.dumps(list(key), separators=(",", ":"))
+        return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii")
+
+
+    @staticmethod
+    def _decode_cursor(cursor): #PRIVATE usage only!
+        """
+        Decodes the given pagination cursor into the (utc, id) key of a
+        reading.
+
+        Raises
+        ------
+        IllegalArgumentException if cursor is not valid.
+        """
+        try:
+            text = base64.urlsafe_b64decode(cursor.encode("ascii"))
+            (utc, key_id) = json.loads(text.decode("utf-8"))
+        except (binascii.Error, UnicodeError, ValueError, TypeError):
+            raise IllegalArgumentException("cursor [{0}] is not valid"
+                                           .format(cursor))
+
+        if not isinstance(utc, (str, int, float)) or isinstance(utc, bool):
+            raise IllegalArgumentException("cursor [{0}] is not valid"
+                                           .format(cursor))
+
+        return (utc, key_id)
+
+
+    @staticmethod
+    def _parse_utc(utc): #PRIVATE usage only!
+        """
+        Returns the given ISO8601 UTC timestamp, or milliseconds since the
+        epoch (number or digits string), as an arrow UTC timestamp.
+
+        Raises
+        ------
+        IllegalArgumentException if utc is not a valid timestamp.
+        """
+        if isinstance(utc, str) and EPOCH_MS_PATTERN.match(utc.strip()):
+            utc = int(utc.strip())
+
+        return arrow.get(utc_to_epoch_ms(utc) / 1000.0)
+
+
+    @staticmethod
+    def _range(duration, from_utc, to_utc): #PRIVATE usage only!
+        """
+        Returns the (current, past) arrow UTC timestamps of the period
+        defined either by the given DURATION_ENUM, or by the given from/to
+        timestamps.
+
+        Raises
+        ------
+        IllegalArgumentException if the period is not valid.
+        """
+
+        if from_utc is None:
+            if to_utc is not None:
+                raise IllegalArgumentException("to [{0}] requires a from "
+                                               "timestamp.".format(to_utc))
+
+            if is_blank(duration):
+                raise IllegalArgumentException("duration is required.")
+
+            shift = DURATION_ENUM.shift(duration)
+            if shift is None:
+                raise IllegalArgumentException("duration [{0}] is not valid"
+                                               .format(duration))
+
+            arrow_utcnow = arrow.utcnow()
+            arrow_utcpast = arrow_utcnow.replace(**shift)
+
+        else:
+            if duration is not None:
+                raise IllegalArgumentException("duration [{0}] and from "
+                                               "[{1}] are mutually exclusive."
+                                               .format(duration, from_utc))
+
+            arrow_utcpast = SensorDAO._parse_utc(from_utc)
+
+            if to_utc is None:
+                arrow_utcnow = arrow.utcnow()
+            else:
+                arrow_utcnow = SensorDAO._parse_utc(to_utc)
+
+            if arrow_utcpast > arrow_utcnow:
+                raise IllegalArgumentException("from [{0}] is after to [{1}]."
+                                               .format(from_utc, to_utc))
+
+        logging.debug("current UTC [{0}], past UTC [{1}], duration[{2}]"
+                      .format(str(arrow_utcnow), str(arrow_utcpast), duration))
+
+        return (arrow_utcnow, arrow_utcpast)
+
+
+    @staticmethod
+    def _default_resolution(arrow_utcnow, arrow_utcpast): #PRIVATE usage only!
+        """
+        Returns the resolution by which the readings of the given period are
+        downsampled by default, or None if they are not.
+        """
+        if not SensorDAO.AUTO_ROLLUP:
+            return None
+
+        seconds = (arrow_utcnow - arrow_utcpast).total_seconds()
+
+        for (min_seconds, resolution) in SensorDAO.ROLLUP_RESOLUTIONS:
+            if seconds >= min_seconds:
+                return resolution
+
+        return None
 
 
     @staticmethod
@@ -59,32 +347,119 @@ class SensorDAO:
             nothing.
         """
 
-        if is_blank(unit):
-            raise IllegalArgumentException("unit is required.")
-
-        if not value:
-            raise IllegalArgumentException("utc is required.")
-
-        if not is_number(value):
-            raise IllegalArgumentException("value is not a numeric value.")
-
-        if is_blank(utc):
-            raise IllegalArgumentException("utc is required.")
-
-        if is_blank(serial):
-            raise IllegalArgumentException("serial is required.")
+        SensorDAO._validate_reading(unit, value, utc, serial)
 
-        test_sensor = SensorDAO.get_sensor(serial)
-        if test_sensor is None:
+        if not SensorDAO.exists(serial):
             raise IllegalArgumentException("sensor with serial [{0}] " 
                                             "is not registered in the system."
                                             .format(serial))
 
-        SensorDAO.SENSOR_DB.add_reading(unit, value, utc, serial)
+        SensorDAO.SENSOR_DB.add_reading(unit, value,
+                                        SensorDAO._to_storage_utc(utc),
+                                        serial)
 
         return
 
 
+    @staticmethod
+    def add_readings(readings, batch_size=None):
+        """
+        Adds the given measurements to sensor database in batches.
+
+        Every reading is validated, and the registration of every distinct
+        sensor serial is only checked once.  Readings that are not valid,
+        or that the database rejects, are reported back to the caller while
+        all the other readings are still added.
+
+        Parameters
+        ----------
+        readings:  iterable (required)
+            dictionaries with the keys "unit", "value", "utc" and "serial"
+            as defined in add_reading
+        batch_size: int (optional)
+            maximum number of readings written to the database at once.
+            Defaults to READINGS_BATCH_SIZE in the configuration file.
+
+        Returns
+        -------
+        dict:
+            "inserted": number of readings added to the database.
+            "failed": list of dictionaries with the "index" of the reading
+            in the given iterable, the "reading" itself, and the "error".
+        """
+
+        if readings is None:
+            raise IllegalArgumentException("readings is required.")
+
+        if batch_size is None:
+            batch_size = get_settings().dao.readings_batch_size
+
+        if batch_size <= 0:
+            raise IllegalArgumentException("batch_size [{0}] must be greater "
+                                           "than zero.".format(batch_size))
+
+        # registration status of every serial seen so far
+        registered = dict()
+
+        inserted = 0
+        failed = []
+
+        # (index, reading, row) tuples waiting to be written, where row is
+        # the (unit, value, utc, serial) tuple stored in the database.
+        batch = []
+
+        def flush(batch):
+            rows = [row for (_, _, row) in batch]
+            failures = SensorDAO.SENSOR_DB.add_readings(rows)
+
+            for (batch_index, error) in failures:
+                (index, reading, _) = batch[batch_index]
+                failed.append({"index": index,
+                               "reading": reading,
+                               "error": error})
+
+            return len(rows) - len(failures)
+
+        for index, reading in enumerate(readings):
+            try:
+                SensorDAO._validate_reading(reading.get("unit"),
+                                            reading.get("value"),
+                                            reading.get("utc"),
+                                            reading.get("serial"))
+
+                serial = reading["serial"]
+                if serial not in registered:
+                    registered[serial] = SensorDAO.exists(serial)
+
+                if not registered[serial]:
+                    raise IllegalArgumentException(
+                        "sensor with serial [{0}] is not registered in the "
+                        "system.".format(serial))
+
+                row = (reading["unit"], reading["value"],
+                       SensorDAO._to_storage_utc(reading["utc"]), serial)
+
+            except (IllegalArgumentException, AttributeError) as err:
+                failed.append({"index": index,
+                               "reading": reading,
+                               "error": getattr(err, "msg", str(err))})
+                continue
+
+            batch.append((index, reading, row))
+
+            if len(batch) >= batch_size:
+                inserted += flush(batch)
+                batch = []
+
+        if batch:
+            inserted += flush(batch)
+
+        logging.debug("[{0}] readings added to the database. [{1}] failed."
+                      .format(inserted, len(failed)))
+
+        return {"inserted": inserted, "failed": failed}
+
+
     @staticmethod
     def del_readings(serial):
         """
@@ -109,7 +484,8 @@ class SensorDAO:
 
 
     @staticmethod
-    def get_readings(serial, duration):
+    def get_readings(serial, duration, resolution=None, aggregate=None,
+                     from_utc=None, to_utc=None):
         """
         Returns .....
 
@@ -117,93 +493,376 @@ class SensorDAO:
         ----------
         serial: str (required)
             sensor unique serial number
-        duration: str (required)
+        duration: str (required unless from_utc is given)
             a valid DURATION_ENUM
+        resolution: str (optional)
+            size of the time buckets used to downsample the readings (e.g.,
+            5m, 1h, 1d).  Raw readings are returned if not given, unless
+            READINGS_AUTO_ROLLUP is set and the period is long enough.
+        aggregate: str (optional)
+            a valid AGGREGATE_ENUM applied to the readings of every time
+            bucket.  Defaults to avg.  Only used with a resolution.
+        from_utc: str or int (optional)
+            start of the period, instead of a duration, as an ISO8601 UTC
+            timestamp or milliseconds since the epoch.
+        to_utc: str or int (optional)
+            end of the period started by from_utc.  Defaults to now.
 
         Returns
         -------
         dict:
             A sensor dictionary containing column names as keys, and
-            corresponding values.
+            corresponding values.  When downsampled, the utc is the start of
+            the time bucket, and the value is the aggregated value.  Buckets
+            of whole hours or days are read from the readings rollups.
         """
 
         if is_blank(serial):
             raise IllegalArgumentException("serial is required.")
 
-        if is_blank(duration):
-            raise IllegalArgumentException("duration is required.")
-
-        logging.debug("Retrieving readings from sensor with serial [{0}] using "
-                      "duration [{1}] from database."
-                      .format(serial, duration))
-
-        arrow_utcnow = arrow.utcnow()
-        logging.debug("current UTC now [{0}]".format(str(arrow_utcnow)))
-
-        arrow_utcpast = None
-
-
-        # I had to define the following variables to fix PyDev Error:
-        # Undefined variable from import: name.  PyDev 
-        last5Years = DURATION_ENUM.last5Years
-        last1Year = DURATION_ENUM.last1Year
-        last6Months = DURATION_ENUM.last6Months
-        last90Days = DURATION_ENUM.last90Days
-        last60Days = DURATION_ENUM.last60Days
-        last30Days = DURATION_ENUM.last30Days
-        last21Days = DURATION_ENUM.last21Days
-        last7Days = DURATION_ENUM.last7Days
-        last3Days = DURATION_ENUM.last3Days
-        lastDay = DURATION_ENUM.lastDay
-        last24Hours = DURATION_ENUM.last24Hours
-        last12Hours = DURATION_ENUM.last12Hours
-        last6Hours = DURATION_ENUM.last6Hours
-        lastHour = DURATION_ENUM.lastHour
-
-        if duration.lower().strip() == last5Years.name.lower():
-            arrow_utcpast = arrow_utcnow.replace(years=-5)
-        elif duration.lower().strip() == last1Year.name.lower():
-            arrow_utcpast = arrow_utcnow.replace(years=-1)
-        elif duration.lower().strip() == last6Months.name.lower():
-            arrow_utcpast = arrow_utcnow.replace(months=-6)
-        elif duration.lower().strip() == last90Days.name.lower():
-            arrow_utcpast = arrow_utcnow.replace(days=-90)
-        elif duration.lower().strip() == last60Days.name.lower():
-            arrow_utcpast = arrow_utcnow.replace(days=-60)
-        elif duration.lower().strip() == last30Days.name.lower():
-            arrow_utcpast = arrow_utcnow.replace(days=-30)
-        elif duration.lower().strip() == last21Days.name.lower():
-            arrow_utcpast = arrow_utcnow.replace(days=-21)
-        elif duration.lower().strip() == last7Days.name.lower():
-            arrow_utcpast = arrow_utcnow.replace(days=-7)
-        elif duration.lower().strip() == last3Days.name.lower():
-            arrow_utcpast = arrow_utcnow.replace(days=-3)
-        elif duration.lower().strip() == lastDay.name.lower():
-            arrow_utcpast = arrow_utcnow.replace(days=-1)
-        elif duration.lower().strip() == last24Hours.name.lower():
-            arrow_utcpast = arrow_utcnow.replace(hours=-24)
-        elif duration.lower().strip() == last12Hours.name.lower():
-            arrow_utcpast = arrow_utcnow.replace(hours=-12)
-        elif duration.lower().strip() == last6Hours.name.lower():
-            arrow_utcpast = arrow_utcnow.replace(hours=-6)
-        elif duration.lower().strip() == lastHour.name.lower():
-            arrow_utcpast = arrow_utcnow.replace(hours=-1)
-        else:
-            raise IllegalArgumentException("duration [{0}] is not valid"
-                                           .format(duration))
+        (arrow_utcnow, arrow_utcpast) = SensorDAO._range(duration, from_utc,
+                                                         to_utc)
 
-        logging.debug("current UTC [{0}], past UTC [{1}], duration[{2}]"
-                      .format(str(arrow_utcnow), str(arrow_utcpast), duration))
+        if resolution is None and aggregate is None:
+            resolution = SensorDAO._default_resolution(arrow_utcnow,
+                                                       arrow_utcpast)
+
+        bucket_ms = None
+
+        if resolution is not None:
+            bucket_ms = resolution_to_seconds(resolution) * 1000
+
+            if aggregate is None:
+                aggregate = AGGREGATE_ENUM.avg.name
+
+            if not AGGREGATE_ENUM.is_valid(aggregate):
+                raise IllegalArgumentException("aggregate [{0}] is not valid"
+                                               .format(aggregate))
+
+            aggregate = aggregate.lower().strip()
+
+        elif aggregate is not None:
+            raise IllegalArgumentException("aggregate [{0}] requires a "
+                                           "resolution".format(aggregate))
+
+        logging.debug("Retrieving readings from sensor with serial [{0}] "
+                      "between [{1}] and [{2}] from database."
+                      .format(serial, arrow_utcpast, arrow_utcnow))
 
-        current_datetime = str(arrow_utcnow)
-        past_datetime = str(arrow_utcpast)
+        current_datetime = SensorDAO._to_storage_utc(str(arrow_utcnow))
+        past_datetime = SensorDAO._to_storage_utc(str(arrow_utcpast))
+
+        data = None
+        if bucket_ms is not None:
+            data = SensorDAO._get_rollup_readings(serial, arrow_utcnow,
+                                                  arrow_utcpast, bucket_ms,
+                                                  aggregate)
+
+        if bucket_ms is not None and data is None:
+            data = SensorDAO.SENSOR_DB.get_aggregated_readings(
+                serial, current_datetime, past_datetime, bucket_ms, aggregate)
+
+        if bucket_ms is not None:
+            # the start of every bucket is always returned in epoch ms
+            for reading in data:
+                reading["utc"] = epoch_ms_to_utc(reading["utc"])
+
+            return data
 
         data = SensorDAO.SENSOR_DB.get_readings(serial, current_datetime, 
                                                 past_datetime)
 
+        if data and SensorDAO.EPOCH_UTC:
+            for reading in data:
+                reading["utc"] = SensorDAO._from_storage_utc(reading["utc"])
+
         return data
 
 
+    @staticmethod
+    def _get_rollup_readings(serial, arrow_utcnow, arrow_utcpast, bucket_ms,
+                             aggregate): #PRIVATE usage only!
+        """
+        Returns the readings of the given period downsampled from the
+        coarsest rollup whose buckets divide the given buckets, or None if
+        no rollup can be used.
+
+        The rollup buckets entirely within the period are read from the
+        rollup.  The readings of the partial rollup buckets at both ends of
+        the period are aggregated from the raw readings, so that the result
+        is the same as downsampling the raw readings.
+        """
+
+        rollup = Rollup.choose(bucket_ms)
+        if rollup is None:
+            return None
+
+        (name, rollup_ms) = rollup
+
+        now_ms = utc_to_epoch_ms(str(arrow_utcnow))
+        past_ms = utc_to_epoch_ms(str(arrow_utcpast))
+
+        # start of the first and last rollup buckets within the period
+        first_bucket = past_ms + (-past_ms % rollup_ms)
+        last_bucket = (now_ms + 1) - (now_ms + 1) % rollup_ms - rollup_ms
+
+        if first_bucket > last_bucket:
+            return None
+
+        # (serial, unit, bucket, entry) of the rollup buckets and partial
+        # rollup buckets of the period
+        entries = SensorDAO.SENSOR_DB.get_rollups(serial, first_bucket,
+                                                  last_bucket, name)
+
+        # the outer ends of the period are given as is, so that they are
+        # compared exactly as when downsampling the raw readings
+        edges = []
+
+        if past_ms < first_bucket:
+            edges.append((
+                SensorDAO._to_storage_utc(str(arrow_utcpast)),
+                SensorDAO._to_storage_utc(epoch_ms_to_utc(first_bucket - 1))))
+
+        if last_bucket + rollup_ms <= now_ms:
+            edges.append((
+                SensorDAO._to_storage_utc(
+                    epoch_ms_to_utc(last_bucket + rollup_ms)),
+                SensorDAO._to_storage_utc(str(arrow_utcnow))))
+
+        for (edge_past, edge_now) in edges:
+            readings = SensorDAO.SENSOR_DB.iter_readings(serial, edge_now,
+                                                         edge_past)
+
+            buckets = Rollup.aggregate(((reading["serial"], reading["unit"],
+                                         reading["value"],
+                                         utc_to_epoch_ms(reading["utc"]))
+                                        for reading in readings), rollup_ms)
+
+            entries.extend((serial, unit, bucket, entry)
+                           for ((serial, unit, bucket), entry)
+                           in buckets.items())
+
+        # merge the rollup buckets into the requested buckets
+        merged = dict()
+
+        for (serial, unit, bucket, entry) in entries:
+            key = (bucket - bucket % bucket_ms, unit)
+
+            if key in merged:
+                Rollup.merge(merged[key][1], entry)
+            else:
+                merged[key] = (serial, list(entry))
+
+        data = []
+
+        for key in sorted(merged):
+            (bucket, unit) = key
+            (serial, entry) = merged[key]
+            data.append({"utc": bucket,
+                         "serial": serial,
+                         "unit": unit,
+                         "value": Rollup.value(entry, aggregate)})
+
+        return data
+
+
+    @staticmethod
+    def get_readings_page(serial, duration, limit, cursor=None, from_utc=None,
+                          to_utc=None):
+        """
+        Returns a page of the raw readings of the given sensor.
+
+        The readings are paged with a keyset on their (utc, id) ordering:
+        every page starts right after the reading identified by the cursor,
+        without scanning the readings of the previous pages.
+
+        Parameters
+        ----------
+        serial: str (required)
+            sensor unique serial number
+        duration: str (required unless from_utc is given)
+            a valid DURATION_ENUM
+        limit: int (required)
+            maximum number of readings in the page, up to
+            READINGS_MAX_PAGE_SIZE
+        cursor: str (optional)
+            the opaque cursor returned with the previous page.  The first
+            page is returned if not given.
+        from_utc: str or int (optional)
+            see get_readings
+        to_utc: str or int (optional)
+            see get_readings
+
+        Returns
+        -------
+        dict:
+            "readings": list of reading dictionaries sorted by utc, as
+            returned by get_readings.
+            "next_cursor": the cursor of the next page, or None if this is
+            the last page.
+        """
+
+        if is_blank(serial):
+            raise IllegalArgumentException("serial is required.")
+
+        max_limit = get_settings().dao.readings_max_page_size
+
+        if (not isinstance(limit, int) or isinstance(limit, bool)
+                or limit <= 0 or limit > max_limit):
+            raise IllegalArgumentException("limit [{0}] must be between 1 "
+                                           "and [{1}]."
+                                           .format(limit, max_limit))
+
+        after = None
+        if cursor is not None:
+            after = SensorDAO._decode_cursor(cursor)
+
+        (arrow_utcnow, arrow_utcpast) = SensorDAO._range(duration, from_utc,
+                                                         to_utc)
+
+        logging.debug("Retrieving [{0}] readings after cursor [{1}] from "
+                      "sensor with serial [{2}] between [{3}] and [{4}] from "
+                      "database.".format(limit, after, serial, arrow_utcpast,
+                                         arrow_utcnow))
+
+        current_datetime = SensorDAO._to_storage_utc(str(arrow_utcnow))
+        past_datetime = SensorDAO._to_storage_utc(str(arrow_utcpast))
+
+        # start the range at the previous page, unless it is older than
+        # the requested duration
+        if after is not None:
+            try:
+                past_datetime = max(past_datetime, after[0])
+            except TypeError:
+                raise IllegalArgumentException("cursor [{0}] is not valid"
+                                               .format(cursor))
+
+        (data, next_key) = SensorDAO.SENSOR_DB.get_readings_page(
+            serial, current_datetime, past_datetime, limit, after)
+
+        if SensorDAO.EPOCH_UTC:
+            for reading in data:
+                reading["utc"] = SensorDAO._from_storage_utc(reading["utc"])
+
+        next_cursor = None
+        if next_key is not None:
+            next_cursor = SensorDAO._encode_cursor(next_key)
+
+        return {"readings": data, "next_cursor": next_cursor}
+
+
+    @staticmethod
+    def iter_readings(serial, duration, resolution=None, aggregate=None,
+                      from_utc=None, to_utc=None):
+        """
+        Returns an iterator over the readings of the given sensor, which
+        reads the raw readings from a database cursor as they are consumed,
+        so that the readings of long durations are never held in memory all
+        at once.
+
+        The arguments are validated when this method is called, before any
+        reading is consumed.  Downsampled readings are read at once as in
+        get_readings, since there is only one per time bucket.
+
+        Parameters
+        ----------
+        serial: str (required)
+            sensor unique serial number
+        duration: str (required unless from_utc is given)
+            a valid DURATION_ENUM
+        resolution: str (optional)
+            see get_readings
+        aggregate: str (optional)
+            see get_readings
+        from_utc: str or int (optional)
+            see get_readings
+        to_utc: str or int (optional)
+            see get_readings
+
+        Returns
+        -------
+        iterator:
+            An iterator over the readings dictionaries as returned by
+            get_readings.
+        """
+
+        if is_blank(serial):
+            raise IllegalArgumentException("serial is required.")
+
+        (arrow_utcnow, arrow_utcpast) = SensorDAO._range(duration, from_utc,
+                                                         to_utc)
+
+        if resolution is None and aggregate is None:
+            resolution = SensorDAO._default_resolution(arrow_utcnow,
+                                                       arrow_utcpast)
+
+        if resolution is not None or aggregate is not None:
+            data = SensorDAO.get_readings(serial, None, resolution, aggregate,
+                                          utc_to_epoch_ms(str(arrow_utcpast)),
+                                          utc_to_epoch_ms(str(arrow_utcnow)))
+            return iter(data or [])
+
+        logging.debug("Streaming readings from sensor with serial [{0}] "
+                      "between [{1}] and [{2}] from database."
+                      .format(serial, arrow_utcpast, arrow_utcnow))
+
+        readings = SensorDAO.SENSOR_DB.iter_readings(
+            serial, SensorDAO._to_storage_utc(str(arrow_utcnow)),
+            SensorDAO._to_storage_utc(str(arrow_utcpast)))
+
+        if not SensorDAO.EPOCH_UTC:
+            return readings
+
+        def from_storage(readings):
+            for reading in readings:
+                reading["utc"] = SensorDAO._from_storage_utc(reading["utc"])
+                yield reading
+
+        return from_storage(readings)
+
+
+    @staticmethod
+    def convert_readings_utc():
+        """
+        Converts the utc of all the readings stored in the database to the
+        format configured by READINGS_EPOCH_UTC.  This method should be run
+        once after READINGS_EPOCH_UTC is changed.
+
+        Returns
+        -------
+        int:
+            the number of converted readings.
+        """
+
+        count = SensorDAO.SENSOR_DB.convert_readings_utc(SensorDAO.EPOCH_UTC)
+
+        logging.info("[{0}] readings have been converted to [{1}] utc."
+                     .format(count,
+                             "epoch" if SensorDAO.EPOCH_UTC else "ISO8601"))
+
+        return count
+
+
+    @staticmethod
+    def rebuild_rollups():
+        """
+        Rebuilds the readings rollups from all the readings stored in the
+        database.  This method should be run once if the rollups are missing
+        or out of date (e.g., readings were written by other means).
+
+        Returns
+        -------
+        int:
+            the number of readings rolled up.
+        """
+
+        count = SensorDAO.SENSOR_DB.rebuild_rollups()
+
+        logging.info("[{0}] readings have been rolled up.".format(count))
+
+        return count
+
+
     @staticmethod
     def add_sensor(serial, geolocation, location, address, state, name,
                     sensor_type, description):
@@ -255,6 +914,8 @@ class SensorDAO:
         SensorDAO.SENSOR_DB.add_sensor(serial, geolocation, location, address, 
                                        state, name, sensor_type, description)
 
+        SensorDAO._notify_sensor_listeners(serial)
+
         return
 
 
@@ -278,15 +939,51 @@ class SensorDAO:
 
         SensorDAO.SENSOR_DB.del_sensor(serial)
 
+        SensorDAO._notify_sensor_listeners(serial)
+
         return
 
 
+    @staticmethod
+    def exists(serial):
+        """
+        Checks if a sensor with the given serial is registered.
+
+        The sensor cache is used when it is enabled, so that the readings
+        of a sensor are added without reading the database every time.
+        Otherwise, the sensor database is only asked whether the serial
+        exists, without reading the sensor record.
+
+        Parameters
+        ----------
+        serial: str (required)
+            sensor unique serial number
+
+        Returns
+        -------
+        bool:
+            True if the sensor is registered.
+        """
+
+        if is_blank(serial):
+            raise IllegalArgumentException("serial is required.")
+
+        if SensorDAO.SENSOR_CACHE is not None:
+            return SensorDAO.get_sensor(serial) is not None
+
+        return SensorDAO.SENSOR_DB.exists(serial)
+
+
     @staticmethod
     def get_sensor(serial):
         """
         Returns a tuble corresponding to the sensor table in the database
         for the given sensor serial.
 
+        The records, and the serials not registered, are kept in the sensor
+        cache for SENSOR_CACHE_TTL seconds.  The cached record of a sensor
+        is invalidated when it is added or deleted through this DAO.
+
         Parameters
         ----------
         serial: str (required)
@@ -296,14 +993,48 @@ class SensorDAO:
         -------
         dict:
             A sensor dictionary containing column names as keys, and
-            corresponding values.
+            corresponding values.  None if the sensor is not registered.
         """
 
         if is_blank(serial):
             raise IllegalArgumentException("serial is required.")
 
-        data = SensorDAO.SENSOR_DB.get_sensor(serial)
+        cache = SensorDAO.SENSOR_CACHE
+        if cache is None:
+            return SensorDAO.SENSOR_DB.get_sensor(serial)
 
-        return data
+        data = cache.get(serial, _NOT_CACHED)
+
+        if data is _NOT_CACHED:
+            data = SensorDAO.SENSOR_DB.get_sensor(serial)
+            # unknown serials are cached too, as None
+            cache.put(serial, data)
+
+        if data is None:
+            return None
+
+        # callers must not change the cached record
+        return dict(data)
+
+
+def run():
+    """ Converts the utc of the stored readings to the configured format,
+    or rebuilds the readings rollups.
+
+    python -m rgapps.dao.sensordao [rollups]
+    """
+    if "rollups" in sys.argv[1:]:
+        count = SensorDAO.rebuild_rollups()
+        sys.stdout.write("[{0}] readings have been rolled up.\n"
+                         .format(count))
+        return
+
+    count = SensorDAO.convert_readings_utc()
+
+    sys.stdout.write("[{0}] readings have been converted.\n".format(count))
+
+    return
 
 
+if __name__ == '__main__':
+    run()
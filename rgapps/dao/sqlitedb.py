@@ -0,0 +1,222 @@
+"""rgapps.dao.sqlitedb module
+
+This is where some SQLite utility code is placed.
+"""
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import weakref
+
+from rgapps.config import get_settings
+from rgapps.dao.sqlitemigrations import SQLiteMigrations
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+__all__ = ["SQLiteDB"]
+
+
+class _ThreadConnection: #PRIVATE usage only!
+    """ Holds the connection of a thread, in the thread-local storage.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.pid = os.getpid()
+        self.finalizer = None
+
+
+class SQLiteDB:
+    """ A class to provide a pool of long-lived SQLite connections.
+
+    Every thread gets its own connection which is opened on first use and
+    reused by all subsequent calls made on that thread.  Connections are
+    closed when their thread exits, when close() or close_all() is called,
+    or when the process exits.
+    """
+
+    # per-thread storage holding the _ThreadConnection of the current thread
+    _local = threading.local()
+
+    # (pid, connection) pairs opened by this process, so they can be closed
+    # on exit.  Connections inherited from a parent process are left alone.
+    _connections = []
+    _lock = threading.RLock()
+
+    # pid of the process which already checked the schema version
+    _migrated_pid = None
+
+    @staticmethod
+    def _connect(): #PRIVATE usage only!
+        """
+        Opens a new SQLite connection and tunes it with the PRAGMAs defined
+        in the application configuration file.
+
+        Returns
+        -------
+        A sqlite3.Connection instance.
+        """
+
+        settings = get_settings().sqlite
+        sql_db = settings.sqlite_db
+        cached_statements = settings.sqlite_cached_statements
+
+        # the connection is only ever used by the thread that opened it,
+        # but close_all() may be called from a different thread at exit.
+        conn = sqlite3.connect(sql_db,
+                               check_same_thread=False,
+                               cached_statements=cached_statements)
+
+        journal_mode = settings.sqlite_journal_mode
+        synchronous = settings.sqlite_synchronous
+        cache_size = settings.sqlite_cache_size
+
+        conn.execute("PRAGMA journal_mode = {0}".format(journal_mode))
+        conn.execute("PRAGMA synchronous = {0}".format(synchronous))
+        conn.execute("PRAGMA cache_size = {0}".format(cache_size))
+
+        logging.debug("Connected to SQLite DB [{0}] with journal_mode [{1}], "
+                      "synchronous [{2}], cache_size [{3}]"
+                      .format(sql_db, journal_mode, synchronous, cache_size))
+
+        # apply any pending schema migration once per process
+        auto_migrate = settings.sqlite_auto_migrate
+
+        if auto_migrate and SQLiteDB._migrated_pid != os.getpid():
+            with SQLiteDB._lock:
+                if SQLiteDB._migrated_pid != os.getpid():
+                    SQLiteMigrations.migrate(conn)
+                    SQLiteDB._migrated_pid = os.getpid()
+
+        return conn
+
+
+    @staticmethod
+    def connection():
+        """
+        Returns the pooled SQLite connection for the calling thread.
+
+        The connection is opened on first use.  A connection inherited
+        from a parent process (e.g., after a fork) is never reused.
+
+        Returns
+        -------
+        A sqlite3.Connection instance.
+        """
+
+        holder = getattr(SQLiteDB._local, "holder", None)
+
+        if holder is not None and holder.pid == os.getpid():
+            return holder.conn
+
+        conn = SQLiteDB._connect()
+        holder = _ThreadConnection(conn)
+
+        # the thread-local holder is released when the thread exits: its
+        # connection is then closed
+        holder.finalizer = weakref.finalize(holder, SQLiteDB._release,
+                                            holder.pid, conn)
+        SQLiteDB._local.holder = holder
+
+        with SQLiteDB._lock:
+            SQLiteDB._connections.append((holder.pid, conn))
+
+        return conn
+
+
+    @staticmethod
+    def _release(pid, conn): #PRIVATE usage only!
+        """
+        Closes the given connection of a thread, and removes it from the
+        pool.  Connections inherited from a parent process are left alone.
+        """
+
+        if pid != os.getpid():
+            return
+
+        with SQLiteDB._lock:
+            SQLiteDB._connections[:] = [item for item in SQLiteDB._connections
+                                        if item[1] is not conn]
+
+        try:
+            conn.close()
+        except sqlite3.Error as err:
+            logging.warning("Error [{0}] closing SQLite connection."
+                            .format(err))
+
+        logging.debug("Disconnected from SQLite DB")
+
+        return
+
+
+    @staticmethod
+    def close():
+        """
+        Closes the pooled SQLite connection for the calling thread, if any.
+        """
+
+        holder = getattr(SQLiteDB._local, "holder", None)
+        SQLiteDB._local.holder = None
+
+        if holder is not None:
+            holder.finalizer()
+
+        return
+
+
+    @staticmethod
+    def after_fork():
+        """
+        Resets the pool in a child process, right after a fork.  The lock
+        may have been held by another thread of the parent when it forked.
+        The inherited connections are kept referenced, but never used nor
+        closed by this process.
+        """
+
+        SQLiteDB._lock = threading.RLock()
+        SQLiteDB._local = threading.local()
+
+        return
+
+
+    @staticmethod
+    def close_all():
+        """
+        Closes all the pooled SQLite connections opened by this process.
+        This method is registered to run when the process exits.
+        """
+
+        pid = os.getpid()
+
+        with SQLiteDB._lock:
+            connections = [conn for (conn_pid, conn) in SQLiteDB._connections
+                           if conn_pid == pid]
+            del SQLiteDB._connections[:]
+
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as err:
+                logging.warning("Error [{0}] closing SQLite connection."
+                                .format(err))
+
+        SQLiteDB._local = threading.local()
+
+        logging.debug("[{0}] SQLite connections have been closed."
+                      .format(len(connections)))
+
+        return
+
+
+atexit.register(SQLiteDB.close_all)
+
+
+if __name__ == '__main__':
+    pass
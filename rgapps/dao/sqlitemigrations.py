@@ -0,0 +1,192 @@
+"""rgapps.dao.sqlitemigrations module
+
+This is where the SQLite database schema migrations are placed.
+
+The schema version of a database is recorded in its SQLite user_version
+PRAGMA.  Every migration below brings the schema from the previous version
+to its own version.  Pending migrations are applied when the first pooled
+connection is opened (if SQLITE_AUTO_MIGRATE is enabled), or by running
+this module:
+
+python -m rgapps.dao.sqlitemigrations
+"""
+import logging
+import sqlite3
+import sys
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+__all__ = ["SQLiteMigrations", "MIGRATIONS", "ROLLUP_TABLE_SQL"]
+
+
+# a rollup table holds the aggregated readings of every serial, unit and
+# time bucket (start of the bucket in epoch milliseconds).
+ROLLUP_TABLE_SQL = ("CREATE TABLE IF NOT EXISTS {0} ("
+                    "  serial      TEXT NOT NULL,"
+                    "  unit        TEXT NOT NULL,"
+                    "  bucket      INTEGER NOT NULL,"
+                    "  count       INTEGER NOT NULL,"
+                    "  sum         REAL NOT NULL,"
+                    "  min         REAL NOT NULL,"
+                    "  max         REAL NOT NULL,"
+                    "  first_utc   INTEGER NOT NULL,"
+                    "  first_value REAL NOT NULL,"
+                    "  last_utc    INTEGER NOT NULL,"
+                    "  last_value  REAL NOT NULL,"
+                    "  PRIMARY KEY (serial, unit, bucket))")
+
+
+def _rebuild_rollups(conn): #PRIVATE usage only!
+    """
+    Fills the rollup tables from the readings already stored.
+    """
+    # imported here: rgapps.dao.sqlitesensor depends on this module
+    from rgapps.dao.sqlitesensor import SQLiteSensor
+
+    SQLiteSensor.rebuild_rollups(conn)
+
+    return
+
+
+# (version, description, steps) tuples in ascending version order.  A step
+# is either a SQL statement, or a function taking the SQLite connection.
+# ATTENTION: never change a migration that has been released.  Add a new
+# one instead.
+MIGRATIONS = [
+    (1, "add covering (serial, utc) index to readings",
+     ["CREATE INDEX IF NOT EXISTS readings_serial_utc_idx "
+      "ON readings (serial, utc, unit, value)"]),
+    # a TEXT column converts stored integers to text, which would break
+    # epoch (integer) timestamps.  A NUMERIC column keeps both ISO8601 text
+    # and integers as they are given.
+    (2, "store readings utc with NUMERIC affinity",
+     ["CREATE TABLE readings_new ("
+      "  id          INTEGER PRIMARY KEY,"
+      "  unit        TEXT NOT NULL,"
+      "  value       REAL NOT NULL,"
+      "  utc         NUMERIC NOT NULL,"
+      "  serial      TEXT NOT NULL REFERENCES sensor(serial))",
+      "INSERT INTO readings_new (id, unit, value, utc, serial) "
+      "SELECT id, unit, value, utc, serial FROM readings",
+      "DROP TABLE readings",
+      "ALTER TABLE readings_new RENAME TO readings",
+      "CREATE INDEX IF NOT EXISTS readings_serial_utc_idx "
+      "ON readings (serial, utc, unit, value)"]),
+    (3, "add hourly and daily readings rollups",
+     [ROLLUP_TABLE_SQL.format("readings_1h"),
+      ROLLUP_TABLE_SQL.format("readings_1d"),
+      _rebuild_rollups]),
+]
+
+
+class SQLiteMigrations:
+    """ Class to provide the SQLite schema migration API code
+    """
+
+    @staticmethod
+    def version(conn):
+        """
+        Returns the schema version of the given database connection.
+
+        Parameters
+        ----------
+        conn:  sqlite3.Connection (required)
+            a SQLite database connection
+
+        Returns
+        -------
+        int:
+            the schema version.  0 (zero) if no migration was applied.
+        """
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+    @staticmethod
+    def latest_version():
+        """
+        Returns the schema version reached once all migrations are applied.
+        """
+        if not MIGRATIONS:
+            return 0
+
+        return MIGRATIONS[-1][0]
+
+
+    @staticmethod
+    def migrate(conn):
+        """
+        Applies all the pending migrations to the given database connection.
+
+        Every migration runs in its own transaction, which also records the
+        new schema version.  The transaction is started with an IMMEDIATE
+        lock, so that concurrent processes do not apply the same migration
+        twice.
+
+        Parameters
+        ----------
+        conn:  sqlite3.Connection (required)
+            a SQLite database connection
+
+        Returns
+        -------
+        int:
+            the schema version of the database after the migration.
+        """
+
+        for (version, description, steps) in MIGRATIONS:
+
+            if SQLiteMigrations.version(conn) >= version:
+                continue
+
+            conn.execute("BEGIN IMMEDIATE")
+
+            try:
+                # another process may have migrated in the meantime
+                if SQLiteMigrations.version(conn) >= version:
+                    conn.rollback()
+                    continue
+
+                logging.info("Migrating SQLite schema to version [{0}]: {1}"
+                             .format(version, description))
+
+                for step in steps:
+                    if callable(step):
+                        step(conn)
+                    else:
+                        conn.execute(step)
+
+                # PRAGMA does not accept bound parameters
+                conn.execute("PRAGMA user_version = {0:d}".format(version))
+                conn.commit()
+
+            except sqlite3.Error:
+                conn.rollback()
+                logging.exception("SQLite schema migration to version [{0}] "
+                                  "failed.".format(version))
+                raise
+
+        return SQLiteMigrations.version(conn)
+
+
+def run():
+    """ Applies all the pending migrations to the configured SQLite database.
+    """
+    from rgapps.dao.sqlitedb import SQLiteDB
+
+    conn = SQLiteDB.connection()
+
+    version = SQLiteMigrations.migrate(conn)
+
+    sys.stdout.write("SQLite schema is at version [{0}]\n".format(version))
+
+    return
+
+
+if __name__ == '__main__':
+    run()
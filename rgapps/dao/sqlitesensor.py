@@ -7,8 +7,11 @@ This is where all the SQLite sensor database code is placed.
 import logging
 import sqlite3
 
-from rgapps.config import ini_config
-from rgapps.utils.utility import dict_factory
+from rgapps.dao.rollup import Rollup, ROLLUPS
+from rgapps.dao.sqlitedb import SQLiteDB
+from rgapps.utils.exception import IllegalArgumentException
+from rgapps.utils.utility import dict_factory, utc_to_epoch_ms, \
+    epoch_ms_to_utc
 
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
@@ -21,6 +24,48 @@ __status__ = "Experimental"
 __all__ = ["SQLiteSensor"]
 
 
+# SQL expression returning the readings utc in epoch milliseconds, whether
+# it is stored as ISO8601 text or already as epoch milliseconds.
+UTC_MS_SQL = ("CASE WHEN typeof(utc) = 'text' "
+              "THEN CAST(ROUND((julianday(utc) - 2440587.5) * 86400000) "
+              "AS INTEGER) "
+              "ELSE utc END")
+
+# aggregate name: (value SQL expression, edge SQL expression).  The first and
+# last values are selected with a single MIN()/MAX() aggregate on the utc, in
+# which case SQLite takes the bare value column from that same row.
+AGGREGATE_SQL = {"avg": ("AVG(value)", None),
+                 "min": ("MIN(value)", None),
+                 "max": ("MAX(value)", None),
+                 "count": ("COUNT(value)", None),
+                 "first": ("value", "MIN(utc_ms)"),
+                 "last": ("value", "MAX(utc_ms)")}
+
+# creates an empty rollup row for a (serial, unit, bucket), unless it
+# exists, which is then merged with ROLLUP_UPDATE_SQL.
+ROLLUP_INSERT_SQL = ("INSERT OR IGNORE INTO {0} (serial, unit, bucket, "
+                     "count, sum, min, max, first_utc, first_value, "
+                     "last_utc, last_value) "
+                     "VALUES (:serial, :unit, :bucket, 0, 0, :min, :max, "
+                     ":first_utc, :first_value, :last_utc, :last_value)")
+
+# merges an aggregated (serial, unit, bucket) into its rollup row.  All the
+# expressions on the right-hand side see the values before the update.
+ROLLUP_UPDATE_SQL = ("UPDATE {0} SET "
+                     "count = count + :count, "
+                     "sum = sum + :sum, "
+                     "min = MIN(min, :min), "
+                     "max = MAX(max, :max), "
+                     "first_value = CASE WHEN :first_utc < first_utc "
+                     "THEN :first_value ELSE first_value END, "
+                     "first_utc = MIN(first_utc, :first_utc), "
+                     "last_value = CASE WHEN :last_utc >= last_utc "
+                     "THEN :last_value ELSE last_value END, "
+                     "last_utc = MAX(last_utc, :last_utc) "
+                     "WHERE serial = :serial AND unit = :unit "
+                     "AND bucket = :bucket")
+
+
 class SQLiteSensor:
     """ Class to provide sensor SQLite database API code
     """
@@ -45,24 +90,103 @@ class SQLiteSensor:
         -------
             nothing.
         """
-      
-        sql_db = ini_config.get("SqlLite", "SQLITE_DB")
-        conn = sqlite3.connect(sql_db)
-        logging.debug("Connected to SQLite DB [{0}]".format(sql_db))
 
-        c = conn.cursor()
-        c.execute("INSERT INTO readings (id, unit, value, utc, serial) "
-                  "VALUES (?,?,?,?,?)",
-                  (None, unit, value, utc, serial))
+        utc_ms = utc_to_epoch_ms(utc)
 
-        conn.commit()
-        logging.debug("Measurement has been committed in SQLite database")
-        conn.close()
+        conn = SQLiteDB.connection()
 
-        logging.debug("Disconnected from SQLite DB [{0}]".format(sql_db))
+        with conn:
+            conn.execute("INSERT INTO readings (id, unit, value, utc, serial) "
+                         "VALUES (?,?,?,?,?)",
+                         (None, unit, value, utc, serial))
+
+            SQLiteSensor.write_rollups(conn, [(serial, unit, value, utc_ms)])
+
+        logging.debug("Measurement has been committed in SQLite database")
 
         return
 
+    @staticmethod
+    def add_readings(readings):
+        """
+        Adds the given batch of measurements to sensor database in a single
+        transaction.
+
+        If the batch cannot be inserted as a whole, the readings are
+        inserted one by one, still in a single transaction, so that only the
+        failing readings are rejected.
+
+        Parameters
+        ----------
+        readings:  list (required)
+            list of (unit, value, utc, serial) tuples
+
+        Returns
+        -------
+        list:
+            A list of (index, error) tuples for the readings that could not
+            be inserted.  The list is empty if all readings were inserted.
+        """
+
+        sql = ("INSERT INTO readings (id, unit, value, utc, serial) "
+               "VALUES (?,?,?,?,?)")
+
+        failures = []
+
+        # (index, reading, utc_ms) of the readings with a valid utc
+        rows = []
+
+        for index, reading in enumerate(readings):
+            try:
+                rows.append((index, tuple(reading),
+                             utc_to_epoch_ms(reading[2])))
+            except IllegalArgumentException as err:
+                failures.append((index, err.msg))
+
+        conn = SQLiteDB.connection()
+
+        try:
+            with conn:
+                conn.executemany(sql, [(None,) + reading
+                                       for (_, reading, _) in rows])
+
+                SQLiteSensor.write_rollups(
+                    conn, [(serial, unit, value, utc_ms)
+                           for (_, (unit, value, _, serial), utc_ms) in rows])
+
+            logging.debug("[{0}] measurements have been committed in SQLite "
+                          "database".format(len(rows)))
+
+            return failures
+
+        except sqlite3.Error as err:
+            logging.warning("Batch of [{0}] measurements failed [{1}]. "
+                            "Inserting measurements one by one."
+                            .format(len(rows), err))
+
+        inserted = []
+
+        with conn:
+            for (index, reading, utc_ms) in rows:
+                try:
+                    conn.execute(sql, (None,) + reading)
+                except sqlite3.Error as err:
+                    failures.append((index, str(err)))
+                    continue
+
+                (unit, value, _, serial) = reading
+                inserted.append((serial, unit, value, utc_ms))
+
+            SQLiteSensor.write_rollups(conn, inserted)
+
+        failures.sort()
+
+        logging.debug("[{0}] measurements have been committed in SQLite "
+                      "database. [{1}] failed."
+                      .format(len(readings) - len(failures), len(failures)))
+
+        return failures
+
     @staticmethod
     def del_readings(serial):
         """
@@ -81,19 +205,16 @@ class SQLiteSensor:
         logging.debug("Deleting all measurements in SQLite database for "
                       "serial [{0}]".format(serial))
 
-        sql_db = ini_config.get("SqlLite", "SQLITE_DB")
-        conn = sqlite3.connect(sql_db)
-        logging.debug("Connected to SQLite DB [{0}]".format(sql_db))
+        conn = SQLiteDB.connection()
 
-        c = conn.cursor()
-        c.execute("DELETE FROM readings WHERE serial = '{0}' "
-                   .format(serial))
+        with conn:
+            conn.execute("DELETE FROM readings WHERE serial = ?", (serial,))
 
-        conn.commit()
-        logging.debug("Measurements have been deleted from SQLite database")
-        conn.close()
+            for (name, _) in ROLLUPS:
+                conn.execute("DELETE FROM {0} WHERE serial = ?".format(name),
+                             (serial,))
 
-        logging.debug("Disconnected from SQLite DB [{0}]".format(sql_db))
+        logging.debug("Measurements have been deleted from SQLite database")
 
         return
 
@@ -123,28 +244,381 @@ class SQLiteSensor:
                        "between [{1}] and [{2}] from SQLite database."
                       .format(serial, past_datetime, current_datetime))
 
-        sql = ("SELECT utc, serial, unit, value FROM readings WHERE serial = '{0}' "
-               "AND utc BETWEEN '{1}' AND '{2}' "
-               "ORDER BY utc ASC"
-               .format(serial, past_datetime, current_datetime))
+        sql = ("SELECT utc, serial, unit, value FROM readings WHERE serial = ? "
+               "AND utc BETWEEN ? AND ? "
+               "ORDER BY utc ASC")
 
-        sql_db = ini_config.get("SqlLite", "SQLITE_DB")
-        conn = sqlite3.connect(sql_db)
-        logging.debug("Connected to SQLite DB [{0}]".format(sql_db))
+        conn = SQLiteDB.connection()
 
         c = conn.cursor()
         c.row_factory = dict_factory
-        cursor = c.execute(sql)
+        cursor = c.execute(sql, (serial, past_datetime, current_datetime))
         data = cursor.fetchall()
 
-        conn.commit()
-        conn.close()
+        return data
+
+
+    @staticmethod
+    def get_readings_page(serial, current_datetime, past_datetime, limit,
+                          after=None):
+        """
+        Returns a page of readings using keyset pagination on the
+        (utc, id) ordering, so that no reading before the page is scanned.
+
+        Parameters
+        ----------
+        serial: str (required)
+            sensor unique serial number
+        current_datetime: str (required)
+            a valid UTC timestamp
+        past_datetime: str (required)
+            a valid UTC timestamp.  With after, it should be the utc of
+            after, unless older, so that the index range starts at the page.
+        limit: int (required)
+            maximum number of readings in the page
+        after: tuple (optional)
+            the (utc, id) key of the last reading of the previous page
+
+        Returns
+        -------
+        tuple:
+            The list of reading dictionaries in the page sorted by utc, and
+            the (utc, id) key of its last reading if there are more
+            readings, None otherwise.
+        """
+
+        logging.debug("Retrieving [{0}] readings after [{1}] from sensor with "
+                      "serial [{2}] between [{3}] and [{4}] from SQLite "
+                      "database."
+                      .format(limit, after, serial, past_datetime,
+                              current_datetime))
+
+        if after is None:
+            sql = ("SELECT id, utc, serial, unit, value FROM readings "
+                   "WHERE serial = ? AND utc BETWEEN ? AND ? "
+                   "ORDER BY utc ASC, id ASC LIMIT ?")
+            params = (serial, past_datetime, current_datetime, limit + 1)
+        else:
+            (after_utc, after_id) = after
+
+            try:
+                after_id = int(after_id)
+            except (TypeError, ValueError):
+                raise IllegalArgumentException("cursor id [{0}] is not valid"
+                                               .format(after_id))
+
+            # together with a past_datetime not older than the previous
+            # page, (utc > ? OR id > ?) is the (utc, id) > (?, ?) keyset
+            # condition.
+            sql = ("SELECT id, utc, serial, unit, value FROM readings "
+                   "WHERE serial = ? AND utc BETWEEN ? AND ? "
+                   "AND (utc > ? OR id > ?) "
+                   "ORDER BY utc ASC, id ASC LIMIT ?")
+            params = (serial, past_datetime, current_datetime, after_utc,
+                      after_id, limit + 1)
+
+        conn = SQLiteDB.connection()
+
+        c = conn.cursor()
+        c.row_factory = dict_factory
+        cursor = c.execute(sql, params)
+        data = cursor.fetchall()
+
+        next_key = None
+        if len(data) > limit:
+            data = data[:limit]
+            next_key = (data[-1]["utc"], data[-1]["id"])
+
+        for reading in data:
+            del reading["id"]
+
+        return (data, next_key)
+
+
+    @staticmethod
+    def iter_readings(serial, current_datetime, past_datetime):
+        """
+        Returns a generator over the readings of the given sensor.  The
+        rows are stepped through by the SQLite cursor as they are consumed.
+
+        Parameters
+        ----------
+        serial: str (required)
+            sensor unique serial number
+        current_datetime: str (required)
+            a valid UTC timestamp
+        past_datetime: str (required)
+            a valid UTC timestamp
+
+        Returns
+        -------
+        generator:
+            A generator of reading dictionaries containing column names as
+            keys, and corresponding values, sorted by utc.
+        """
+
+        logging.debug("Streaming readings from sensor with serial [{0}] "
+                      "between [{1}] and [{2}] from SQLite database."
+                      .format(serial, past_datetime, current_datetime))
+
+        sql = ("SELECT utc, serial, unit, value FROM readings WHERE serial = ? "
+               "AND utc BETWEEN ? AND ? "
+               "ORDER BY utc ASC")
+
+        conn = SQLiteDB.connection()
+
+        c = conn.cursor()
+        c.row_factory = dict_factory
+        cursor = c.execute(sql, (serial, past_datetime, current_datetime))
+
+        try:
+            for reading in cursor:
+                yield reading
+        finally:
+            cursor.close()
+
+
+    @staticmethod
+    def get_aggregated_readings(serial, current_datetime, past_datetime,
+                                bucket_ms, aggregate):
+        """
+        Returns the readings downsampled into time buckets.
+
+        Parameters
+        ----------
+        serial: str (required)
+            sensor unique serial number
+        current_datetime: str or int (required)
+            a valid UTC timestamp as stored in the database
+        past_datetime: str or int (required)
+            a valid UTC timestamp as stored in the database
+        bucket_ms: int (required)
+            the size of the time buckets in milliseconds
+        aggregate: str (required)
+            a valid AGGREGATE_ENUM name applied to the values of each bucket
+
+        Returns
+        -------
+        list:
+            A list of dictionaries with the "utc" of the start of the bucket
+            in epoch milliseconds, the "serial", "unit" and aggregated
+            "value", sorted by utc.
+        """
+
+        logging.debug("Retrieving [{0}] readings in buckets of [{1}] ms "
+                      "from sensor with serial [{2}] between [{3}] and [{4}] "
+                      "from SQLite database."
+                      .format(aggregate, bucket_ms, serial, past_datetime,
+                              current_datetime))
+
+        (value_sql, edge_sql) = AGGREGATE_SQL[aggregate]
 
-        logging.debug("Disconnected from SQLite DB [{0}]".format(sql_db))
+        edge_column = ""
+        if edge_sql is not None:
+            edge_column = ", {0} AS edge".format(edge_sql)
+
+        sql = ("SELECT (utc_ms / ?) * ? AS utc, serial, unit, "
+               "{0} AS value{1} "
+               "FROM (SELECT {2} AS utc_ms, serial, unit, value "
+               "      FROM readings WHERE serial = ? "
+               "      AND utc BETWEEN ? AND ?) "
+               "GROUP BY 1, unit "
+               "ORDER BY 1 ASC"
+               .format(value_sql, edge_column, UTC_MS_SQL))
+
+        conn = SQLiteDB.connection()
+
+        c = conn.cursor()
+        c.row_factory = dict_factory
+        cursor = c.execute(sql, (bucket_ms, bucket_ms, serial, past_datetime,
+                                 current_datetime))
+        data = cursor.fetchall()
+
+        for reading in data:
+            reading.pop("edge", None)
 
         return data
 
 
+    @staticmethod
+    def get_rollups(serial, first_bucket, last_bucket, rollup):
+        """
+        Returns the aggregated buckets of a rollup table.
+
+        Parameters
+        ----------
+        serial: str (required)
+            sensor unique serial number
+        first_bucket: int (required)
+            start of the first bucket in epoch milliseconds
+        last_bucket: int (required)
+            start of the last bucket in epoch milliseconds
+        rollup: str (required)
+            the name of the rollup table as defined in ROLLUPS
+
+        Returns
+        -------
+        list:
+            A list of (serial, unit, bucket, [count, sum, min, max,
+            first_utc, first_value, last_utc, last_value]) tuples, sorted by
+            bucket.
+        """
+
+        logging.debug("Retrieving buckets between [{0}] and [{1}] from sensor "
+                      "with serial [{2}] from SQLite rollup [{3}]."
+                      .format(first_bucket, last_bucket, serial, rollup))
+
+        if rollup not in dict(ROLLUPS):
+            raise IllegalArgumentException("rollup [{0}] is not valid"
+                                           .format(rollup))
+
+        sql = ("SELECT serial, unit, bucket, count, sum, min, max, "
+               "first_utc, first_value, last_utc, last_value "
+               "FROM {0} WHERE serial = ? AND bucket BETWEEN ? AND ? "
+               "ORDER BY bucket ASC".format(rollup))
+
+        conn = SQLiteDB.connection()
+
+        rows = conn.execute(sql, (serial, first_bucket, last_bucket))
+
+        return [(row[0], row[1], row[2], list(row[3:])) for row in rows]
+
+
+    @staticmethod
+    def write_rollups(conn, readings):
+        """
+        Merges the given readings into all the rollup tables.  This method
+        does not commit; it is meant to run in the transaction adding the
+        readings.
+
+        Parameters
+        ----------
+        conn:  sqlite3.Connection (required)
+            a SQLite database connection
+        readings: list (required)
+            (serial, unit, value, utc_ms) tuples, where utc_ms is the
+            reading UTC timestamp in epoch milliseconds
+        """
+
+        if not readings:
+            return
+
+        for (name, rollup_ms) in ROLLUPS:
+            rows = [{"serial": serial, "unit": unit, "bucket": bucket,
+                     "count": entry[0], "sum": entry[1],
+                     "min": entry[2], "max": entry[3],
+                     "first_utc": entry[4], "first_value": entry[5],
+                     "last_utc": entry[6], "last_value": entry[7]}
+                    for ((serial, unit, bucket), entry)
+                    in Rollup.aggregate(readings, rollup_ms).items()]
+
+            conn.executemany(ROLLUP_INSERT_SQL.format(name), rows)
+            conn.executemany(ROLLUP_UPDATE_SQL.format(name), rows)
+
+        return
+
+
+    @staticmethod
+    def rebuild_rollups(conn=None):
+        """
+        Rebuilds all the rollup tables from the stored readings.
+
+        Parameters
+        ----------
+        conn:  sqlite3.Connection (optional)
+            a SQLite database connection.  Defaults to the pooled connection
+            of the calling thread, in which case the rebuild is committed.
+
+        Returns
+        -------
+        int:
+            the number of readings rolled up.
+        """
+
+        commit = conn is None
+
+        if conn is None:
+            conn = SQLiteDB.connection()
+
+        for (name, _) in ROLLUPS:
+            conn.execute("DELETE FROM {0}".format(name))
+
+        sql = ("SELECT serial, unit, value, {0} FROM readings"
+               .format(UTC_MS_SQL))
+
+        count = 0
+        cursor = conn.execute(sql)
+
+        while True:
+            readings = cursor.fetchmany(10000)
+
+            if not readings:
+                break
+
+            SQLiteSensor.write_rollups(conn, readings)
+            count += len(readings)
+
+        if commit:
+            conn.commit()
+
+        logging.debug("[{0}] readings have been rolled up in SQLite database"
+                      .format(count))
+
+        return count
+
+
+    @staticmethod
+    def convert_readings_utc(epoch):
+        """
+        Converts the utc of all stored readings to the given format.
+
+        Parameters
+        ----------
+        epoch: bool (required)
+            True to convert ISO8601 text timestamps to epoch milliseconds;
+            False to convert epoch milliseconds to ISO8601 text timestamps.
+
+        Returns
+        -------
+        int:
+            the number of converted readings.
+        """
+
+        if epoch:
+            where = "typeof(utc) = 'text'"
+            convert = utc_to_epoch_ms
+        else:
+            where = "typeof(utc) IN ('integer', 'real')"
+            convert = epoch_ms_to_utc
+
+        sql = ("SELECT id, utc FROM readings WHERE id > ? AND {0} "
+               "ORDER BY id LIMIT 1000".format(where))
+
+        conn = SQLiteDB.connection()
+
+        count = 0
+        last_id = -1
+
+        while True:
+            rows = conn.execute(sql, (last_id,)).fetchall()
+
+            if not rows:
+                break
+
+            with conn:
+                conn.executemany("UPDATE readings SET utc = ? WHERE id = ?",
+                                 [(convert(utc), row_id)
+                                  for (row_id, utc) in rows])
+
+            count += len(rows)
+            last_id = rows[-1][0]
+
+        logging.debug("[{0}] readings utc have been converted in SQLite "
+                      "database".format(count))
+
+        return count
+
+
     @staticmethod
     def add_sensor(serial, geolocation, location, address, state, name,
                     sensor_type, description):
@@ -179,23 +653,16 @@ class SQLiteSensor:
                       "serial [{0}], state [{1}], name [{2}], type [{3}]"
                       .format(serial, state, name, sensor_type))
 
-        sql_db = ini_config.get("SqlLite", "SQLITE_DB")
-        conn = sqlite3.connect(sql_db)
-        logging.debug("Connected to SQLite DB [{0}]".format(sql_db))
-
-        c = conn.cursor()
+        conn = SQLiteDB.connection()
 
-        c.execute("INSERT INTO sensor ( serial, geolocation, location, "
-                    " address, state, name, type, description ) "
-                  "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                  (serial, geolocation, location, address, state, name,
-                    sensor_type, description))
+        with conn:
+            conn.execute("INSERT INTO sensor ( serial, geolocation, location, "
+                           " address, state, name, type, description ) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (serial, geolocation, location, address, state, name,
+                           sensor_type, description))
 
-        conn.commit()
         logging.debug("sensor has been committed in database")
-        conn.close()
-
-        logging.debug("Disconnected from SQLite DB [{0}]".format(sql_db))
 
         return
 
@@ -218,19 +685,12 @@ class SQLiteSensor:
         logging.debug("Deleting sensor in database for "
                       "serial [{0}]".format(serial))
 
-        sql_db = ini_config.get("SqlLite", "SQLITE_DB")
-        conn = sqlite3.connect(sql_db)
-        logging.debug("Connected to SQLite DB [{0}]".format(sql_db))
+        conn = SQLiteDB.connection()
 
-        c = conn.cursor()
-        c.execute("DELETE FROM sensor WHERE serial = '{0}' "
-                   .format(serial))
+        with conn:
+            conn.execute("DELETE FROM sensor WHERE serial = ?", (serial,))
 
-        conn.commit()
         logging.debug("Sensor has been deleted from database")
-        conn.close()
-
-        logging.debug("Disconnected from SQLite DB [{0}]".format(sql_db))
 
         return
 
@@ -256,20 +716,35 @@ class SQLiteSensor:
         logging.debug("Retrieving sensor with serial [{0}] from database."
                       .format(serial))
 
-        sql_db = ini_config.get("SqlLite", "SQLITE_DB")
-        conn = sqlite3.connect(sql_db)
-        logging.debug("Connected to SQLite DB [{0}]".format(sql_db))
+        conn = SQLiteDB.connection()
 
         c = conn.cursor()
         c.row_factory = dict_factory
-        cursor = c.execute(("SELECT * FROM sensor WHERE serial = '{0}'"
-                             .format(serial)))
+        cursor = c.execute("SELECT * FROM sensor WHERE serial = ?", (serial,))
         data = cursor.fetchone()
 
-        conn.commit()
-        conn.close()
+        return data
 
-        logging.debug("Disconnected from SQLite DB [{0}]".format(sql_db))
 
-        return data
+    @staticmethod
+    def exists(serial):
+        """
+        Checks if a sensor with the given serial is registered.
+
+        Parameters
+        ----------
+        serial: str (required)
+            sensor unique serial number
+
+        Returns
+        -------
+        bool:
+            True if the sensor is registered.
+        """
+
+        conn = SQLiteDB.connection()
+
+        cursor = conn.execute("SELECT 1 FROM sensor WHERE serial = ? LIMIT 1",
+                              (serial,))
 
+        return cursor.fetchone() is not None
@@ -6,10 +6,9 @@ placed.
 import logging
 
 import arrow
-from pint.unit import UnitRegistry
 from w1thermsensor import (W1ThermSensor)
 
-from rgapps.config import ini_config
+from rgapps.config import get_settings
 from rgapps.domain.sensor import Sensor, Measurement
 from rgapps.utils.enums import TEMPERATURE_ENUM, UNIT_TYPES_ENUM
 from rgapps.utils.exception import IllegalArgumentException
@@ -55,7 +54,7 @@ class DS18B20Sensor (Sensor):
     def get_measurement(self):
         """ concrete implementation of abstract method in Sensor
         """
-        is_testing = ini_config.getboolean("Flask", "TESTING")
+        is_testing = get_settings().flask.testing
         if is_testing is True:
             logging.debug("Using a testing temperature from sensor [{0}]."
                           .format(self.serial))
@@ -71,17 +70,12 @@ class DS18B20Sensor (Sensor):
         logging.debug("Sensor temperature in [{0}] is [{1}]"
                        .format(DEFAULT_TEMPERATURE_UNIT.name, temperature))
 
-        # use pint to represent temperature
-        unit_reg = UnitRegistry(autoconvert_offset_to_baseunit=True)
-
-        temperature_qty = temperature * unit_reg(DEFAULT_TEMPERATURE_UNIT.name)
-
         # restrict results to 2 decimal places.
-        decimals = decimal_places(temperature_qty.magnitude)
+        decimals = decimal_places(temperature)
         if(decimals > 2):
-            temperature_result = round(temperature_qty.magnitude, 2)
+            temperature_result = round(temperature, 2)
         else:
-            temperature_result = temperature_qty.magnitude
+            temperature_result = temperature
 
 
 
@@ -116,9 +110,9 @@ class DS18B20Sensor (Sensor):
                            "convert [{1}] to degK"
                           .format(serial, degF_temperature))
             temperature = convert_unit(UNIT_TYPES_ENUM.temperature,
-                                       TEMPERATURE_ENUM.degF,
-                                       temperature,
-                                       TEMPERATURE_ENUM.degK)
+                                       TEMPERATURE_ENUM.degF.name,
+                                       degF_temperature,
+                                       TEMPERATURE_ENUM.degK.name)
         elif (DEFAULT_TEMPERATURE_UNIT == TEMPERATURE_ENUM.degF):
             temperature = ds18b20Sensor.get_temperature(
                 W1ThermSensor.DEGREES_F)
@@ -13,7 +13,7 @@ import smtplib
 
 from validate_email import validate_email
 
-from rgapps.config import ini_config
+from rgapps.config import get_settings
 from rgapps.utils.exception import IllegalArgumentException
 from rgapps.utils.utility import is_blank
 
@@ -59,7 +59,8 @@ class EMail:
             raise IllegalArgumentException("recipient is required.")
 
         # ensure valid GMail Account
-        gmail_account = ini_config.get("Email", "GMAIL_ACCOUNT")
+        settings = get_settings().email
+        gmail_account = settings.gmail_account
         is_valid = validate_email(gmail_account)
 
         if(not is_valid):
@@ -67,8 +68,8 @@ class EMail:
                 "GMail Account [{0}] is not valid email address"
                 .format(gmail_account))
 
-        gmail_user = ini_config.get("Email", "GMAIL_ACCOUNT")
-        gmail_password = ini_config.get("Email", "GMAIL_PASSWORD")
+        gmail_user = settings.gmail_account
+        gmail_password = settings.gmail_password
 
         logging.debug("Sending email using Gmail account [{0}]  "
                       "to recipient [{1}]"
@@ -2,13 +2,12 @@
 
 This module defines Product related functionality.
 """
+from functools import lru_cache
+from importlib import metadata
+import logging
 import os
-import re
 import time
 
-import pip
-import pkg_resources
-
 from rgapps.utils.constants import PROJECT_NAME
 
 
@@ -22,37 +21,50 @@ __status__ = "Experimental"
 __all__ = ["Product"]
 
 
+@lru_cache(maxsize=None)
+def _distribution(): #PRIVATE usage only!
+    """ Returns the (project name, version, install date) of the installed
+    distribution, resolved on first use.  The install date is the creation
+    time of the distribution metadata.  The version and date are None if the
+    project is not installed (e.g., when run from a source checkout).
+    """
+    try:
+        dist = metadata.distribution(PROJECT_NAME)
+    except metadata.PackageNotFoundError:
+        logging.warning("distribution [{0}] is not installed"
+                        .format(PROJECT_NAME))
+        return (PROJECT_NAME, None, None)
+
+    date = None
+    for path in dist.files or ():
+        if path.name in ("METADATA", "PKG-INFO"):
+            date = time.ctime(os.path.getctime(dist.locate_file(path)))
+            break
+
+    return (dist.metadata["Name"], dist.version, date)
+
+
 class Product:
     """ A class placeholder for product related information
     """
     author = __author__
     copyright = __copyright__
     contact = __email__
-    dist = pkg_resources.get_distribution(PROJECT_NAME)
-    project_name = dist.project_name
-    version = dist.version
-
-    date = None
-    pattern = re.compile(project_name + "*", re.IGNORECASE)
-    for package in pip.get_installed_distributions():
-        if pattern.match(package.key):
-            date = time.ctime(os.path.getctime(package.location))
-            break
 
     @staticmethod
     def get_project_name():
         # return the project name
-        return Product.project_name
+        return _distribution()[0]
 
     @staticmethod
     def get_version():
         # return the project current version
-        return Product.version
+        return _distribution()[1]
 
     @staticmethod
     def get_date():
-        # return the project current version
-        return Product.date
+        # return the project install date
+        return _distribution()[2]
 
     @staticmethod
     def get_author():
@@ -5,7 +5,8 @@ This module contains the REST API source code for length conversions.
 
 from rgapps.utils.enums import UNIT_TYPES_ENUM
 from rgapps.utils.exception import IllegalArgumentException
-from rgapps.utils.utility import is_number, is_blank, convert_unit
+from rgapps.utils.utility import is_number, is_blank, convert_unit, \
+    convert_values, resolve_unit
 
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
@@ -42,7 +43,7 @@ class Length:
             the converted value
 
         """
-        if not is_number(from_value):
+        if not is_number(str(from_value)):
             raise IllegalArgumentException(
                 ("Parameter from_value=[{0}] not valid. "
                  "A numeric value must be provided.").format(from_value))
@@ -57,19 +58,43 @@ class Length:
                 ("Parameter to_unit=[{0}] not valid. A unit be provided.")
                 .format(to_unit))
 
+        from_unit = resolve_unit(from_unit, UNIT_TYPES_ENUM.length)
+        to_unit = resolve_unit(to_unit, UNIT_TYPES_ENUM.length)
+
         if from_unit == to_unit:
             raise IllegalArgumentException(
                 ("from_unit=[{0}] and to_unit=[{1}] units cannot be equal")
                 .format(from_unit, to_unit))
 
-        # pint unit registry only accepts lower case letters for length units
-        from_unit = from_unit.lower().strip()
-        to_unit = to_unit.lower().strip()
-
         result = convert_unit(UNIT_TYPES_ENUM.length, from_unit,
                               from_value, to_unit)
         return result
 
 
+    @staticmethod
+    def convert_many(from_values, from_unit, to_unit):
+        """convert many length values at once.
+
+        The conversion factor is resolved once, and applied to all values
+        (see rgapps.utils.utility.convert_values).
+
+        Parameters
+        ----------
+        from_values:  list or numpy.ndarray (required)
+            numeric values
+        from_unit:  str (required)
+            length unit
+        to_unit:  str (required)
+            length unit
+
+        Returns
+        -------
+        list or numpy.ndarray:
+            the converted values in the order given
+        """
+        return convert_values(UNIT_TYPES_ENUM.length, from_values, from_unit,
+                              to_unit)
+
+
 if __name__ == "__main__":
     pass
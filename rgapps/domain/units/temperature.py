@@ -5,7 +5,8 @@ This module contains the temperature conversions.
 
 from rgapps.utils.enums import UNIT_TYPES_ENUM
 from rgapps.utils.exception import IllegalArgumentException
-from rgapps.utils.utility import is_number, is_blank, convert_unit
+from rgapps.utils.utility import is_number, is_blank, convert_unit, \
+    convert_units, convert_values, resolve_unit
 
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
@@ -18,6 +19,51 @@ __status__ = "Experimental"
 __all__ = ["Temperature"]
 
 
+# number of readings converted at once by Temperature.convert_readings
+CONVERT_BATCH_SIZE = 500
+
+
+def _convert_readings(readings, to_unit): #PRIVATE usage only!
+    """ Generates the given readings converted to to_unit, in batches.
+    """
+    batch = []
+
+    for reading in readings:
+        batch.append(reading)
+
+        if len(batch) >= CONVERT_BATCH_SIZE:
+            yield from _convert_batch(batch, to_unit)
+            batch = []
+
+    if batch:
+        yield from _convert_batch(batch, to_unit)
+
+
+def _convert_batch(batch, to_unit): #PRIVATE usage only!
+    """ Converts the values of a batch of readings to to_unit in place, one
+    conversion per stored unit.
+    """
+    by_unit = dict()
+
+    for reading in batch:
+        by_unit.setdefault(reading["unit"], []).append(reading)
+
+    for (unit, readings) in by_unit.items():
+        from_unit = resolve_unit(unit, UNIT_TYPES_ENUM.temperature)
+
+        if from_unit != to_unit:
+            values = convert_units(UNIT_TYPES_ENUM.temperature, from_unit,
+                                   [reading["value"] for reading in readings],
+                                   to_unit)
+
+            for (reading, value) in zip(readings, values):
+                reading["value"] = value
+
+        for reading in readings:
+            reading["unit"] = to_unit
+
+    return batch
+
 
 class Temperature:
     """to convert temperatures
@@ -41,7 +87,7 @@ class Temperature:
         float:
             the converted value
         """
-        if not is_number(from_value):
+        if not is_number(str(from_value)):
             raise IllegalArgumentException(
                 ("Parameter from_value=[{0}] not valid. "
                  "A numeric value must be provided.").format(from_value))
@@ -56,33 +102,78 @@ class Temperature:
                 ("Parameter to_unit=[{0}] not valid. A unit be provided.")
                 .format(to_unit))
 
+        from_unit = resolve_unit(from_unit, UNIT_TYPES_ENUM.temperature)
+        to_unit = resolve_unit(to_unit, UNIT_TYPES_ENUM.temperature)
+
         if from_unit == to_unit:
             raise IllegalArgumentException(
                 ("from_unit=[{0}] and to_unit=[{1}] units cannot be equal")
                 .format(from_unit, to_unit))
 
-        # pint temperature units need to be lower-cased or degC, degF, degK
-        from_unit = from_unit.lower().strip()
-        if from_unit == "degc":
-            from_unit = "degC"
-        elif from_unit == "degf":
-            from_unit = "degF"
-        elif from_unit == "degk":
-            from_unit = "degK"
-
-        # pint temperature units need to be lower-cased or degC, degF, degK
-        to_unit = to_unit.lower().strip()
-        if to_unit == "degc":
-            to_unit = "degC"
-        elif to_unit == "degf":
-            to_unit = "degF"
-        elif to_unit == "degk":
-            to_unit = "degK"
-
         result = convert_unit(UNIT_TYPES_ENUM.temperature, from_unit,
                               from_value, to_unit)
         return result
 
 
+    @staticmethod
+    def convert_many(from_values, from_unit, to_unit):
+        """convert many temperature values at once.
+
+        The conversion factor is resolved once, and applied to all values
+        (see rgapps.utils.utility.convert_values).
+
+        Parameters
+        ----------
+        from_values:  list or numpy.ndarray (required)
+            numeric values
+        from_unit:  str (required)
+            temperature unit
+        to_unit:  str (required)
+            temperature unit
+
+        Returns
+        -------
+        list or numpy.ndarray:
+            the converted values in the order given
+        """
+        return convert_values(UNIT_TYPES_ENUM.temperature, from_values, from_unit,
+                              to_unit)
+
+
+    @staticmethod
+    def convert_readings(readings, to_unit):
+        """convert the values of sensor readings to the given unit.
+
+        The readings are converted in batches, with one conversion factor
+        per stored unit, as they are consumed.  So that an iterator over
+        the readings of a database cursor is never read all at once.
+
+        Parameters
+        ----------
+        readings:  iterable (required)
+            readings dictionaries with the "unit" and "value" keys
+        to_unit:  str (required)
+            temperature unit (e.g., degC, degF or degK)
+
+        Returns
+        -------
+        iterator:
+            the readings, updated in place with the converted value and
+            to_unit, in the order given
+
+        Raises
+        ------
+        IllegalArgumentException if to_unit is not valid.
+        """
+        if is_blank(to_unit):
+            raise IllegalArgumentException(
+                ("Parameter to_unit=[{0}] not valid. A unit be provided.")
+                .format(to_unit))
+
+        to_unit = resolve_unit(to_unit, UNIT_TYPES_ENUM.temperature)
+
+        return _convert_readings(readings, to_unit)
+
+
 if __name__ == "__main__":
     pass
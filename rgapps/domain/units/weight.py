@@ -6,7 +6,8 @@ This module contains source code for weight conversion.
 
 from rgapps.utils.enums import UNIT_TYPES_ENUM
 from rgapps.utils.exception import IllegalArgumentException
-from rgapps.utils.utility import is_number, is_blank, convert_unit
+from rgapps.utils.utility import is_number, is_blank, convert_unit, \
+    convert_values, resolve_unit
 
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
@@ -43,7 +44,7 @@ class Weight:
 
         """
 
-        if not is_number(from_value):
+        if not is_number(str(from_value)):
             raise IllegalArgumentException(
                 ("Parameter from_value=[{0}] not valid. "
                  "A numeric value must be provided.").format(from_value))
@@ -58,19 +59,43 @@ class Weight:
                 ("Parameter to_unit=[{0}] not valid. A unit be provided.")
                 .format(to_unit))
 
+        from_unit = resolve_unit(from_unit, UNIT_TYPES_ENUM.mass)
+        to_unit = resolve_unit(to_unit, UNIT_TYPES_ENUM.mass)
+
         if from_unit == to_unit:
             raise IllegalArgumentException(
                 ("from_unit=[{0}] and to_unit=[{1}] units cannot be equal")
                 .format(from_unit, to_unit))
 
-        # pint unit registry only accepts lower case letters for mass units
-        from_unit = from_unit.lower().strip()
-        to_unit = to_unit.lower().strip()
-
         result = convert_unit(UNIT_TYPES_ENUM.mass, from_unit,
                               from_value, to_unit)
         return result
 
 
+    @staticmethod
+    def convert_many(from_values, from_unit, to_unit):
+        """convert many mass values at once.
+
+        The conversion factor is resolved once, and applied to all values
+        (see rgapps.utils.utility.convert_values).
+
+        Parameters
+        ----------
+        from_values:  list or numpy.ndarray (required)
+            numeric values
+        from_unit:  str (required)
+            mass unit
+        to_unit:  str (required)
+            mass unit
+
+        Returns
+        -------
+        list or numpy.ndarray:
+            the converted values in the order given
+        """
+        return convert_values(UNIT_TYPES_ENUM.mass, from_values, from_unit,
+                              to_unit)
+
+
 if __name__ == "__main__":
     pass
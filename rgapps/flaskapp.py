@@ -6,10 +6,9 @@ from settings defined in the application configuration INI file.
 import logging
 import sys
 
-from flask import Flask
-
-from rgapps.config import ini_config
-from rgapps.http.routes import setup_routes
+from rgapps.appfactory import create_app
+from rgapps.config import get_settings
+from rgapps.config.settings import install_sighup_handler
 
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
@@ -27,45 +26,30 @@ def run():
 
     try:
 
-        instance_path = ini_config.get("Flask", "INSTANCE_PATH")
-
         # app: Flask application object
         global globalFlaskApp
-        globalFlaskApp = Flask(__name__,
-                                instance_path=instance_path,
-                                instance_relative_config=True)
-
-        is_debug = ini_config.getboolean("Flask", "DEBUG")
-        is_testing = ini_config.getboolean("Flask", "TESTING")
-        is_json_sort_keys = ini_config.getboolean("Flask", "JSON_SORT_KEYS")
-        max_content_length = ini_config.getint("Flask", "MAX_CONTENT_LENGTH")
+        globalFlaskApp = create_app()
 
-        globalFlaskApp.config.update(DEBUG=is_debug,
-                                      TESTING=is_testing,
-                                      JSON_SORT_KEYS=is_json_sort_keys,
-                                      MAX_CONTENT_LENGTH=max_content_length)
+        settings = get_settings().flask
 
         with globalFlaskApp.app_context():
             logging.info("Code is now running within a Flask app context.")
 
-            logging.info("Defining the application routing.")
-            setup_routes()
-
-            logging.info("Setting up the Flask functions.")
-            import rgapps.http.flaskfunctions
-
-            port = ini_config.getint("Flask", "PORT")
+            port = settings.port
 
             logging.info("Starting flaskapis at localhost port [{0}]"
                           .format(port))
 
-            host = ini_config.get("Flask", "HOST")
+            host = settings.host
+
+            # kill -HUP reloads the settings read per use
+            install_sighup_handler()
 
             logging.info("Start running Flask app.")
 
             globalFlaskApp.run(host=host,
                                 port=port,
-                                debug=is_debug,
+                                debug=settings.debug,
                                 use_reloader=True)
 
     except (Exception) as err:
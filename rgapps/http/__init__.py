@@ -5,7 +5,12 @@ like routes, HTTP exception handlers, REST resources.
 
 Modules:
 -------
+cache: a module to cache the rendered read-only responses
+compression: a module to compress the response bodies
 errors: a module to place error handlers
+jsonprovider: a module to serialize the JSON response bodies
+jsonstream: a module to stream large JSON response bodies
+requestlog: a module to log the HTTP requests
 routes: a module to define the HTTP routes
 wsgi: a module that implements the Apache WSGI code.
 
@@ -19,7 +24,7 @@ import logging
 from flask.globals import request
 from werkzeug.exceptions import Unauthorized
 
-from rgapps.config import ini_config
+from rgapps.config import get_settings
 
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
@@ -29,7 +34,8 @@ __maintainer__ = "Rubens Gomes"
 __email__ = "rubens.s.gomes@gmail.com"
 __status__ = "Experimental"
 
-__all__ = ["errors", "routes", "wsgi", "http_basic_authenticate"]
+__all__ = ["cache", "compression", "errors", "jsonprovider", "jsonstream",
+           "requestlog", "routes", "wsgi", "http_basic_authenticate"]
 
 def __basicAuthentication():
     """This is a private helper method used by the http_basic_authenticate.
@@ -39,8 +45,9 @@ def __basicAuthentication():
                   "using Authorization [{0}]"
                   .format(auth))
 
-    valid_username = ini_config.get("Sensor", "SENSOR_REST_API_USERNAME")
-    valid_password = ini_config.get("Sensor", "SENSOR_REST_API_PASSWORD")
+    settings = get_settings().sensor
+    valid_username = settings.sensor_rest_api_username
+    valid_password = settings.sensor_rest_api_password
 
     if not auth:
         logging.debug("HTTP Basic Authentication header not found.")
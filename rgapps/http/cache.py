@@ -0,0 +1,185 @@
+"""rgapps.http.cache module
+
+This is where the HTTP responses cache code is placed.
+
+The JSON bodies rendered by the read-only REST resources decorated with
+cached() are kept in an in-process LRU cache, keyed by the request path and
+its normalized query string.  The responses carry a strong ETag, a
+Last-Modified date and a Cache-Control header, and conditional requests
+(If-None-Match or If-Modified-Since) are answered with 304 Not Modified.
+
+The cache is set up by setup_cache(), called by setup_routes, and every
+Flask app has its own.  Entries of a sensor are invalidated when the sensor
+is added or deleted through the SensorDAO.  Notice that every process has
+its own caches.
+"""
+from functools import wraps
+import hashlib
+import logging
+from urllib.parse import urlencode
+import weakref
+
+import arrow
+from flask import current_app, request, Response
+
+from rgapps.config import get_settings
+from rgapps.http.compression import ETAG_SUFFIXES
+from rgapps.utils.cache import LRUCache
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+__all__ = ["cached", "setup_cache", "invalidate", "RESPONSE_CACHES"]
+
+
+# the caches of rendered responses of the Flask apps: (path, query) ->
+# (body, mimetype, etag, last_modified, tag)
+RESPONSE_CACHES = weakref.WeakSet()
+
+# key of the cache in the Flask app extensions.  None if the responses of
+# the app are not cached.
+EXTENSION = "rgapps.cache"
+
+
+def setup_cache(settings=None):
+    """ Creates the responses cache of the current Flask app, sized by the
+    REST RESPONSE_CACHE_SIZE configuration.  A size of 0 (zero) disables
+    the cache.  The entries expire after RESPONSE_CACHE_TTL seconds, so that
+    changes not made through the SensorDAO of this process are eventually
+    seen.
+
+    Parameters
+    ----------
+    settings: Settings (optional)
+        the application settings.  Defaults to get_settings().
+
+    Returns
+    -------
+    LRUCache:
+        the responses cache, or None if disabled.
+    """
+    # imported here: the units resources do not otherwise need the DAO
+    from rgapps.dao.sensordao import SensorDAO
+
+    settings = (settings or get_settings()).rest
+    size = settings.response_cache_size
+    ttl = settings.response_cache_ttl
+
+    if size <= 0:
+        current_app.extensions[EXTENSION] = None
+        logging.info("HTTP responses cache is disabled")
+        return None
+
+    cache = LRUCache(size, ttl if ttl > 0 else None)
+    current_app.extensions[EXTENSION] = cache
+    RESPONSE_CACHES.add(cache)
+    SensorDAO.add_sensor_listener(invalidate)
+
+    logging.info("HTTP responses cache of [{0}] entries, with a TTL of [{1}] "
+                 "seconds, is enabled".format(size, ttl))
+    return cache
+
+
+def invalidate(tag):
+    """ Removes the cached responses of the given tag (e.g., a sensor
+    serial).
+
+    Parameters
+    ----------
+    tag: str (required)
+        the tag of the responses given to cached()
+    """
+    count = 0
+    for cache in list(RESPONSE_CACHES):
+        count += cache.invalidate(lambda key, entry: entry[4] == tag)
+
+    logging.debug("[{0}] cached responses of [{1}] invalidated"
+                  .format(count, tag))
+    return
+
+
+def _cache_key(): #PRIVATE usage only!
+    """ Returns the cache key of the current request.  The query parameters
+    are sorted by name; the order of the values of a repeated parameter is
+    kept.
+    """
+    query = urlencode(sorted(request.args.lists()), doseq=True)
+
+    return (request.path, query)
+
+
+def cached(max_age, tag=None):
+    """ Returns a decorator, for the get method of a flask-restful Resource,
+    caching the rendered response.
+
+    Only the 200 OK non-streamed responses are cached.  Errors raised by
+    the decorated method are not.
+
+    Parameters
+    ----------
+    max_age: int (required)
+        the Cache-Control max-age in seconds
+    tag: str (optional)
+        name of the keyword argument of the decorated method (e.g., serial)
+        whose value tags the cached responses, so that they can be
+        invalidated.
+    """
+    def decorator(func):
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get(EXTENSION)
+            if cache is None:
+                return func(*args, **kwargs)
+
+            key = _cache_key()
+            entry = cache.get(key)
+
+            if entry is None:
+                response = func(*args, **kwargs)
+
+                if not isinstance(response, Response) \
+                        or response.status_code != 200 \
+                        or response.is_streamed:
+                    return response
+
+                body = response.get_data()
+                etag = hashlib.sha1(body).hexdigest()
+                last_modified = arrow.utcnow().datetime
+
+                entry = (body, response.mimetype, etag, last_modified,
+                         kwargs.get(tag) if tag else None)
+                cache.put(key, entry)
+            else:
+                logging.debug("Serving cached response of [{0}]"
+                              .format(key))
+
+            (body, mimetype, etag, last_modified, _) = entry
+
+            response = Response(body, mimetype=mimetype)
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+
+            # 304 Not Modified if the client has the same body, possibly
+            # compressed (see rgapps.http.compression)
+            if any(request.if_none_match.contains(etag + suffix)
+                   for suffix in ETAG_SUFFIXES.values()):
+                response.status_code = 304
+                return response
+
+            return response.make_conditional(request)
+
+        return wrapper
+
+    return decorator
+
+
+if __name__ == '__main__':
+    pass
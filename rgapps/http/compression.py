@@ -0,0 +1,212 @@
+"""rgapps.http.compression module
+
+This is where the HTTP response compression code is placed.
+
+The response bodies are compressed with brotli (when installed) or gzip,
+as negotiated with the request Accept-Encoding header.  Bodies smaller
+than the REST COMPRESSION_MIN_SIZE are sent as they are, while streamed
+bodies are always compressed as they are generated.  The compressed bodies
+of the responses with an ETag (see rgapps.http.cache) are cached, and the
+ETag of a compressed representation is suffixed with its encoding.
+
+The compression is installed in a Flask app with init_app(), and
+configured per app.
+"""
+import logging
+import weakref
+import zlib
+
+from flask import request
+
+from rgapps.config import get_settings
+from rgapps.utils.cache import LRUCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+__all__ = ["init_app", "compress", "ETAG_SUFFIXES", "COMPRESSED_CACHES"]
+
+
+# suffix appended to the ETag of every compressed representation
+ETAG_SUFFIXES = {"br": "-br", "gzip": "-gzip"}
+
+# the media types worth compressing
+COMPRESSIBLE_MIMETYPES = ("application/json", "application/x-ndjson",
+                          "application/xml", "text/")
+
+# the caches of compressed bodies of the Flask apps: (ETag, encoding) ->
+# compressed body
+COMPRESSED_CACHES = weakref.WeakSet()
+
+
+def init_app(app, settings=None):
+    """ Registers the response compression in the given Flask app, as
+    configured by the REST COMPRESSION_MIN_SIZE and COMPRESSION_LEVEL.  A
+    minimum size of 0 (zero) disables the compression.
+
+    Parameters
+    ----------
+    app: Flask (required)
+        the Flask application
+    settings: Settings (optional)
+        the application settings.  Defaults to get_settings().
+    """
+    settings = (settings or get_settings()).rest
+    min_size = settings.compression_min_size
+    level = settings.compression_level
+
+    if min_size <= 0:
+        logging.info("HTTP response compression is disabled")
+        return
+
+    cache = None
+    cache_size = settings.response_cache_size
+    if cache_size > 0:
+        cache = LRUCache(cache_size)
+        COMPRESSED_CACHES.add(cache)
+
+    def compress_response(response):
+        return compress(response, min_size, level, cache)
+
+    app.after_request(compress_response)
+
+    logging.info("HTTP response compression of bodies of [{0}] bytes or "
+                 "more is enabled. brotli available: [{1}]"
+                 .format(min_size, brotli is not None))
+    return
+
+
+def _encoding(): #PRIVATE usage only!
+    """ Returns the encoding accepted by the client, or None.
+    """
+    encodings = ["gzip"]
+    if brotli is not None:
+        encodings.insert(0, "br")
+
+    return request.accept_encodings.best_match(encodings)
+
+
+def _compress(data, encoding, level): #PRIVATE usage only!
+    """ Returns the compressed data.
+    """
+    if encoding == "br":
+        # brotli quality goes up to 11
+        return brotli.compress(data, quality=min(level, 11))
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    return compressor.compress(data) + compressor.flush()
+
+
+def _compress_stream(chunks, encoding, level): #PRIVATE usage only!
+    """ Generates the compressed chunks.  Every chunk is flushed, so that
+    the client receives the data as soon as it is generated.
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=min(level, 11))
+
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    yield compressor.flush()
+
+
+def compress(response, min_size, level=6, cache=None):
+    """ Compresses the response body; called by the after_request function
+    registered by init_app().
+
+    Parameters
+    ----------
+    response: Response (required)
+        the response of the request
+    min_size: int (required)
+        the minimum size of the bodies compressed
+    level: int (optional)
+        the compression level, from 1 to 9
+    cache: LRUCache (optional)
+        the cache of the compressed bodies
+
+    Returns
+    -------
+    Response:
+        the response, compressed if worth it.
+    """
+    if response.direct_passthrough:
+        return response
+
+    if not response.mimetype.startswith(COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add("Accept-Encoding")
+
+    if "Content-Encoding" in response.headers:
+        return response
+
+    encoding = _encoding()
+    if encoding is None:
+        return response
+
+    (etag, _) = response.get_etag()
+
+    if response.status_code == 304:
+        # the client holds the compressed representation
+        if etag is not None:
+            response.set_etag(etag + ETAG_SUFFIXES[encoding])
+        return response
+
+    if response.status_code != 200:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.iter_encoded(),
+                                             encoding, level)
+        response.headers.pop("Content-Length", None)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+
+    compressed = None
+    if etag is not None and cache is not None:
+        compressed = cache.get((etag, encoding))
+
+    if compressed is None:
+        compressed = _compress(data, encoding, level)
+
+        if etag is not None and cache is not None:
+            cache.put((etag, encoding), compressed)
+
+    logging.debug("Response body of [{0}] bytes compressed to [{1}] bytes "
+                  "with [{2}]".format(len(data), len(compressed), encoding))
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+
+    if etag is not None:
+        response.set_etag(etag + ETAG_SUFFIXES[encoding])
+
+    return response
+
+
+if __name__ == '__main__':
+    pass
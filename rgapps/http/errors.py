@@ -8,15 +8,14 @@ import csv
 import io
 import logging
 import re
+import sys
 from xml.sax import saxutils
 
 from flask import request, jsonify, Response
 from flask_restful import Api
-from pint import DimensionalityError
 
 from rgapps.utils.constants import STATUS_KEY, STATUS_ERROR
 from rgapps.utils.utility import is_blank, get_error_description
-from w1thermsensor import NoSensorFoundError
 
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
@@ -29,6 +28,16 @@ __status__ = "Experimental"
 __all__ = ["ErrorResponse", "FlaskRESTfulAPI"]
 
 
+def _is_error(error, module_name, class_name): #PRIVATE usage only!
+    """ Returns True if error is an instance of the given exception class.
+    The module of the class is not imported: if it has not been imported
+    yet, no such error can have been raised.
+    """
+    module = sys.modules.get(module_name)
+
+    return (module is not None
+            and isinstance(error, getattr(module, class_name)))
+
 
 
 class FlaskRESTfulAPI(Api):
@@ -52,11 +61,11 @@ class FlaskRESTfulAPI(Api):
         """
         logging.debug("inside handle_error")
 
-        if isinstance(error, (DimensionalityError, DimensionalityError)):
+        if _is_error(error, "pint", "DimensionalityError"):
             logging.debug("handling DimensionalityError or DimensionalityError")
             return self.pint_bad_request(error)
 
-        elif isinstance(error, (NoSensorFoundError)):
+        elif _is_error(error, "w1thermsensor", "NoSensorFoundError"):
             logging.debug("handling NoSensorFoundError")
             return self.handle_not_found(error)
 
@@ -0,0 +1,123 @@
+"""rgapps.http.jsonprovider module
+
+This is where the JSON serialization of the HTTP response bodies is placed.
+
+The bodies are serialized by the fastest JSON library installed: orjson,
+then ujson (5.4 or later), then the Python json module.  The output is always compact (no
+indentation, nor spaces after the separators).  The JSONProvider is
+installed in the Flask app with init_app(), so that flask.jsonify uses it.
+"""
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+
+    # the default argument is only supported by ujson 5.4 and later
+    ujson.dumps(None, default=str)
+except (ImportError, TypeError):
+    ujson = None
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+__all__ = ["JSONProvider", "dumps", "init_app", "JSON_LIBRARY"]
+
+
+if orjson is not None:
+    JSON_LIBRARY = "orjson"
+elif ujson is not None:
+    JSON_LIBRARY = "ujson"
+else:
+    JSON_LIBRARY = "json"
+
+
+def dumps(obj, sort_keys=False, default=None):
+    """ Serializes the given object to compact JSON text.
+
+    Parameters
+    ----------
+    obj: object (required)
+        a JSON serializable object (dict, list, str, int, float, bool or
+        None)
+    sort_keys: bool (optional)
+        True to sort the keys of the objects.  The insertion order of the
+        keys is kept otherwise.
+    default: callable (optional)
+        function returning a serializable version of the objects the JSON
+        library cannot serialize, or raising TypeError
+
+    Returns
+    -------
+    str:
+        the JSON text.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+
+        return orjson.dumps(obj, default=default, option=option).decode()
+
+    if ujson is not None:
+        return ujson.dumps(obj, sort_keys=sort_keys, ensure_ascii=False,
+                           escape_forward_slashes=False, default=default)
+
+    return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"),
+                      default=default)
+
+
+class JSONProvider(DefaultJSONProvider):
+    """ Flask JSON provider serializing with the fastest JSON library
+    installed.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj, kwargs.get("sort_keys", self.sort_keys),
+                     kwargs.get("default", self.default))
+
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+
+        return super(JSONProvider, self).loads(s, **kwargs)
+
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+
+        return self._app.response_class(
+            dumps(obj, self.sort_keys, self.default) + "\n",
+            mimetype=self.mimetype)
+
+
+def init_app(app, sort_keys=False):
+    """ Installs the JSONProvider in the given Flask app.
+
+    Parameters
+    ----------
+    app: Flask (required)
+        the Flask application
+    sort_keys: bool (optional)
+        True to sort the keys of the JSON objects (JSON_SORT_KEYS)
+    """
+    app.json = JSONProvider(app)
+    app.json.sort_keys = sort_keys
+
+    return
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,106 @@
+"""rgapps.http.jsonstream module
+
+This is where the code to stream large JSON HTTP response bodies is placed.
+
+The bodies are produced by generators, meant to be wrapped by Flask
+stream_with_context, which serialize the items one at a time as they are
+read from the database.  The items are sent in chunks, so that the memory
+used does not depend on the number of items.
+"""
+from rgapps.http.jsonprovider import dumps
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+__all__ = ["json_stream", "ndjson_stream", "JSON_MIMETYPE",
+           "NDJSON_MIMETYPE"]
+
+
+JSON_MIMETYPE = "application/json"
+
+# newline delimited JSON: one JSON document per line
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# number of items serialized in every chunk of the body
+CHUNK_SIZE = 500
+
+
+def json_stream(envelope, key, items):
+    """ Generates a JSON object made of the given envelope, with the given
+    items as a JSON array under the given key.
+
+    Parameters
+    ----------
+    envelope: dict (required)
+        the members of the JSON object, other than the items
+    key: str (required)
+        the name of the member holding the items
+    items: iterable (required)
+        the JSON serializable items
+
+    Returns
+    -------
+    generator:
+        The JSON text in chunks.  The items array is always the last member
+        of the object.
+    """
+    head = dumps(envelope)
+
+    # open the items array as the last member of the envelope object
+    if envelope:
+        yield "{0},{1}:[".format(head[:-1], dumps(key))
+    else:
+        yield "{{{0}:[".format(dumps(key))
+
+    chunk = []
+    separator = ""
+
+    for item in items:
+        chunk.append(dumps(item))
+
+        if len(chunk) >= CHUNK_SIZE:
+            yield separator + ",".join(chunk)
+            separator = ","
+            chunk = []
+
+    if chunk:
+        yield separator + ",".join(chunk)
+
+    yield "]}\n"
+
+
+def ndjson_stream(items):
+    """ Generates the given items as newline delimited JSON.
+
+    Parameters
+    ----------
+    items: iterable (required)
+        the JSON serializable items
+
+    Returns
+    -------
+    generator:
+        The JSON lines in chunks.
+    """
+    chunk = []
+
+    for item in items:
+        chunk.append(dumps(item))
+
+        if len(chunk) >= CHUNK_SIZE:
+            chunk.append("")
+            yield "\n".join(chunk)
+            chunk = []
+
+    if chunk:
+        chunk.append("")
+        yield "\n".join(chunk)
+
+
+if __name__ == '__main__':
+    pass
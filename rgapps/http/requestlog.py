@@ -0,0 +1,125 @@
+"""rgapps.http.requestlog module
+
+This is where the HTTP requests logging code is placed.
+
+Every request is logged by a single access line, at the INFO level, of the
+"rgapps.http.access" logger:
+
+    ip=127.0.0.1 method=GET path="/length/km?from_value=1" status=200
+    bytes=87 ms=1.52 accept="application/json" agent="curl/7.38.0"
+
+The bytes of a streamed response are logged as "-", and its time is the
+time to the response headers.  The response bodies are logged, at the DEBUG
+level, only if the Logging LOG_RESPONSE_BODY is enabled, and are cut after
+LOG_BODY_MAX_BYTES bytes.
+
+The logging is installed in the Flask app with init_app().
+"""
+import logging
+import time
+
+from flask import g, request
+
+from rgapps.config import get_settings
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+__all__ = ["init_app", "ACCESS_LOGGER"]
+
+
+ACCESS_LOGGER = logging.getLogger("rgapps.http.access")
+
+ACCESS_FORMAT = ("ip=%s method=%s path=\"%s\" status=%d bytes=%s ms=%.2f "
+                 "accept=\"%s\" agent=\"%s\"")
+
+
+def init_app(app, settings=None):
+    """ Registers the requests logging in the given Flask app, as
+    configured by the Logging LOG_RESPONSE_BODY and LOG_BODY_MAX_BYTES.
+
+    Parameters
+    ----------
+    app: Flask (required)
+        the Flask application
+    settings: Settings (optional)
+        the application settings.  Defaults to get_settings().
+    """
+    settings = (settings or get_settings()).logging
+    log_body = settings.log_response_body
+    max_bytes = settings.log_body_max_bytes
+
+    def start_timer():
+        g.request_start = time.perf_counter()
+        return
+
+    def log_request(response):
+        if log_body and ACCESS_LOGGER.isEnabledFor(logging.DEBUG):
+            _log_body(response, max_bytes)
+
+        if ACCESS_LOGGER.isEnabledFor(logging.INFO):
+            _log_access(response)
+
+        return response
+
+    app.before_request(start_timer)
+    app.after_request(log_request)
+
+    logging.info("HTTP requests logging is enabled. Response bodies logged: "
+                 "[{0}]".format(log_body))
+    return
+
+
+def _log_access(response): #PRIVATE usage only!
+    """ Logs the access line of the current request.
+    """
+    start = g.get("request_start")
+    millis = 0.0
+    if start is not None:
+        millis = (time.perf_counter() - start) * 1000
+
+    size = "-"
+    if not response.is_streamed:
+        size = response.content_length
+
+    ACCESS_LOGGER.info(ACCESS_FORMAT,
+                       request.remote_addr,
+                       request.method,
+                       request.full_path.rstrip("?"),
+                       response.status_code,
+                       size,
+                       millis,
+                       request.headers.get("Accept", ""),
+                       request.headers.get("User-Agent", ""))
+    return
+
+
+def _log_body(response, max_bytes): #PRIVATE usage only!
+    """ Logs the first max_bytes of the body of the given response.  The
+    bodies of streamed and compressed responses are not read.
+    """
+    if response.is_streamed or response.direct_passthrough:
+        ACCESS_LOGGER.debug("response body: <streamed>")
+        return
+
+    encoding = response.headers.get("Content-Encoding")
+    if encoding is not None:
+        ACCESS_LOGGER.debug("response body: <%s, %s bytes>", encoding,
+                            response.content_length)
+        return
+
+    body = response.get_data()
+
+    ACCESS_LOGGER.debug("response body [%s bytes]: %s%s", len(body),
+                        body[:max_bytes].decode("utf-8", "replace"),
+                        "..." if len(body) > max_bytes else "")
+    return
+
+
+if __name__ == '__main__':
+    pass
@@ -8,8 +8,9 @@ import logging
 from flask import jsonify
 from flask_restful import Resource
 
-from rgapps.config import ini_config
+from rgapps.config import get_settings
 from rgapps.domain.product import Product
+from rgapps.http.cache import cached
 from rgapps.utils.constants import NAME_KEY, VERSION_KEY, STATUS_KEY, \
     STATUS_SUCCESS, PRODUCT_KEY, AUTHOR_KEY, DATE_KEY, COPYRIGHT_KEY, \
     CONTACT_KEY, DATABASE_KEY
@@ -29,6 +30,9 @@ class RESTProductInfoResource(Resource):
     """REST API Resource to retrieve general information about the software.
     """
 
+    # the product information only changes with a new release
+    method_decorators = [cached(3600)]
+
     def get(self):
         """REST GET implementation for the URI:
 
@@ -49,9 +53,9 @@ class RESTProductInfoResource(Resource):
         product[AUTHOR_KEY] = Product.get_author()
         product[DATE_KEY] = Product.get_date()
 
-        if (ini_config.getboolean("SqlLite", "SQLITE_DB_ENABLE")):
+        if get_settings().sqlite.sqlite_db_enable:
             product[DATABASE_KEY] = "SQLite 3"
-        elif (ini_config.getboolean("MongoDB", "MONGO_DB_ENABLE")):
+        elif get_settings().mongodb.mongo_db_enable:
             product[DATABASE_KEY] = "MongoDB 3.0.6"
 
         response = OrderedDict()
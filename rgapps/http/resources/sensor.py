@@ -4,16 +4,21 @@ This is where all the sensor flask-rest Resource code is placed.
 """
 from collections import OrderedDict
 
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context
 from flask_restful import Resource
 from werkzeug.exceptions import BadRequest, NotFound
 
 from rgapps.dao.sensordao import SensorDAO
-from rgapps.domain.ds18b20sensor import DS18B20Sensor
+from rgapps.domain.units.temperature import Temperature
 from rgapps.http import http_basic_authenticate
+from rgapps.http.cache import cached
+from rgapps.http.jsonstream import json_stream, ndjson_stream, \
+    JSON_MIMETYPE, NDJSON_MIMETYPE
 from rgapps.utils.constants import STATUS_KEY, STATUS_SUCCESS, SENSOR_KEY, \
-    DATA_KEY
-from rgapps.utils.enums import DURATION_ENUM
+    DATA_KEY, NEXT_CURSOR_KEY
+from rgapps.utils.enums import AGGREGATE_ENUM, DURATION_ENUM
+from rgapps.utils.exception import IllegalArgumentException
+from rgapps.utils.utility import resolution_to_seconds
 
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
@@ -35,7 +40,9 @@ class RESTSensorTemperatureAnalyticsResource(Resource):
         """REST GET implementation for the URI:
 
         http://<server>:<port>/analytics/temperature/sensors/<string:serial>?
-            duration=<duration>
+            duration=<duration>&from=<from>&to=<to>&resolution=<resolution>&
+            agg=<agg>&unit=<unit>&stream=<stream>&limit=<limit>&
+            cursor=<cursor>
 
         Parameters
         ----------
@@ -46,8 +53,36 @@ class RESTSensorTemperatureAnalyticsResource(Resource):
         request.  And that the HTTP request contains query parameters
         with the request.args as containing the following:
 
-        duration: str (required)
+        duration: str (required unless from is given)
             A valid duration as defined by the DURATION_ENUM
+        from: str (optional)
+            Start of the period to query, instead of a duration, as an
+            ISO8601 UTC timestamp or milliseconds since the epoch.
+        to: str (optional)
+            End of the period started by from, as an ISO8601 UTC timestamp
+            or milliseconds since the epoch.  Defaults to now.
+        resolution: str (optional)
+            Size of the time buckets used to downsample the readings (e.g.,
+            5m, 1h, 1d).  Raw readings are returned if not given.
+        agg: str (optional)
+            A valid aggregate as defined by the AGGREGATE_ENUM applied to the
+            readings of every time bucket.  Defaults to avg.
+        unit: str (optional)
+            Temperature unit (e.g., degC, degF or degK) to convert the
+            readings values to.  The values are returned in the stored units
+            if not given.
+        stream: str (optional)
+            true to stream the readings as they are read from the database
+            in a chunked response body.  The readings are also streamed, as
+            newline delimited JSON, when the HTTP Accept header prefers the
+            application/x-ndjson media type.
+        limit: int (optional)
+            Maximum number of raw readings to return in a page.  The
+            response then contains the next_cursor of the next page, or
+            null on the last page.
+        cursor: str (optional)
+            The next_cursor returned with the previous page.  Requires a
+            limit.
 
         Raises:
         ------
@@ -61,14 +96,59 @@ class RESTSensorTemperatureAnalyticsResource(Resource):
         if not isinstance(params, dict):
             raise BadRequest("params must be an instance of dict")
 
-        if "duration" not in params:
-            raise BadRequest("Missing required duration parameter")
+        if "duration" not in params and "from" not in params:
+            raise BadRequest("Missing required duration or from parameter")
 
         duration = params.get("duration")
-
-        is_valid = DURATION_ENUM.is_valid(duration)
-        if not is_valid:
-            raise BadRequest("duration=[{0}] is not valid".format(duration))
+        from_utc = params.get("from")
+        to_utc = params.get("to")
+
+        if duration is not None:
+            if from_utc is not None:
+                raise BadRequest("Parameters duration and from are mutually "
+                                 "exclusive")
+
+            is_valid = DURATION_ENUM.is_valid(duration)
+            if not is_valid:
+                raise BadRequest("duration=[{0}] is not valid"
+                                 .format(duration))
+
+        resolution = params.get("resolution")
+        if resolution is not None:
+            try:
+                resolution_to_seconds(resolution)
+            except IllegalArgumentException as err:
+                raise BadRequest(err.msg)
+
+        aggregate = params.get("agg")
+        if aggregate is not None:
+            if resolution is None:
+                raise BadRequest("Parameter agg=[{0}] requires a resolution "
+                                 "parameter".format(aggregate))
+
+            if not AGGREGATE_ENUM.is_valid(aggregate):
+                raise BadRequest("agg=[{0}] is not valid".format(aggregate))
+
+        unit = params.get("unit")
+        if unit is not None and aggregate == AGGREGATE_ENUM.count.name:
+            raise BadRequest("Parameter unit=[{0}] is not supported with "
+                             "agg=[{1}]".format(unit, aggregate))
+
+        limit = params.get("limit")
+        cursor = params.get("cursor")
+
+        if cursor is not None and limit is None:
+            raise BadRequest("Parameter cursor requires a limit parameter")
+
+        if limit is not None:
+            if resolution is not None or aggregate is not None:
+                raise BadRequest("Parameter limit=[{0}] is not supported with "
+                                 "a resolution".format(limit))
+
+            try:
+                limit = int(limit)
+            except ValueError:
+                raise BadRequest("limit=[{0}] is not valid".format(limit))
 
         # retrieve sensor info from DB
         sensor = SensorDAO.get_sensor(serial)
@@ -77,25 +157,98 @@ class RESTSensorTemperatureAnalyticsResource(Resource):
             raise NotFound("No sensor registered for serial [{0}]"
                            .format(serial))
 
-        readings = SensorDAO.get_readings(serial, duration)
+        if unit is not None:
+            # fail before any reading is read if the unit is not valid
+            RESTSensorTemperatureAnalyticsResource._convert([], unit)
 
         sensor_data = dict()
         sensor_data["serial"] = sensor["serial"]
 
+        if limit is not None:
+            try:
+                page = SensorDAO.get_readings_page(serial, duration, limit,
+                                                   cursor, from_utc, to_utc)
+            except IllegalArgumentException as err:
+                raise BadRequest(err.msg)
+
+            response = OrderedDict()
+            response[STATUS_KEY] = STATUS_SUCCESS
+            response[SENSOR_KEY] = sensor_data
+            response[DATA_KEY] = RESTSensorTemperatureAnalyticsResource \
+                ._convert(page["readings"], unit)
+            response[NEXT_CURSOR_KEY] = page["next_cursor"]
+
+            json_response = jsonify(response)
+            return json_response
+
+        ndjson = (request.accept_mimetypes.best_match(
+            [JSON_MIMETYPE, NDJSON_MIMETYPE]) == NDJSON_MIMETYPE)
+
+        stream = params.get("stream", "false").lower().strip()
+        if stream not in ("true", "false"):
+            raise BadRequest("stream=[{0}] is not valid".format(stream))
+
+        if ndjson or stream == "true":
+            try:
+                readings = SensorDAO.iter_readings(serial, duration,
+                                                   resolution, aggregate,
+                                                   from_utc, to_utc)
+
+                if unit is not None:
+                    readings = Temperature.convert_readings(readings, unit)
+            except IllegalArgumentException as err:
+                raise BadRequest(err.msg)
+
+            if ndjson:
+                return Response(stream_with_context(ndjson_stream(readings)),
+                                mimetype=NDJSON_MIMETYPE)
+
+            envelope = OrderedDict()
+            envelope[STATUS_KEY] = STATUS_SUCCESS
+            envelope[SENSOR_KEY] = sensor_data
+
+            return Response(stream_with_context(
+                                json_stream(envelope, DATA_KEY, readings)),
+                            mimetype=JSON_MIMETYPE)
+
+        try:
+            readings = SensorDAO.get_readings(serial, duration, resolution,
+                                              aggregate, from_utc, to_utc)
+        except IllegalArgumentException as err:
+            raise BadRequest(err.msg)
+
         response = OrderedDict()
         response[STATUS_KEY] = STATUS_SUCCESS
         response[SENSOR_KEY] = sensor_data
-        response[DATA_KEY] = readings
+        response[DATA_KEY] = RESTSensorTemperatureAnalyticsResource \
+            ._convert(readings, unit)
 
         json_response = jsonify(response)
         return json_response
 
 
+    @staticmethod
+    def _convert(readings, unit): #PRIVATE usage only!
+        """ Returns the list of readings converted to the given unit, or as
+        they are if unit is None.
+        """
+        if unit is None:
+            return readings
+
+        try:
+            return list(Temperature.convert_readings(readings or [], unit))
+        except IllegalArgumentException as err:
+            raise BadRequest(err.msg)
+
+
 class RESTSensorInfoResource(Resource):
     """REST API Resource to retrieve general information about a specific
     sensor.
     """
 
+    # invalidated when the sensor is added or deleted
+    method_decorators = [cached(60, tag="serial")]
+
     def get(self, serial):
         """REST GET implementation for the URI:
 
@@ -156,6 +309,9 @@ class RESTSensorTemperatureResource(Resource):
             sensor serial number
 
         """
+        # imported here: w1thermsensor is only needed by this resource
+        from rgapps.domain.ds18b20sensor import DS18B20Sensor
+
         temperature_sensor = DS18B20Sensor(serial)
         measurement = temperature_sensor.get_measurement()
 
@@ -4,6 +4,8 @@ Sub-package containing REST API units Resources conversion code
 
 Modules:
 -------
+conversion: a module containing the request code shared by the units
+    REST API Resources.
 length: a module containing length REST API Resource converting code.
 temperature: a module containing temperature REST API Resource converting code.
 weight: a module containing weight REST API REsource converting code.
@@ -20,7 +22,7 @@ __maintainer__ = "Rubens Gomes"
 __email__ = "rubens.s.gomes@gmail.com"
 __status__ = "Experimental"
 
-__all__ = ["length", "temperature", "weight"]
+__all__ = ["conversion", "length", "temperature", "weight"]
 
 
 if __name__ == '__main__':
@@ -0,0 +1,112 @@
+"""rgapps.http.resources.units.conversion module
+
+This module contains the request handling code shared by the units
+conversion REST API Resources.
+"""
+from collections import OrderedDict
+
+from flask import request, jsonify
+from werkzeug.exceptions import BadRequest
+
+from rgapps.utils.constants import STATUS_KEY, STATUS_SUCCESS, DATA_KEY
+from rgapps.utils.exception import IllegalArgumentException
+from rgapps.utils.utility import is_number, resolve_unit
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+__all__ = ["convert_request"]
+
+
+def convert_request(to_unit, unit_type, convert_many):
+    """Converts the from_value query parameters of the current request from
+    the from_unit query parameter to the given unit.
+
+    The from_value parameter may be repeated to convert many values at
+    once, in which case from_value and to_value are returned as lists in
+    the order given.  A single value is converted as a batch of one, so
+    that both are validated alike.
+
+    Parameters
+    ----------
+    to_unit:  str (required)
+        the unit to convert to
+    unit_type: UNIT_TYPES_ENUM (required)
+        the type of the units
+    convert_many: callable (required)
+        the domain function converting a list of values, e.g.,
+        Temperature.convert_many
+
+    Returns
+    -------
+    str:
+        A JSON string containing the response
+
+    Raises
+    ------
+    BadRequest if there is an error validating the input parameters.
+    """
+    params = request.args
+    if not params:
+        raise BadRequest("Parameters "
+                         "from_unit=<from_unit>&from_value=<_from_value> "
+                         "are missing")
+
+    if not isinstance(params, dict):
+        raise BadRequest("params must be an instance of dict")
+
+    if "from_unit" not in params:
+        raise BadRequest("Missing required from_unit parameter")
+
+    if "from_value" not in params:
+        raise BadRequest("Missing required from_value parameter")
+
+    from_unit = params.get("from_unit")
+
+    from_values = params.getlist("from_value")
+    for from_value in from_values:
+        if not is_number(from_value):
+            raise BadRequest(("Parameter from_value=[{0}] not valid. "
+                              "A numeric value must be provided.")
+                             .format(from_value))
+
+    from_values = [float(from_value) for from_value in from_values]
+
+    try:
+        from_unit = resolve_unit(from_unit, unit_type)
+        to_unit = resolve_unit(to_unit, unit_type)
+    except IllegalArgumentException as err:
+        raise BadRequest(err.msg)
+
+    if from_unit == to_unit:
+        raise BadRequest("from_unit=[{0}] and to_unit=[{1}] units "
+                         "cannot be equal".format(from_unit, to_unit))
+
+    result = convert_many(from_values, from_unit, to_unit)
+
+    data = OrderedDict()
+    data["from_unit"] = from_unit
+
+    if len(from_values) > 1:
+        data["from_value"] = from_values
+    else:
+        (result,) = result
+        data["from_value"] = from_values[0]
+
+    data["to_unit"] = to_unit
+    data["to_value"] = result
+
+    response = OrderedDict()
+    response[STATUS_KEY] = STATUS_SUCCESS
+    response[DATA_KEY] = data
+
+    return jsonify(response)
+
+
+if __name__ == "__main__":
+    pass
@@ -2,15 +2,12 @@
 
 This module contains the REST API source code for length conversions.
 """
-from collections import OrderedDict
-
-from flask import request, jsonify
 from flask_restful import Resource
-from werkzeug.exceptions import BadRequest
 
 from rgapps.domain.units.length import Length
-from rgapps.utils.constants import STATUS_KEY, STATUS_SUCCESS, DATA_KEY
-from rgapps.utils.utility import is_number
+from rgapps.http.cache import cached
+from rgapps.http.resources.units.conversion import convert_request
+from rgapps.utils.enums import UNIT_TYPES_ENUM
 
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
@@ -27,6 +24,9 @@ class RESTLengthResource(Resource):
     """REST API Resource to convert lengths
     """
 
+    # conversions never change
+    method_decorators = [cached(86400)]
+
     def get(self, to_unit):
         """REST GET implementation for the URI:
 
@@ -45,7 +45,9 @@ class RESTLengthResource(Resource):
         from_unit: str (required)
             length unit
         from_value: str (required)
-            numeric value
+            numeric value.  It may be repeated to convert many values at
+            once, in which case from_value and to_value are returned as
+            lists in the order given.
 
         Returns
         -------
@@ -57,53 +59,8 @@ class RESTLengthResource(Resource):
         BadRequest if there is an error validating the input parameters or
         some other error processing this method.
         """
-        params = request.args
-        if not params:
-            raise BadRequest("Parameters "
-                             "from_unit=<from_unit>&from_value=<_from_value> "
-                             "are missing")
-
-        if not isinstance(params, dict):
-            raise BadRequest("params must be an instance of dict")
-
-        if "from_unit" not in params:
-            raise BadRequest("Missing required from_unit parameter")
-
-        if "from_value" not in params:
-            raise BadRequest("Missing required from_value parameter")
-
-        from_unit = params.get("from_unit")
-
-        from_value = params.get("from_value")
-        if not is_number(from_value):
-            raise BadRequest(("Parameter from_value=[{0}] not valid. "
-                              "A numeric value must be provided.")
-                             .format(from_value))
-
-        from_value = float(from_value)
-
-        if from_unit == to_unit:
-            raise BadRequest("from_unit=[{0}] and to_unit=[{1}] units "
-                             "cannot be equal".format(from_unit, to_unit))
-
-        # pint unit registry only accepts lower case letters for length units
-        from_unit = from_unit.lower().strip()
-        to_unit = to_unit.lower().strip()
-
-        result = Length.convert(from_value, from_unit, to_unit)
-
-        data = OrderedDict()
-        data["from_unit"] = from_unit
-        data["from_value"] = from_value
-        data["to_unit"] = to_unit
-        data["to_value"] = result
-
-        response = OrderedDict()
-        response[STATUS_KEY] = STATUS_SUCCESS
-        response[DATA_KEY] = data
-
-        json_result = jsonify(response)
-        return json_result
+        return convert_request(to_unit, UNIT_TYPES_ENUM.length,
+                               Length.convert_many)
 
 
 if __name__ == "__main__":
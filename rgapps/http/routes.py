@@ -6,15 +6,10 @@ import logging
 
 from flask.globals import current_app
 
-from rgapps.config import ini_config
+from rgapps.config import get_settings
+from rgapps.http.cache import setup_cache
 from rgapps.http.errors import FlaskRESTfulAPI
-from rgapps.http.resources.product import RESTProductInfoResource
-from rgapps.http.resources.sensor import RESTSensorTemperatureResource, \
-    RESTSensorInfoResource, RESTSensorTemperatureAnalyticsResource
-from rgapps.http.resources.units.length import RESTLengthResource
-from rgapps.http.resources.units.temperature import RESTTemperatureResource
-from rgapps.http.resources.units.weight import RESTWeightResource
-from rgapps.http.resources.url import RESTUrlResource
+from rgapps.utils.utility import get_unit_aliases
 
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
@@ -25,49 +20,67 @@ __email__ = "rubens.s.gomes@gmail.com"
 __status__ = "Experimental"
 
 
-def setup_routes():
+def setup_routes(settings=None):
     """Sets up the routes for the REST resources
+
+    Parameters
+    ----------
+    settings: Settings (optional)
+        the application settings.  Defaults to get_settings().
     """
+    settings = settings or get_settings()
+
     # The Flask RESTful API object
     api = FlaskRESTfulAPI(current_app)
 
-    # rest_apis: REST APIs that should be enabled.
-    restful_apis = ini_config.get("REST", "RESTFUL_APIS")
-    rest_api_list = restful_apis.upper().split(",")
-    rest_apis = [str(value).strip() for value in rest_api_list]
+    # The cache of the read-only REST API responses
+    setup_cache(settings)
+
+    # rest_apis: REST APIs that should be enabled.  The modules of the
+    # resources are only imported if their API is enabled, so that the
+    # libraries they need (e.g., BeautifulSoup, w1thermsensor) are not.
+    rest_apis = settings.rest.restful_apis
 
     # Temperature API
     if "TEMPERATURE" in rest_apis:
+        from rgapps.http.resources.units.temperature import \
+            RESTTemperatureResource
         api.add_resource(RESTTemperatureResource,
                          '/temperature/<string:to_unit>')
         logging.info("temperature REST API is enabled")
 
     # Weight API
     if "WEIGHT" in rest_apis:
+        from rgapps.http.resources.units.weight import RESTWeightResource
         api.add_resource(RESTWeightResource,
                          '/weight/<string:to_unit>')
         logging.info("weight REST API is enabled")
 
     # Length API
     if "LENGTH" in rest_apis:
+        from rgapps.http.resources.units.length import RESTLengthResource
         api.add_resource(RESTLengthResource,
                          '/length/<string:to_unit>')
         logging.info("length REST API is enabled")
 
     # PRODUCT_INFO
     if "PRODUCT_INFO" in rest_apis:
+        from rgapps.http.resources.product import RESTProductInfoResource
         api.add_resource(RESTProductInfoResource,
                          '/information/product')
         logging.info("Product Info REST API is enabled")
 
     # IoT - Sensor Temperature API
     if "SENSOR_TEMPERATURE" in rest_apis:
+        from rgapps.http.resources.sensor import \
+            RESTSensorTemperatureResource
         api.add_resource(RESTSensorTemperatureResource,
                          '/temperature/sensors/<string:serial>')
         logging.info("Sensor Temperature REST API is enabled")
 
     # IoT - Sensor Information API
     if "SENSOR_INFO" in rest_apis:
+        from rgapps.http.resources.sensor import RESTSensorInfoResource
         api.add_resource(RESTSensorInfoResource,
                          '/information/sensors',
                          '/information/sensors/<string:serial>')
@@ -75,16 +88,25 @@ def setup_routes():
 
     # IoT - Sensor Temperature Analytics API
     if "SENSOR_TEMPERATURE_ANALYTICS" in rest_apis:
+        from rgapps.http.resources.sensor import \
+            RESTSensorTemperatureAnalyticsResource
         api.add_resource(RESTSensorTemperatureAnalyticsResource,
                          '/analytics/temperature/sensors/<string:serial>')
         logging.info("Sensor Temperature Analytics REST API is enabled")
 
     # URL API
     if "URL" in rest_apis:
+        from rgapps.http.resources.url import RESTUrlResource
         api.add_resource(RESTUrlResource,
                          '/resource')
         logging.info("URL REST API is enabled")
 
+    # load the unit aliases table now rather than on the first request
+    if {"TEMPERATURE", "WEIGHT", "LENGTH",
+            "SENSOR_TEMPERATURE_ANALYTICS"} & set(rest_apis):
+        get_unit_aliases()
+        logging.info("unit aliases are loaded")
+
 
 if __name__ == '__main__':
     pass
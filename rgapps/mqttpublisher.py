@@ -9,7 +9,8 @@ import signal
 import sys
 import time
 
-from rgapps.config import ini_config
+from rgapps.config import get_settings
+from rgapps.config.settings import handle_sighup
 from rgapps.mqtt.mqtt import MQTTPublisher
 from rgapps.utils.utility import write_to_file
 
@@ -29,8 +30,9 @@ def read_publish_sensor_data():
     # MQTT client publisher
     mqtt_publisher = MQTTPublisher()
 
-    sensor_serial = ini_config.get("Sensor", "SENSOR_TEMPERATURE_SERIAL")
-    sleep_timeout = ini_config.getint("Sensor", "SENSOR_SLEEP_TIME")
+    settings = get_settings().sensor
+    sensor_serial = settings.sensor_temperature_serial
+    sleep_timeout = settings.sensor_sleep_time
 
     # start daemon forever loop
     while True:
@@ -82,8 +84,8 @@ def run():
     if system == "Linux":
         logging.info("Server running on Linux.")
 
-        pid_file = ini_config.getboolean("Sensor", "SENSOR_PID_FILE")
-        working_dir = ini_config.getboolean("Logging", "WORKING_DIR")
+        pid_file = get_settings().sensor.sensor_pid_file
+        working_dir = get_settings().logging.working_dir
 
         logging.debug("Instantiating daemon with pid_file [{0}] "
                        "and working_dir [{1}]"
@@ -97,7 +99,8 @@ def run():
             pidfile=daemon.pidfile.PIDLockFile(pid_file))
 
         logging.debug("Setting up daemon signal map")
-        daemon_context.signal_map = { signal.SIGTERM: program_cleanup }
+        daemon_context.signal_map = { signal.SIGTERM: program_cleanup,
+                                       signal.SIGHUP: handle_sighup }
         logging.debug("daemon signal map has been setup")
 
         if (logger_fds):
@@ -0,0 +1,428 @@
+"""rgapps.sensorcollector module
+
+This module contains the asyncio sensor readings collector used by the
+sensorserver daemon (see rgapps.sensorapp).
+
+Every sensor endpoint is polled by its own task, at its own interval, with
+a random jitter so that the endpoints are not all polled at the same time.
+At most SENSOR_MAX_CONCURRENCY requests are sent at once.  The requests are
+sent by a shared requests.Session, which keeps the HTTP connections open,
+in a thread pool.  The readings are queued to a single writer task, which
+adds them to the database through SensorDAO.add_readings, by batches.
+
+As with the original polling loop, an email is sent on the first error of
+an endpoint, either reading or storing its reading, and not again until a
+reading of that endpoint is stored.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import random
+import sys
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import (ConnectionError, Timeout,
+                                 RequestException, HTTPError)
+
+from rgapps.config import get_settings
+from rgapps.dao.sensordao import SensorDAO
+from rgapps.domain.myemail import EMail
+from rgapps.utils.constants import SENSOR_KEY, DATA_KEY
+from rgapps.utils.exception import ConfigurationException
+from rgapps.utils.utility import is_blank
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+__all__ = ["SensorEndpoint", "SensorCollector", "parse_endpoints"]
+
+
+class SensorEndpoint:
+    """ A sensor REST endpoint polled by the collector.
+    """
+
+    def __init__(self, serial, url, interval):
+        """
+        Parameters
+        ----------
+        serial: str (required)
+            the sensor serial
+        url: str (required)
+            the sensor REST URL, without the serial
+        interval: int (required)
+            the polling interval in seconds
+        """
+        self.serial = serial
+        self.url = url.rstrip("/") + "/" + serial
+        self.interval = interval
+
+        # error flag used to send email only once if error occurs.
+        self.error_flag = False
+
+
+    def __repr__(self):
+        return "SensorEndpoint({0}, {1}, {2})".format(self.serial, self.url,
+                                                      self.interval)
+
+
+def parse_endpoints(text, default_interval):
+    """ Parses the SENSOR_ENDPOINTS configuration: one endpoint per line,
+    made of the sensor serial, its REST URL, and optionally its polling
+    interval in seconds.
+
+    Parameters
+    ----------
+    text: str (required)
+        the SENSOR_ENDPOINTS configuration
+    default_interval: int (required)
+        the interval of the endpoints without one
+
+    Returns
+    -------
+    list:
+        the SensorEndpoint objects.
+
+    Raises
+    ------
+    ConfigurationException:
+        if a line is not valid.
+    """
+    endpoints = []
+
+    for line in text.splitlines():
+        fields = line.split()
+        if not fields:
+            continue
+
+        if len(fields) not in (2, 3):
+            raise ConfigurationException("SENSOR_ENDPOINTS line [{0}] must "
+                                         "be: serial url [interval]"
+                                         .format(line))
+
+        interval = default_interval
+        if len(fields) == 3:
+            try:
+                interval = int(fields[2])
+            except ValueError:
+                interval = 0
+
+        if interval <= 0:
+            raise ConfigurationException("SENSOR_ENDPOINTS line [{0}] "
+                                         "interval must be a positive integer"
+                                         .format(line))
+
+        endpoints.append(SensorEndpoint(fields[0], fields[1], interval))
+
+    return endpoints
+
+
+class SensorCollector:
+    """ Polls sensor endpoints concurrently, and writes their readings to
+    the database by batches.
+    """
+
+    def __init__(self, endpoints, settings=None):
+        """
+        Parameters
+        ----------
+        endpoints: list (required)
+            the SensorEndpoint objects to poll
+        settings: Settings (optional)
+            the application settings.  Defaults to get_settings().
+        """
+        if not endpoints:
+            raise ConfigurationException("no sensor endpoint to poll.")
+
+        settings = settings or get_settings()
+
+        self.endpoints = endpoints
+        self.auth = (settings.sensor.sensor_rest_api_username,
+                     settings.sensor.sensor_rest_api_password)
+        self.timeout = settings.sensor.sensor_request_timeout
+        self.concurrency = max(1, settings.sensor.sensor_max_concurrency)
+        self.jitter = min(max(0.0, settings.sensor.sensor_jitter), 1.0)
+        self.batch_size = max(1, settings.sensor.sensor_write_batch_size)
+        self.write_interval = max(0, settings.sensor.sensor_write_interval)
+        self.recipient = settings.email.recipient_email
+
+        # the HTTP connections are kept open, up to one per request sent at
+        # the same time to a given host
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({'content-type': 'application/json'})
+
+
+    @staticmethod
+    def from_settings(settings=None):
+        """ Returns a collector of the SENSOR_ENDPOINTS, or of the
+        SENSOR_TEMPERATURE_SERIAL at SENSOR_TEMPERATURE_URL if none.
+
+        Parameters
+        ----------
+        settings: Settings (optional)
+            the application settings.  Defaults to get_settings().
+        """
+        settings = settings or get_settings()
+        sensor = settings.sensor
+
+        endpoints = parse_endpoints(sensor.sensor_endpoints,
+                                    sensor.sensor_sleep_time)
+
+        if not endpoints and not is_blank(sensor.sensor_temperature_url):
+            endpoints = [SensorEndpoint(sensor.sensor_temperature_serial,
+                                        sensor.sensor_temperature_url,
+                                        sensor.sensor_sleep_time)]
+
+        return SensorCollector(endpoints, settings)
+
+
+    def run(self):
+        """ Polls the endpoints forever.
+        """
+        logging.info("Polling [{0}] sensor endpoints, at most [{1}] at a "
+                     "time.".format(len(self.endpoints), self.concurrency))
+
+        try:
+            asyncio.run(self.collect())
+        finally:
+            self.session.close()
+
+        return
+
+
+    async def collect(self):
+        """ Coroutine polling the endpoints, and writing their readings.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        # the readings are written by a single thread: a SQLite connection
+        # is opened per thread
+        with ThreadPoolExecutor(self.concurrency, "sensor-poll") as pollers, \
+                ThreadPoolExecutor(1, "sensor-write") as writer:
+
+            tasks = [loop.create_task(self._poll(endpoint, queue, semaphore,
+                                                 pollers))
+                     for endpoint in self.endpoints]
+            tasks.append(loop.create_task(self._write(queue, writer)))
+
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+                # let the writer flush its last batch before the executors
+                # are shut down
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        return
+
+
+    def _delay(self, interval): #PRIVATE usage only!
+        """ Returns the interval, plus or minus the random jitter.
+        """
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+
+    async def _poll(self, endpoint, queue, semaphore, executor): #PRIVATE usage only!
+        """ Coroutine polling an endpoint forever.
+        """
+        loop = asyncio.get_running_loop()
+
+        # spread the first requests over the jitter
+        await asyncio.sleep(random.uniform(0, endpoint.interval * self.jitter))
+
+        while True:
+            started = loop.time()
+
+            async with semaphore:
+                reading = await loop.run_in_executor(executor, self.fetch,
+                                                     endpoint)
+
+            if reading is not None:
+                await queue.put((endpoint, reading))
+
+            elapsed = loop.time() - started
+            await asyncio.sleep(max(0, self._delay(endpoint.interval)
+                                    - elapsed))
+
+
+    def fetch(self, endpoint):
+        """ Reads the sensor of the given endpoint.  Errors are logged, and
+        emailed once per endpoint.
+
+        Parameters
+        ----------
+        endpoint: SensorEndpoint (required)
+            the endpoint to read
+
+        Returns
+        -------
+        dict:
+            the reading with the keys "unit", "value", "utc" and "serial", or
+            None if it could not be read.
+        """
+        logging.debug("Sending request to [{0}] with user [{1}]"
+                      .format(endpoint.url, self.auth[0]))
+
+        try:
+            r = self.session.get(endpoint.url,
+                                 verify=False,
+                                 auth=self.auth,
+                                 timeout=self.timeout)
+
+            if r.status_code != 200:
+                logging.error("Response status code [{0}] : [{1}]"
+                              .format(r.status_code, r.text))
+                return None
+
+            output = r.json()
+            readings = output[DATA_KEY]
+
+            return {"unit": readings["unit"],
+                    "value": readings["value"],
+                    "utc": readings["utc"],
+                    "serial": output[SENSOR_KEY]["serial"]}
+
+        except (ConnectionError, Timeout) as err:  # e.g., server is down.
+            logging.exception("Connection Error with URL [{0}], "
+                              "user [{1}] in runserver daemon: [{2}]"
+                              .format(endpoint.url, self.auth[0], err))
+            self._alert(endpoint, "sensorserver: Connection/Timeout Error",
+                        "Connection/Timeout Error to URL [{0}]: [{1}]"
+                        .format(endpoint.url, err))
+
+        except (HTTPError, RequestException) as err:
+            logging.exception("HTTP/Request Error to URL [{0}] in "
+                              "runserver daemon: [{1}]"
+                              .format(endpoint.url, err))
+            self._alert(endpoint, "sensorserver: HTTP Error",
+                        "HTTP/Request to URL [{0}] Error: [{1}]"
+                        .format(endpoint.url, err))
+
+        except Exception as err:
+            sys.stderr.write(str(err))
+            logging.exception("Error in runserver daemon: [{0}]"
+                              .format(err))
+            self._alert(endpoint, "sensorserver: Environment Error",
+                        "Error reading URL [{0}]: [{1}]"
+                        .format(endpoint.url, err))
+
+        return None
+
+
+    def _alert(self, endpoint, subject, message): #PRIVATE usage only!
+        """ Emails the error of the given endpoint, unless already done since
+        its last successful request.
+        """
+        if endpoint.error_flag:  # only send email once.
+            return
+
+        endpoint.error_flag = True
+
+        logging.info("Sending email to [{0}] with subject [{1}]"
+                     .format(self.recipient, subject))
+        try:
+            EMail.send_email(self.recipient, subject, message)
+            logging.info("email to [{0}] with subject [{1}] sent."
+                         .format(self.recipient, subject))
+        except Exception as mail_err:
+            logging.error("Error [{0}] sending email.".format(mail_err))
+
+        return
+
+
+    async def _write(self, queue, executor): #PRIVATE usage only!
+        """ Coroutine writing the queued (endpoint, reading) pairs by
+        batches, of at most batch_size readings, at least every
+        write_interval seconds.
+        """
+        loop = asyncio.get_running_loop()
+        batch = []
+
+        try:
+            while True:
+                batch.append(await queue.get())
+                deadline = loop.time() + self.write_interval
+
+                while len(batch) < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(),
+                                                            timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                (readings, batch) = (batch, [])
+                await loop.run_in_executor(executor, self.write, readings)
+
+        except asyncio.CancelledError:
+            # do not lose the readings already collected
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            if batch:
+                # written by the writer thread, which may still be writing
+                # the previous batch
+                await asyncio.shield(loop.run_in_executor(executor,
+                                                          self.write, batch))
+            raise
+
+
+    def write(self, entries):
+        """ Adds the given readings to the database.  The errors are logged,
+        and emailed once per endpoint.  The error flag of an endpoint is
+        reset once one of its readings is added.
+
+        Parameters
+        ----------
+        entries: list (required)
+            (SensorEndpoint, reading) pairs, where the reading is a
+            dictionary with the keys "unit", "value", "utc" and "serial"
+        """
+        readings = [reading for (_, reading) in entries]
+
+        try:
+            result = SensorDAO.add_readings(readings, self.batch_size)
+        except Exception as err:
+            logging.exception("Error [{0}] adding [{1}] readings."
+                              .format(err, len(readings)))
+            result = {"inserted": 0,
+                      "failed": [{"index": index, "error": str(err)}
+                                 for index in range(len(entries))]}
+
+        logging.debug("[{0}] readings added to database."
+                      .format(result["inserted"]))
+
+        failed = {}
+        for failure in result["failed"]:
+            (endpoint, reading) = entries[failure["index"]]
+            logging.error("Reading [{0}] not added: [{1}]"
+                          .format(reading, failure["error"]))
+            failed.setdefault(endpoint, failure["error"])
+
+        for (endpoint, _) in entries:
+            if endpoint not in failed:
+                endpoint.error_flag = False
+
+        for (endpoint, error) in failed.items():
+            self._alert(endpoint, "sensorserver: Environment Error",
+                        "Error storing reading of URL [{0}]: [{1}]"
+                        .format(endpoint.url, error))
+
+        return
+
+
+if __name__ == '__main__':
+    pass
@@ -4,6 +4,7 @@ Package containing utility code
 
 Modules:
 -------
+cache: a module containing an in-process LRU cache.
 constants:  a placeholder to store constants
 enums: a placeholder for all the global enums
 utility : a module containing common utility code.
@@ -21,7 +22,7 @@ __maintainer__ = "Rubens Gomes"
 __email__ = "rubens.s.gomes@gmail.com"
 __status__ = "Experimental"
 
-__all__ = ["constants", "enums", "exception", "utility"]
+__all__ = ["cache", "constants", "enums", "exception", "utility"]
 
 if __name__ == '__main__':
     pass
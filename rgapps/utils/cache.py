@@ -0,0 +1,166 @@
+"""rgapps.utils.cache module
+
+This module contains a thread safe in-process LRU (least recently used)
+cache, with an optional time to live of its entries.
+"""
+from collections import OrderedDict
+import threading
+import time
+
+from rgapps.utils.exception import IllegalArgumentException
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+__all__ = ["LRUCache"]
+
+
+class LRUCache:
+    """ A thread safe LRU cache.
+
+    Once maxsize entries are cached, the least recently used entry is
+    evicted to make room for a new one.  Entries older than ttl seconds
+    are expired when they are looked up.
+    """
+
+    def __init__(self, maxsize, ttl=None):
+        """
+        Parameters
+        ----------
+        maxsize: int (required)
+            maximum number of entries cached.  Must be greater than 0.
+        ttl: float (optional)
+            time to live of the entries in seconds.  Entries never expire
+            if not given.
+        """
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise IllegalArgumentException("maxsize [{0}] must be a positive "
+                                           "integer.".format(maxsize))
+
+        if ttl is not None and ttl <= 0:
+            raise IllegalArgumentException("ttl [{0}] must be positive."
+                                           .format(ttl))
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        # key -> (expiration time, value)
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+
+    def __len__(self):
+        return len(self.__entries)
+
+
+    def get(self, key, default=None):
+        """
+        Returns the value cached for the given key, or default if the key
+        is not cached or has expired.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            if entry is not None and entry[0] is not None \
+                    and entry[0] <= time.monotonic():
+                del self.__entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self.__entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+
+    def __contains__(self, key):
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            return entry is not None and (entry[0] is None
+                                          or entry[0] > time.monotonic())
+
+
+    def put(self, key, value):
+        """
+        Caches the value of the given key, evicting the least recently used
+        entry if the cache is full.
+        """
+        expires = None
+        if self.ttl is not None:
+            expires = time.monotonic() + self.ttl
+
+        with self.__lock:
+            self.__entries[key] = (expires, value)
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+
+        return
+
+
+    def pop(self, key):
+        """
+        Removes the given key from the cache, if cached.
+        """
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+        return
+
+
+    def invalidate(self, predicate):
+        """
+        Removes all the entries for which predicate(key, value) is true.
+
+        Returns
+        -------
+        int:
+            the number of entries removed.
+        """
+        with self.__lock:
+            keys = [key for (key, entry) in self.__entries.items()
+                    if predicate(key, entry[1])]
+
+            for key in keys:
+                del self.__entries[key]
+
+        return len(keys)
+
+
+    def after_fork(self):
+        """
+        Replaces the lock in a child process, right after a fork.  The lock
+        may have been held by another thread of the parent when it forked.
+        The cached entries are kept.
+        """
+        self.__lock = threading.Lock()
+
+        return
+
+
+    def clear(self):
+        """
+        Removes all the entries, and resets the hits and misses counters.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+        return
+
+
+if __name__ == '__main__':
+    pass
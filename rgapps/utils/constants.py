@@ -11,7 +11,7 @@ __email__ = "rubens.s.gomes@gmail.com"
 __status__ = "Experimental"
 
 __all__ = ["DATA_KEY", "NAME_KEY", "PRODUCT_KEY", "SENSOR_KEY", "VERSION_KEY",
-           "DATABASE_KEY",
+           "DATABASE_KEY", "NEXT_CURSOR_KEY",
            "STATUS_KEY", "URL_KEY", "STATUS_ERROR", "AUTHOR_KEY",
            "STATUS_SUCCESS", "CONTACT_KEY", "DATE_KEY", "COPYRIGHT_KEY"]
 
@@ -24,6 +24,7 @@ DATA_KEY = "data"
 DATABASE_KEY = "database"
 DATE_KEY = "date"
 NAME_KEY = "name"
+NEXT_CURSOR_KEY = "next_cursor"
 PRODUCT_KEY = "product"
 SENSOR_KEY = "sensor"
 STATUS_KEY = "status"
@@ -14,8 +14,9 @@ __maintainer__ = "Rubens Gomes"
 __email__ = "rubens.s.gomes@gmail.com"
 __status__ = "Experimental"
 
-__all__ = ["DURATION_ENUM", "MIME_TYPE_ENUM", "SENSOR_TYPE_ENUM",
-           "SENSOR_STATE_ENUM", "TEMPERATURE_ENUM", "UNIT_TYPES_ENUM"]
+__all__ = ["AGGREGATE_ENUM", "DURATION_ENUM", "DURATION_SHIFTS",
+           "MIME_TYPE_ENUM", "SENSOR_TYPE_ENUM", "SENSOR_STATE_ENUM",
+           "TEMPERATURE_ENUM", "UNIT_TYPES_ENUM"]
 
 
 
@@ -123,8 +124,73 @@ class DURATION_ENUM(Enum):
         -------
         True if duration is valid; False, otherwise.
         """
-        for d in DURATION_ENUM:
-            if d.name.lower() == duration.lower().strip():
+        return DURATION_ENUM.shift(duration) is not None
+
+    @staticmethod
+    def shift(duration):
+        """ Returns how far back in time the given duration goes.
+
+        Parameters:
+        ----------
+        duration: str (optional)
+            a possible duration string
+
+        Returns:
+        -------
+        A dictionary of arrow replace() keyword arguments (e.g.,
+        {"days": -90}) shifting the current time to the start of the
+        duration; None, if duration is not valid.
+        """
+        if not duration:
+            return None
+
+        return DURATION_SHIFTS.get(duration.lower().strip())
+
+
+# lower case DURATION_ENUM name: arrow replace() keyword arguments shifting
+# the current time to the start of the duration.
+DURATION_SHIFTS = {DURATION_ENUM.last5Years.name.lower(): {"years": -5},
+                   DURATION_ENUM.last1Year.name.lower(): {"years": -1},
+                   DURATION_ENUM.last6Months.name.lower(): {"months": -6},
+                   DURATION_ENUM.last90Days.name.lower(): {"days": -90},
+                   DURATION_ENUM.last60Days.name.lower(): {"days": -60},
+                   DURATION_ENUM.last30Days.name.lower(): {"days": -30},
+                   DURATION_ENUM.last21Days.name.lower(): {"days": -21},
+                   DURATION_ENUM.last7Days.name.lower(): {"days": -7},
+                   DURATION_ENUM.last3Days.name.lower(): {"days": -3},
+                   DURATION_ENUM.lastDay.name.lower(): {"days": -1},
+                   DURATION_ENUM.last24Hours.name.lower(): {"hours": -24},
+                   DURATION_ENUM.last12Hours.name.lower(): {"hours": -12},
+                   DURATION_ENUM.last6Hours.name.lower(): {"hours": -6},
+                   DURATION_ENUM.lastHour.name.lower(): {"hours": -1}}
+
+
+class AGGREGATE_ENUM(Enum):
+    """ Aggregate functions used to downsample historical information into
+    time buckets.
+    """
+    avg = 1
+    min = 2
+    max = 3
+    count = 4
+    first = 5
+    last = 6
+
+    @staticmethod
+    def is_valid(aggregate):
+        """ Checks if the given aggregate is valid.
+
+        Parameters:
+        ----------
+        aggregate: str (optional)
+            a possible aggregate string
+
+        Returns:
+        -------
+        True if aggregate is valid; False, otherwise.
+        """
+        for a in AGGREGATE_ENUM:
+            if a.name == aggregate.lower().strip():
                 return True
 
         return False
@@ -3,11 +3,21 @@
 This module contains common utility functions.
 """
 from decimal import Decimal
+from functools import lru_cache
 import logging
+import re
+import threading
+from types import MappingProxyType
 
-from pint.unit import UnitRegistry, UnitsContainer
+import arrow
 
-from rgapps.config import ini_config
+try:
+    import numpy
+except ImportError:
+    # numpy is optional: arrays are only converted in bulk when available.
+    numpy = None
+
+from rgapps.config.settings import get_settings
 from rgapps.utils.enums import UNIT_TYPES_ENUM
 from rgapps.utils.exception import IllegalArgumentException
 
@@ -21,7 +31,36 @@ __status__ = "Experimental"
 
 __all__ = ["get_log_file_handles", "is_number", "dict_factory",
            "decimal_places", "write_to_file", "isNotBlank",
-           "convert_unit"]
+           "convert_unit", "utc_to_epoch_ms", "utc_to_iso", "epoch_ms_to_utc",
+           "resolution_to_seconds", "get_unit_registry", "convert_units",
+           "get_unit_aliases", "resolve_unit", "convert_values"]
+
+
+# number of seconds for every resolution unit: s(econds), m(inutes),
+# h(ours), d(ays) and w(eeks)
+RESOLUTION_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400,
+                           "w": 604800}
+
+RESOLUTION_PATTERN = re.compile(r"^\s*(\d+)\s*([smhdw])\s*$", re.IGNORECASE)
+
+# maximum number of (unit_type, from_unit, to_unit) conversion factors cached
+CONVERSION_FACTOR_CACHE_SIZE = 256
+
+# (name, symbol) of the SI prefixes accepted in front of PREFIXED_UNITS
+UNIT_PREFIXES = (("nano", "n"), ("micro", "u"), ("micro", "\u00b5"),
+                 ("milli", "m"), ("centi", "c"), ("deci", "d"),
+                 ("deca", "da"), ("hecto", "h"), ("kilo", "k"),
+                 ("mega", "M"), ("giga", "G"))
+
+# (name, symbol) of the units accepted with an SI prefix
+PREFIXED_UNITS = (("meter", "m"), ("metre", ""), ("gram", "g"))
+
+# the pint unit registry shared by the process, see get_unit_registry()
+_unit_registry = None
+_unit_registry_lock = threading.RLock()
+
+# the unit aliases table, see get_unit_aliases()
+_unit_aliases = None
 
 
 def get_error_description(error):
@@ -50,6 +89,197 @@ def get_error_description(error):
 
 
 
+def get_unit_registry():
+    """ Returns the pint UnitRegistry shared by the whole process.
+
+    The registry parses the pint definitions file, which is expensive.  It
+    is therefore only built once, on first use.
+
+    Returns
+    -------
+    UnitRegistry:
+        the shared pint unit registry.
+    """
+    global _unit_registry
+
+    if _unit_registry is None:
+        with _unit_registry_lock:
+            if _unit_registry is None:
+                # imported here: pint is slow to import, and this module is
+                # imported by every process
+                from pint.unit import UnitRegistry
+                _unit_registry = UnitRegistry(
+                    autoconvert_offset_to_baseunit=True)
+                logging.debug("pint UnitRegistry has been created.")
+
+    return _unit_registry
+
+
+
+def get_unit_aliases():
+    """ Returns the table of the units accepted for every UNIT_TYPES_ENUM.
+
+    The table is built once, on first use, from the pint unit registry.  Its
+    keys are the lower case names, symbols and aliases of the units (e.g.,
+    "degc", "km", "mile"), and its values are (spelling, unit_type) tuples,
+    where spelling is the one known by pint (e.g., "degC", "km", "mile").
+
+    Returns
+    -------
+    MappingProxyType:
+        the read-only table of the unit aliases.
+    """
+    global _unit_aliases
+
+    if _unit_aliases is None:
+        unit_reg = get_unit_registry()
+
+        with _unit_registry_lock:
+            if _unit_aliases is None:
+                _unit_aliases = _build_unit_aliases(unit_reg)
+                logging.debug("[{0}] unit aliases have been loaded."
+                              .format(len(_unit_aliases)))
+
+    return _unit_aliases
+
+
+
+def _build_unit_aliases(unit_reg): #PRIVATE usage only!
+    """ Builds the table returned by get_unit_aliases.
+    """
+    from pint.unit import UnitsContainer
+
+    dimensions = dict()
+    for unit_type in UNIT_TYPES_ENUM:
+        dimension = UnitsContainer({"[" + unit_type.name + "]": 1})
+        dimensions[dimension] = unit_type
+
+    # iterating the registry gives all the unit names, symbols and aliases
+    spellings = list(unit_reg)
+    for (name, symbol) in PREFIXED_UNITS:
+        for (prefix, prefix_symbol) in UNIT_PREFIXES:
+            spellings.append(prefix + name)
+            if symbol:
+                spellings.append(prefix_symbol + symbol)
+
+    aliases = dict()
+
+    for spelling in spellings:
+        try:
+            dimension = unit_reg.get_dimensionality(spelling)
+        except Exception:
+            # some pint definitions (e.g., constants) are not units.
+            continue
+
+        unit_type = dimensions.get(dimension)
+        if unit_type is None:
+            continue
+
+        # a lower case spelling wins over the ones differing only in case:
+        # "mm" is the millimeter and not the megameter ("Mm").
+        key = spelling.lower()
+        if key in aliases and key != spelling:
+            continue
+
+        aliases[key] = (spelling, unit_type)
+
+    return MappingProxyType(aliases)
+
+
+
+def resolve_unit(unit, unit_type):
+    """ Returns the pint spelling of the given unit, without using pint.
+
+    Parameters
+    ----------
+    unit: str (required)
+        a unit name, symbol or alias in any case (e.g., degc, KM, Mile)
+    unit_type: UNIT_TYPES_ENUM (required)
+        the type of unit required
+
+    Returns
+    -------
+    str:
+        the unit as spelled by pint (e.g., degC, km, mile)
+
+    Raises
+    ------
+    IllegalArgumentException if unit is not a known unit of the given
+    unit_type.
+    """
+
+    if is_blank(unit):
+        raise IllegalArgumentException("unit is required.")
+
+    entry = get_unit_aliases().get(unit.strip().lower())
+
+    if entry is None:
+        raise IllegalArgumentException("unit [{0}] is not valid."
+                                       .format(unit))
+
+    if entry[1] != unit_type:
+        raise IllegalArgumentException("unit [{0}] is not valid. [{1}] unit "
+                                       "required.".format(unit,
+                                                          unit_type.name))
+
+    return entry[0]
+
+
+
+@lru_cache(maxsize=CONVERSION_FACTOR_CACHE_SIZE)
+def _conversion_factor(unit_type, from_unit, to_unit): #PRIVATE usage only!
+    """ Returns the (from_unit_name, to_unit_name, scale, offset) used to
+    convert a value from from_unit to to_unit:
+
+    to_value = from_value * scale + offset
+
+    The units are validated with the unit aliases table.  The factors are
+    resolved with pint, and cached.  All the conversions between units of
+    length, mass or temperature are linear.
+
+    Raises
+    ------
+    IllegalArgumentException if from_unit or to_unit are not units of the
+    given unit_type.
+    """
+    to_unit_name = resolve_unit(to_unit, unit_type)
+    from_unit_name = resolve_unit(from_unit, unit_type)
+
+    unit_reg = get_unit_registry()
+
+    # the registry caches are not thread safe
+    with _unit_registry_lock:
+        offset = unit_reg.Quantity(0.0, from_unit_name).to(
+            to_unit_name).magnitude
+        scale = unit_reg.Quantity(1.0, from_unit_name).to(
+            to_unit_name).magnitude - offset
+
+    logging.debug("[{0}] to [{1}] conversion factors: scale [{2}], "
+                  "offset [{3}]"
+                  .format(from_unit_name, to_unit_name, scale, offset))
+
+    return (from_unit_name, to_unit_name, scale, offset)
+
+
+
+def _round_result(result): #PRIVATE usage only!
+    """ Restricts a converted value to 2 decimal places, unless the
+    rounding gives 0 (zero).
+    """
+    final_result = result
+
+    # restrict results to 2 decimal places.
+    if(decimal_places(result) > 2):
+        final_result = round(result, 2)
+
+    if final_result == 0:
+        # do not return 0 (zero) when rounding gives 0 value.
+        final_result = result
+
+    return final_result
+
+
+
 def convert_unit(unit_type, from_unit, from_value, to_unit):
     """Converts value/unit found in params to the given to_unit.
 
@@ -84,10 +314,10 @@ def convert_unit(unit_type, from_unit, from_value, to_unit):
     if is_blank(from_unit):
         raise IllegalArgumentException("from_unit is required.")
 
-    if not from_value :
+    if from_value is None:
         raise IllegalArgumentException("from_value is required.")
 
-    if not is_number(from_value):
+    if not is_number(str(from_value)):
         raise IllegalArgumentException("from_value [{0}] is not a number."
                                         .format(from_value))
 
@@ -95,51 +325,268 @@ def convert_unit(unit_type, from_unit, from_value, to_unit):
         raise IllegalArgumentException("to_unit is required.")
 
 
-    # pint unit_reg unit converter object
-    unit_reg = UnitRegistry(autoconvert_offset_to_baseunit=True)
+    (from_unit_name, to_unit_name, scale, offset) = _conversion_factor(
+        unit_type, from_unit, to_unit)
+
+    logging.debug("converting [{0} {1}] to [{2}]"
+                  .format(from_value, from_unit_name, to_unit_name))
+
+    result = float(from_value) * scale + offset
+
+    final_result = _round_result(result)
+
+    logging.debug("input [{0} {1}] result [{2} {3}]"
+                  .format(from_value, from_unit_name, result, to_unit_name))
+
+    return final_result
+
+
+
+def convert_units(unit_type, from_unit, from_values, to_unit):
+    """Converts a sequence of values from from_unit to the given to_unit.
 
-    # an exception is raised if the to_unit is not valid
-    to_unit_name = unit_reg.get_name(to_unit)
-    to_unit_dimension = unit_reg.get_dimensionality(to_unit_name)
+    The conversion factor is resolved once, and applied to every value.
+    The results are rounded the same way as convert_unit does.
+
+    Parameters
+    ----------
+    unit_type: UNIT_TYPES_ENUM (required)
+        It  is a valid pint unit type
+    from_unit: str (required)
+        It is a valid pint unit to be converted from.
+    from_values: list or numpy.ndarray (required)
+        numbers corresponding to the from_unit to be converted from.
+    to_unit : str (required)
+        It is a valid pint unit to be converted to.
 
-    if to_unit_dimension != UnitsContainer({"[" + unit_type.name + "]": 1}):
+    Returns
+    -------
+    list or numpy.ndarray:
+        the converted values in the order given.  A numpy array is returned
+        when a numpy array is given.
+    """
+
+    if not unit_type:
+        raise IllegalArgumentException("unit_type is required.")
+
+    if not isinstance(unit_type, UNIT_TYPES_ENUM):
+        raise IllegalArgumentException("unit_type is not UNIT_TYPES_ENUM.")
+
+    if is_blank(from_unit):
+        raise IllegalArgumentException("from_unit is required.")
+
+    if from_values is None or len(from_values) == 0:
+        raise IllegalArgumentException("from_values is required.")
+
+    if is_blank(to_unit):
+        raise IllegalArgumentException("to_unit is required.")
+
+    (from_unit_name, to_unit_name, scale, offset) = _conversion_factor(
+        unit_type, from_unit, to_unit)
+
+    logging.debug("converting [{0}] values from [{1}] to [{2}]"
+                  .format(len(from_values), from_unit_name, to_unit_name))
+
+    if numpy is not None and isinstance(from_values, numpy.ndarray):
+        try:
+            values = from_values.astype(float)
+        except ValueError as err:
+            raise IllegalArgumentException("from_values are not numbers: {0}"
+                                           .format(err))
+
+        result = values * scale + offset
+
+        # restrict results to 2 decimal places, unless rounding gives 0.
+        rounded = numpy.round(result, 2)
+        return numpy.where(rounded == 0, result, rounded)
+
+    results = []
+
+    for from_value in from_values:
+        if not is_number(str(from_value)):
+            raise IllegalArgumentException("from_value [{0}] is not a number."
+                                           .format(from_value))
+
+        results.append(_round_result(float(from_value) * scale + offset))
+
+    return results
+
+
+
+def convert_values(unit_type, from_values, from_unit, to_unit):
+    """Validates and converts a sequence of values of the given unit type,
+    e.g., the values of a conversion API request.
+
+    Parameters
+    ----------
+    unit_type: UNIT_TYPES_ENUM (required)
+        It  is a valid pint unit type
+    from_values: list or numpy.ndarray (required)
+        numbers corresponding to the from_unit to be converted from.
+    from_unit: str (required)
+        a unit, or alias, of the unit_type to be converted from.
+    to_unit : str (required)
+        a unit, or alias, of the unit_type to be converted to.
+
+    Returns
+    -------
+    list or numpy.ndarray:
+        the converted values in the order given
+
+    Raises
+    ------
+    IllegalArgumentException if a parameter is not valid, or the units are
+    equal.
+    """
+    if from_values is None or len(from_values) == 0:
         raise IllegalArgumentException(
-            ("Parameter to_unit=[{0}] not valid. [{1}] unit required.")
-            .format(to_unit, unit_type.name))
+            "Parameter from_values not valid. "
+            "Numeric values must be provided.")
 
-    # an exception is raised if the from_unit is not valid
-    from_unit_name = unit_reg.get_name(from_unit)
-    from_unit_dimension = unit_reg.get_dimensionality(from_unit_name)
+    if is_blank(from_unit):
+        raise IllegalArgumentException(
+            ("Parameter from_unit=[{0}] not valid. A unit be provided.")
+            .format(from_unit))
 
-    if from_unit_dimension != UnitsContainer({"[" + unit_type.name + "]": 1}):
+    if is_blank(to_unit):
         raise IllegalArgumentException(
-            ("Parameter from_unit=[{0}] not valid. [{1}] unit required.")
-            .format(from_unit, unit_type.name))
+            ("Parameter to_unit=[{0}] not valid. A unit be provided.")
+            .format(to_unit))
 
-    logging.debug("converting [{0} {1}] to [{2}]"
-                  .format(from_value, from_unit_name, to_unit_name))
+    from_unit = resolve_unit(from_unit, unit_type)
+    to_unit = resolve_unit(to_unit, unit_type)
 
-    from_value_float = float(from_value)
-    from_value_quantity = from_value_float * unit_reg(from_unit_name)
+    if from_unit == to_unit:
+        raise IllegalArgumentException(
+            ("from_unit=[{0}] and to_unit=[{1}] units cannot be equal")
+            .format(from_unit, to_unit))
 
-    to_value_quantity = from_value_quantity.to(unit_reg(to_unit_name))
+    return convert_units(unit_type, from_unit, from_values, to_unit)
 
-    result = to_value_quantity.magnitude
-    decimals = decimal_places(to_value_quantity.magnitude)
 
-    final_result = result
-    # restrict results to 2 decimal places.
-    if(decimals > 2):
-        final_result = round(result, 2)
 
-    if final_result == 0:
-        # do not return 0 (zero) when rounding gives 0 value.
-        final_result = result
+def utc_to_epoch_ms(utc):
+    """ Converts the given UTC timestamp to milliseconds since the epoch.
 
-    logging.debug("input [{0} {1}] result [{2} {3}]"
-                  .format(from_value, from_unit_name, result, to_unit_name))
+    Parameters
+    ----------
+    utc: str or number (required)
+        an ISO8601 UTC timestamp, or a number of milliseconds since the
+        epoch which is returned unchanged.
 
-    return final_result
+    Returns
+    -------
+    int:
+        the number of milliseconds since 1970-01-01T00:00:00+00:00
+
+    Raises
+    ------
+    IllegalArgumentException if utc is not a valid timestamp.
+    """
+    if isinstance(utc, (int, float)) and not isinstance(utc, bool):
+        return int(utc)
+
+    if is_blank(utc):
+        raise IllegalArgumentException("utc is required.")
+
+    try:
+        utc_arrow = arrow.get(utc)
+    except (ValueError, TypeError, arrow.parser.ParserError) as err:
+        raise IllegalArgumentException("utc [{0}] is not a valid timestamp: "
+                                       "[{1}]".format(utc, err))
+
+    return int(round(utc_arrow.float_timestamp * 1000))
+
+
+
+def utc_to_iso(utc):
+    """ Converts the given UTC timestamp to the ISO8601 text format used to
+    store and compare timestamps (e.g., 2001-07-09T00:00:01.105000+00:00).
+
+    ISO8601 text timestamps are compared as text, which only matches their
+    chronological order when they are all in this same format.
+
+    Parameters
+    ----------
+    utc: str (required)
+        an ISO8601 timestamp, in any format supported by arrow
+
+    Returns
+    -------
+    str:
+        the ISO8601 UTC timestamp.
+
+    Raises
+    ------
+    IllegalArgumentException if utc is not a valid timestamp.
+    """
+    if is_blank(utc):
+        raise IllegalArgumentException("utc is required.")
+
+    try:
+        utc_arrow = arrow.get(utc)
+    except (ValueError, TypeError, arrow.parser.ParserError) as err:
+        raise IllegalArgumentException("utc [{0}] is not a valid timestamp: "
+                                       "[{1}]".format(utc, err))
+
+    return str(utc_arrow.to("UTC"))
+
+
+
+def epoch_ms_to_utc(epoch_ms):
+    """ Converts the given milliseconds since the epoch to an ISO8601 UTC
+    timestamp.
+
+    Parameters
+    ----------
+    epoch_ms: number (required)
+        the number of milliseconds since 1970-01-01T00:00:00+00:00
+
+    Returns
+    -------
+    str:
+        ISO8601 UTC timestamp (e.g., 2001-07-09T00:00:01.105000+00:00)
+    """
+    return str(arrow.get(epoch_ms / 1000.0))
+
+
+
+def resolution_to_seconds(resolution):
+    """ Converts the given time resolution (e.g., 5m, 1h, 1d) to seconds.
+
+    Parameters
+    ----------
+    resolution: str (required)
+        a positive number followed by one of the units: s(econds),
+        m(inutes), h(ours), d(ays) or w(eeks)
+
+    Returns
+    -------
+    int:
+        the number of seconds in the resolution
+
+    Raises
+    ------
+    IllegalArgumentException if resolution is not valid.
+    """
+    if is_blank(resolution):
+        raise IllegalArgumentException("resolution is required.")
+
+    match = RESOLUTION_PATTERN.match(resolution)
+
+    if match is None:
+        raise IllegalArgumentException(
+            "resolution [{0}] is not valid. Use a number followed by "
+            "s, m, h, d or w (e.g., 5m, 1h, 1d).".format(resolution))
+
+    seconds = (int(match.group(1)) *
+               RESOLUTION_UNIT_SECONDS[match.group(2).lower()])
+
+    if seconds <= 0:
+        raise IllegalArgumentException("resolution [{0}] must be greater "
+                                       "than zero.".format(resolution))
+
+    return seconds
 
 
 
@@ -274,7 +721,7 @@ def write_to_file(msg, fileToWrite):
     if not hasattr(fileToWrite, "read"):
         raise IllegalArgumentException("fileToWrite is not a file object.")
 
-    is_debug = ini_config.getboolean("Flask", "DEBUG")
+    is_debug = get_settings().flask.debug
     if is_debug:
         for attr in dir(fileToWrite):
             try:
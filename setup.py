@@ -40,8 +40,9 @@ setup(
       "requests>=2.6.0",
       "sure>=1.2.9",
       "validate_email>=1.2",
-      "Flask>=0.10.1",
-      "Flask-RESTful>=0.3.2",
+      "Flask>=2.2",
+      "Werkzeug>=2.2",
+      "Flask-RESTful>=0.3.10",
       "Pint>=0.6",
       "python-daemon>=2.0.5",
       "w1thermsensor>=0.2.1",
@@ -53,5 +54,9 @@ setup(
 # ATTENTION: the RPi.GPIO should only be installed on the Raspberry Pi
 #      "RPi.GPIO>=0.5.11"
     ],
+    ## optional faster JSON serialization of the responses
+    extras_require={
+      "fastjson": ["orjson>=3.0", "ujson>=5.4"]
+    },
     keywords="flask flask-restful REST RESTful APIs"
  )
@@ -1 +1 @@
-__all__ = ["dao", "config", "domain", "mqtt", "utils"]
+__all__ = ["dao", "config", "domain", "http", "mqtt", "sensorcollector", "utils"]
@@ -6,7 +6,11 @@ import logging
 import os
 import unittest
 
-from rgapps.config import ini_config
+from six.moves import configparser
+
+from rgapps.config import ini_config, ini_file, get_settings, reload_settings
+from rgapps.config.settings import build_settings
+from rgapps.utils.exception import ConfigurationException
 
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
@@ -38,3 +42,44 @@ class ConfigTestCase(unittest.TestCase):
                       .format(ConfigTestCase.LOG_FILE_PATH))
         return
 
+    def test_settings(self):
+        settings = get_settings()
+        self.assertIs(settings, get_settings())
+        self.assertEqual(ini_config.getboolean("Flask", "TESTING"),
+                         settings.flask.testing)
+        self.assertEqual(ini_config.getint("DAO", "READINGS_BATCH_SIZE"),
+                         settings.dao.readings_batch_size)
+        self.assertEqual(ini_config.get("SqlLite", "SQLITE_DB"),
+                         settings.sqlite.sqlite_db)
+        self.assertIn("TEMPERATURE", settings.rest.restful_apis)
+
+        with self.assertRaises(AttributeError):
+            settings.flask.testing = False
+        return
+
+    def test_build_settings_invalid(self):
+        parser = configparser.SafeConfigParser()
+        parser.read(ini_file)
+        self.assertEqual(get_settings(), build_settings(parser))
+
+        parser.set("DAO", "READINGS_BATCH_SIZE", "many")
+        with self.assertRaises(ConfigurationException):
+            build_settings(parser)
+
+        parser.remove_option("DAO", "READINGS_BATCH_SIZE")
+        self.assertEqual(500, build_settings(parser).dao.readings_batch_size)
+
+        parser.remove_option("SqlLite", "SQLITE_DB")
+        with self.assertRaises(ConfigurationException):
+            build_settings(parser)
+        return
+
+    def test_reload_settings(self):
+        # the options no longer in the INI file do not survive a reload
+        ini_config.set("Email", "STALE_OPTION", "stale")
+        settings = reload_settings()
+        self.assertFalse(ini_config.has_option("Email", "STALE_OPTION"))
+        self.assertIs(settings, get_settings())
+        self.assertTrue(ini_config.has_option("Email", "RECIPIENT_EMAIL"))
+        return
+
@@ -1 +1 @@
-__all__ = ["sensordao"]
+__all__ = ["sensordao", "sqlitedb", "sqlitemigrations"]
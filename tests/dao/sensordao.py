@@ -9,6 +9,7 @@ import unittest
 
 from rgapps.config import ini_config
 from rgapps.dao.sensordao import SensorDAO
+from rgapps.utils.exception import IllegalArgumentException
 
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
@@ -62,8 +63,86 @@ class DaoTestCase(unittest.TestCase):
         self.assertIsNotNone(info)
         return
 
+    def test_exists(self):
+        logging.debug("testing sensor exists")
+        self.assertTrue(DaoTestCase.sensor_db.exists(SERIAL))
+        self.assertFalse(DaoTestCase.sensor_db.exists("UNKNOWN"))
+        self.assertTrue(SensorDAO.SENSOR_DB.exists(SERIAL))
+        self.assertFalse(SensorDAO.SENSOR_DB.exists("UNKNOWN"))
+        return
+
+    def test_get_sensor_cache(self):
+        logging.debug("testing sensor get_sensor cache")
+        stats = SensorDAO.sensor_cache_stats()
+        if stats is None:
+            return
+        DaoTestCase.sensor_db.get_sensor(SERIAL)
+        DaoTestCase.sensor_db.get_sensor(SERIAL)
+        self.assertGreater(SensorDAO.sensor_cache_stats()["hits"],
+                           stats["hits"])
+        self.assertIsNone(DaoTestCase.sensor_db.get_sensor("UNKNOWN"))
+        self.assertIsNone(DaoTestCase.sensor_db.get_sensor("UNKNOWN"))
+        DaoTestCase.sensor_db.del_sensor(SERIAL)
+        self.assertIsNone(DaoTestCase.sensor_db.get_sensor(SERIAL))
+        return
+
     def test_get_readings(self):
         logging.debug("testing sensor get_readings")
         readings = DaoTestCase.sensor_db.get_readings(SERIAL, "last3Days")
         self.assertIsNotNone(readings)
         return
+
+    def test_get_readings_range(self):
+        logging.debug("testing sensor get_readings with a from/to range")
+        readings = DaoTestCase.sensor_db.get_readings(SERIAL, None,
+                                                      from_utc="0")
+        self.assertGreaterEqual(len(readings), 1)
+        readings = DaoTestCase.sensor_db.get_readings(SERIAL, None,
+                                                      resolution="1d",
+                                                      from_utc="0")
+        self.assertEqual(len(readings), 1)
+        readings = DaoTestCase.sensor_db.get_readings(SERIAL, None,
+                                                      from_utc=0, to_utc=1000)
+        self.assertEqual(len(readings), 0)
+        self.assertRaises(IllegalArgumentException,
+                          DaoTestCase.sensor_db.get_readings,
+                          SERIAL, "lastDay", from_utc=0)
+        return
+
+    def test_add_readings(self):
+        logging.debug("testing sensor add_readings")
+        utc = str(datetime.utcnow())
+        readings = [{"unit": "Celsius", "value": 50, "utc": utc,
+                     "serial": SERIAL},
+                    {"unit": "Celsius", "value": 60, "utc": utc,
+                     "serial": "NOT_REGISTERED"},
+                    {"unit": "Celsius", "value": 70, "utc": utc,
+                     "serial": SERIAL},
+                    {"unit": "Celsius", "value": 0.0, "utc": utc,
+                     "serial": SERIAL}]
+        result = DaoTestCase.sensor_db.add_readings(readings, batch_size=1)
+        self.assertEqual(result["inserted"], 3)
+        self.assertEqual(len(result["failed"]), 1)
+        self.assertEqual(result["failed"][0]["index"], 1)
+        return
+
+    def test_get_rollup_readings(self):
+        logging.debug("testing sensor get_readings from the rollups")
+        readings = DaoTestCase.sensor_db.get_readings(SERIAL, "lastDay",
+                                                      "1h", "count")
+        self.assertEqual(sum(reading["value"] for reading in readings), 4)
+        readings = DaoTestCase.sensor_db.get_readings(SERIAL, "lastDay",
+                                                      "1d", "max")
+        self.assertEqual(readings[-1]["value"], 40)
+        return
+
+    def test_get_readings_page(self):
+        logging.debug("testing sensor get_readings_page")
+        page = DaoTestCase.sensor_db.get_readings_page(SERIAL, "last3Days", 3)
+        self.assertEqual(len(page["readings"]), 3)
+        self.assertIsNotNone(page["next_cursor"])
+        page = DaoTestCase.sensor_db.get_readings_page(SERIAL, "last3Days", 3,
+                                                       page["next_cursor"])
+        self.assertEqual(len(page["readings"]), 1)
+        self.assertIsNone(page["next_cursor"])
+        return
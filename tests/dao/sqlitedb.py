@@ -0,0 +1,75 @@
+"""rgapps.tests.dao.sqlitedb module
+
+Unit test for rgapps.dao.sqlitedb module
+"""
+import logging
+import os
+import threading
+import unittest
+
+from rgapps.config import ini_config
+from rgapps.dao.sqlitedb import SQLiteDB
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+
+class SQLiteDBTestCase(unittest.TestCase):
+
+    LOG_FILE_PATH = ini_config.get("Logging","LOG_FILE")
+
+    def setUp(self):
+        return
+
+    def tearDown(self):
+        SQLiteDB.close()
+        handlers = logging.getLogger().handlers[:]
+        for handler in handlers:
+            handler.close()
+            logging.getLogger().removeHandler(handler)
+        if os.path.isfile(SQLiteDBTestCase.LOG_FILE_PATH):
+            os.remove(SQLiteDBTestCase.LOG_FILE_PATH)
+        return
+
+    def test_connection_reused(self):
+        logging.debug("testing SQLiteDB connection reuse")
+        conn = SQLiteDB.connection()
+        self.assertIs(conn, SQLiteDB.connection())
+        return
+
+    def test_connection_per_thread(self):
+        logging.debug("testing SQLiteDB connection per thread")
+        conn = SQLiteDB.connection()
+        other = []
+        thread = threading.Thread(
+            target=lambda: other.append(SQLiteDB.connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(conn, other[0])
+        return
+
+    def test_connection_closed_with_thread(self):
+        logging.debug("testing SQLiteDB connections of exited threads")
+        SQLiteDB.connection()
+        count = len(SQLiteDB._connections)
+        threads = [threading.Thread(target=SQLiteDB.connection)
+                   for _ in range(50)]
+        for thread in threads:
+            thread.start()
+            thread.join()
+        self.assertEqual(len(SQLiteDB._connections), count)
+        return
+
+    def test_journal_mode(self):
+        logging.debug("testing SQLiteDB journal mode")
+        conn = SQLiteDB.connection()
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.upper(),
+                         ini_config.get("SqlLite",
+                                        "SQLITE_JOURNAL_MODE").upper())
+        return
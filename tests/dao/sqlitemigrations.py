@@ -0,0 +1,45 @@
+"""rgapps.tests.dao.sqlitemigrations module
+
+Unit test for rgapps.dao.sqlitemigrations module
+"""
+import logging
+import os
+import unittest
+
+from rgapps.config import ini_config
+from rgapps.dao.sqlitedb import SQLiteDB
+from rgapps.dao.sqlitemigrations import SQLiteMigrations
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+
+class SQLiteMigrationsTestCase(unittest.TestCase):
+
+    LOG_FILE_PATH = ini_config.get("Logging","LOG_FILE")
+
+    def setUp(self):
+        return
+
+    def tearDown(self):
+        handlers = logging.getLogger().handlers[:]
+        for handler in handlers:
+            handler.close()
+            logging.getLogger().removeHandler(handler)
+        if os.path.isfile(SQLiteMigrationsTestCase.LOG_FILE_PATH):
+            os.remove(SQLiteMigrationsTestCase.LOG_FILE_PATH)
+        return
+
+    def test_migrate(self):
+        logging.debug("testing SQLite schema migration")
+        conn = SQLiteDB.connection()
+        version = SQLiteMigrations.migrate(conn)
+        self.assertEqual(version, SQLiteMigrations.latest_version())
+        # migrating an up to date database is a no-op
+        self.assertEqual(SQLiteMigrations.migrate(conn), version)
+        return
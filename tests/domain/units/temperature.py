@@ -8,6 +8,7 @@ import unittest
 
 from rgapps.config import ini_config
 from rgapps.domain.units.temperature import Temperature
+from rgapps.utils.exception import IllegalArgumentException
 
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
@@ -38,5 +39,27 @@ class TemperatureUnitTestCase(unittest.TestCase):
         logging.debug("testing temperature convert")
         result = Temperature.convert(18, "degC", "degF")
         self.assertIsNotNone(result)
+        self.assertEqual(Temperature.convert(0.0, "degC", "degF"), 32.0)
+        return
+
+
+    def test_temperature_convert_many(self):
+        logging.debug("testing temperature convert many")
+        result = Temperature.convert_many([0, "100", 37.5], "degC", "degF")
+        self.assertEqual(result, [32.0, 212.0, 99.5])
+        return
+
+
+    def test_temperature_convert_readings(self):
+        logging.debug("testing temperature convert readings")
+        readings = [{"unit": "degC", "value": 100},
+                    {"unit": "degF", "value": 50},
+                    {"unit": "degC", "value": 0}]
+        result = list(Temperature.convert_readings(readings, "degf"))
+        self.assertEqual([(r["value"], r["unit"]) for r in result],
+                         [(212.0, "degF"), (50, "degF"), (32.0, "degF")])
+        self.assertRaises(IllegalArgumentException,
+                          Temperature.convert_readings,
+                          readings, "meter")
         return
 
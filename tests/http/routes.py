@@ -0,0 +1,112 @@
+"""rgapps.tests.http.routes module
+
+Unit test for rgapps.http.routes module
+"""
+import os
+import subprocess
+import sys
+import unittest
+
+from rgapps.appfactory import create_app, post_fork
+from rgapps.config import get_settings
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+
+class RoutesTestCase(unittest.TestCase):
+
+    # cumulative time budget, in microseconds, to import the routes
+    IMPORT_TIME_BUDGET_US = 2000000
+
+    # libraries only imported when the resources using them are set up
+    LAZY_IMPORTS = ("bs4", "pymongo", "w1thermsensor", "pint", "pip",
+                    "pkg_resources")
+
+    def setUp(self):
+        return
+
+    def tearDown(self):
+        return
+
+    def test_import_time(self):
+        """ Imports the routes in a new interpreter run with -X importtime,
+        whose report lists every module imported with its self and
+        cumulative times, children before their parent.
+        """
+        process = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                                  "import rgapps.http.routes"],
+                                 stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE,
+                                 env=os.environ.copy(),
+                                 universal_newlines=True)
+        self.assertEqual(process.returncode, 0, process.stderr)
+
+        # (indentation, module, cumulative us) of the report lines
+        imports = []
+        for line in process.stderr.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            (_, cumulative, module) = line.split("|")
+            name = module.strip()
+            imports.append((len(module) - len(name) - 1, name,
+                            int(cumulative)))
+
+        # the modules imported by the routes are listed before it, up to
+        # the previous top level import
+        names = [name for (_, name, _) in imports]
+        end = names.index("rgapps.http.routes")
+        start = end
+        while start > 0 and imports[start - 1][0] > 0:
+            start -= 1
+
+        imported = set(name.split(".")[0] for name in names[start:end])
+        for library in RoutesTestCase.LAZY_IMPORTS:
+            self.assertNotIn(library, imported)
+
+        self.assertLessEqual(imports[end][2],
+                             RoutesTestCase.IMPORT_TIME_BUDGET_US)
+        return
+
+    def test_create_app(self):
+        # the factory can build several apps in the same process
+        for _ in range(2):
+            app = create_app(get_settings())
+            client = app.test_client()
+            client.environ_base["HTTP_ACCEPT"] = "application/json"
+
+            response = client.get("/length/km?from_value=1&from_unit=mile")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["data"]["to_value"], 1.61)
+
+            response = client.get("/length/km", headers={"Accept":
+                                                         "text/html"})
+            self.assertEqual(response.status_code, 406)
+
+        # the per-process state is reset as in a forked worker
+        post_fork()
+        response = client.get("/information/sensors/NOT-A-SENSOR")
+        self.assertEqual(response.status_code, 404)
+        return
+
+    def test_create_app_settings(self):
+        # every app is configured by its own settings
+        settings = get_settings()
+        clients = []
+        for min_size in (1, 0):
+            rest = settings.rest._replace(compression_min_size=min_size)
+            app = create_app(settings._replace(rest=rest))
+            clients.append(app.test_client())
+
+        headers = {"Accept": "application/json", "Accept-Encoding": "gzip"}
+        encodings = [client.get("/length/km?from_value=1&from_unit=mile",
+                                headers=headers)
+                     .headers.get("Content-Encoding")
+                     for client in clients]
+        self.assertEqual(encodings, ["gzip", None])
+        return
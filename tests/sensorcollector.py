@@ -0,0 +1,154 @@
+"""rgapps.tests.sensorcollector module
+
+Unit test for rgapps.sensorcollector module
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+from unittest import mock
+
+from requests.exceptions import ConnectionError
+
+from rgapps.config import get_settings
+from rgapps.dao.sensordao import SensorDAO
+from rgapps.domain.myemail import EMail
+from rgapps.sensorcollector import (SensorCollector, SensorEndpoint,
+                                    parse_endpoints)
+from rgapps.utils.exception import ConfigurationException
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+
+class StubResponse:
+    """ A requests response with a JSON sensor reading.
+    """
+
+    status_code = 200
+    text = ""
+
+    def __init__(self, serial):
+        self.serial = serial
+
+    def json(self):
+        return {"sensor": {"serial": self.serial},
+                "data": {"unit": "degC", "value": 20.5,
+                         "utc": "2015-06-01T12:00:00+00:00"}}
+
+
+class SensorCollectorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        settings = get_settings()
+        sensor = settings.sensor._replace(sensor_write_batch_size=2,
+                                          sensor_write_interval=1,
+                                          sensor_max_concurrency=2)
+        self.settings = settings._replace(sensor=sensor)
+        self.endpoint = SensorEndpoint("28-0000", "http://localhost/sensors/",
+                                       60)
+        self.collector = SensorCollector([self.endpoint], self.settings)
+        self.emails = []
+        self.patch = mock.patch.object(
+            EMail, "send_email",
+            lambda recipient, subject, message: self.emails.append(subject))
+        self.patch.start()
+        return
+
+    def tearDown(self):
+        self.patch.stop()
+        self.collector.session.close()
+        return
+
+    def test_parse_endpoints(self):
+        endpoints = parse_endpoints("28-0001 http://a/sensors 30\n\n"
+                                    "  28-0002 http://b/sensors/  \n", 900)
+        self.assertEqual([(e.serial, e.url, e.interval) for e in endpoints],
+                         [("28-0001", "http://a/sensors/28-0001", 30),
+                          ("28-0002", "http://b/sensors/28-0002", 900)])
+        self.assertEqual(parse_endpoints("", 900), [])
+
+        for text in ("28-0001", "28-0001 http://a 30 40",
+                     "28-0001 http://a 0", "28-0001 http://a often"):
+            with self.assertRaises(ConfigurationException):
+                parse_endpoints(text, 900)
+
+    def test_fetch_alert_once(self):
+        session = self.collector.session
+
+        with mock.patch.object(session, "get",
+                               side_effect=ConnectionError("down")):
+            self.assertIsNone(self.collector.fetch(self.endpoint))
+            self.assertIsNone(self.collector.fetch(self.endpoint))
+        self.assertEqual(self.emails,
+                         ["sensorserver: Connection/Timeout Error"])
+
+        # the flag is only reset once the reading is stored
+        with mock.patch.object(session, "get",
+                               return_value=StubResponse("28-0000")):
+            reading = self.collector.fetch(self.endpoint)
+        self.assertEqual(reading["serial"], "28-0000")
+        self.assertEqual(reading["value"], 20.5)
+        self.assertTrue(self.endpoint.error_flag)
+
+        with mock.patch.object(SensorDAO, "add_readings",
+                               return_value={"inserted": 1, "failed": []}):
+            self.collector.write([(self.endpoint, reading)])
+        self.assertFalse(self.endpoint.error_flag)
+
+    def test_write_alert_once(self):
+        other = SensorEndpoint("28-0001", "http://localhost/sensors", 60)
+        reading = {"unit": "degC", "value": 20.5,
+                   "utc": "2015-06-01T12:00:00+00:00", "serial": "28-0000"}
+        entries = [(self.endpoint, reading), (other, reading)]
+
+        # a failed reading only alerts about its own endpoint
+        failed = {"inserted": 1, "failed": [{"index": 0, "reading": reading,
+                                             "error": "locked"}]}
+        with mock.patch.object(SensorDAO, "add_readings",
+                               return_value=failed):
+            self.collector.write(entries)
+            self.collector.write(entries)
+        self.assertEqual(self.emails, ["sensorserver: Environment Error"])
+        self.assertTrue(self.endpoint.error_flag)
+        self.assertFalse(other.error_flag)
+
+        # a database error alerts about every endpoint of the batch
+        with mock.patch.object(SensorDAO, "add_readings",
+                               side_effect=Exception("database is locked")):
+            self.collector.write(entries)
+        self.assertEqual(len(self.emails), 2)
+        self.assertTrue(other.error_flag)
+
+    def test_write_batches(self):
+        batches = []
+        self.collector.write = lambda entries: batches.append(len(entries))
+
+        async def run():
+            queue = asyncio.Queue()
+            with ThreadPoolExecutor(1) as executor:
+                writer = asyncio.ensure_future(
+                    self.collector._write(queue, executor))
+                for _ in range(3):
+                    await queue.put((self.endpoint, {}))
+                # a full batch is written at once, and the last reading
+                # after the write interval
+                await asyncio.sleep(0.1)
+                self.assertEqual(batches, [2])
+                await asyncio.sleep(1.1)
+                self.assertEqual(batches, [2, 1])
+                # the queued readings are written on cancel
+                await queue.put((self.endpoint, {}))
+                writer.cancel()
+                await asyncio.gather(writer, return_exceptions=True)
+
+        asyncio.run(run())
+        self.assertEqual(batches, [2, 1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
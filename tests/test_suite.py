@@ -8,6 +8,8 @@ import unittest
 
 from tests.config.config import ConfigTestCase
 from tests.dao.sensordao import DaoTestCase
+from tests.dao.sqlitedb import SQLiteDBTestCase
+from tests.dao.sqlitemigrations import SQLiteMigrationsTestCase
 from tests.domain.ds18b20sensor import DS18B20SensorTestCase
 from tests.domain.myemail import MyEmailTestCase
 from tests.domain.sensor import SensorTestCase
@@ -15,7 +17,11 @@ from tests.domain.sms import SMSTestCase
 from tests.domain.units.length import LengthUnitTestCase
 from tests.domain.units.temperature import TemperatureUnitTestCase
 from tests.domain.units.weight import WeightUnitTestCase
+from tests.http.routes import RoutesTestCase
+from tests.sensorcollector import SensorCollectorTestCase
+from tests.utils.cache import CacheTestCase
 from tests.utils.enums import EnumsTestCase
+from tests.utils.utility import UtilityTestCase
 
 
 __author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
@@ -29,6 +35,8 @@ def suite():
     suite = unittest.TestSuite()
     suite.addTest(unittest.makeSuite(ConfigTestCase))
     suite.addTest(unittest.makeSuite(DaoTestCase))
+    suite.addTest(unittest.makeSuite(SQLiteDBTestCase))
+    suite.addTest(unittest.makeSuite(SQLiteMigrationsTestCase))
     suite.addTest(unittest.makeSuite(LengthUnitTestCase))
     suite.addTest(unittest.makeSuite(TemperatureUnitTestCase))
     suite.addTest(unittest.makeSuite(WeightUnitTestCase))
@@ -36,7 +44,11 @@ def suite():
     suite.addTest(unittest.makeSuite(MyEmailTestCase))
     suite.addTest(unittest.makeSuite(SensorTestCase))
     suite.addTest(unittest.makeSuite(SMSTestCase))
+    suite.addTest(unittest.makeSuite(RoutesTestCase))
+    suite.addTest(unittest.makeSuite(SensorCollectorTestCase))
+    suite.addTest(unittest.makeSuite(CacheTestCase))
     suite.addTest(unittest.makeSuite(EnumsTestCase))
+    suite.addTest(unittest.makeSuite(UtilityTestCase))
 #    suite.addTest(MQTTTestCase())
     return suite
 
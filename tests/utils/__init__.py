@@ -1 +1 @@
-__all__ = ["enums"]
+__all__ = ["cache", "enums", "utility"]
@@ -0,0 +1,52 @@
+"""rgapps.tests.utils.cache module
+
+Unit test for rgapps.utils.cache module
+"""
+import time
+import unittest
+
+from rgapps.utils.cache import LRUCache
+from rgapps.utils.exception import IllegalArgumentException
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+
+class CacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        return
+
+    def tearDown(self):
+        return
+
+    def test_lru_cache(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        # "b" is the least recently used
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertEqual(cache.invalidate(lambda key, value: value > 2), 1)
+        self.assertNotIn("c", cache)
+        self.assertIn("a", cache)
+        self.assertRaises(IllegalArgumentException, LRUCache, 0)
+        return
+
+    def test_lru_cache_ttl(self):
+        cache = LRUCache(2, ttl=0.01)
+        cache.put("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+        return
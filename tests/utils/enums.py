@@ -4,7 +4,8 @@ Unit test for rgapps.utils.enums module
 """
 import unittest
 
-from rgapps.utils.enums import TEMPERATURE_ENUM, DURATION_ENUM
+from rgapps.utils.enums import TEMPERATURE_ENUM, DURATION_ENUM, \
+    AGGREGATE_ENUM
 from rgapps.utils.exception import IllegalArgumentException
 
 
@@ -35,7 +36,12 @@ class EnumsTestCase(unittest.TestCase):
     def test_duration_enum(self):
         status = DURATION_ENUM.is_valid("vasco")
         self.assertFalse(status)
+        self.assertTrue(DURATION_ENUM.is_valid(" LAST90DAYS "))
+        self.assertEqual(DURATION_ENUM.shift("last6Months"), {"months": -6})
+        self.assertIsNone(DURATION_ENUM.shift(None))
         return
 
-
-
+    def test_aggregate_enum(self):
+        self.assertTrue(AGGREGATE_ENUM.is_valid("AVG"))
+        self.assertFalse(AGGREGATE_ENUM.is_valid("vasco"))
+        return
@@ -0,0 +1,94 @@
+"""rgapps.tests.utils.utility module
+
+Unit test for rgapps.utils.utility module
+"""
+import unittest
+
+from rgapps.utils.enums import UNIT_TYPES_ENUM
+from rgapps.utils.exception import IllegalArgumentException
+from rgapps.utils.utility import utc_to_epoch_ms, epoch_ms_to_utc, \
+    resolution_to_seconds, convert_unit, get_unit_registry, resolve_unit, \
+    convert_values
+
+
+__author__ = "Rubens S. Gomes <rubens.s.gomes@gmail.com>"
+__copyright__ = "Copyright (c) 2015 Rubens S. Gomes"
+__license__ = "All Rights Reserved"
+__maintainer__ = "Rubens Gomes"
+__email__ = "rubens.s.gomes@gmail.com"
+__status__ = "Experimental"
+
+
+class UtilityTestCase(unittest.TestCase):
+
+    def setUp(self):
+        return
+
+    def tearDown(self):
+        return
+
+    def test_epoch_utc(self):
+        utc = "2001-07-09T00:00:01.105000+00:00"
+        epoch_ms = utc_to_epoch_ms(utc)
+        self.assertEqual(epoch_ms, 994636801105)
+        self.assertEqual(epoch_ms_to_utc(epoch_ms), utc)
+        self.assertEqual(utc_to_epoch_ms(epoch_ms), epoch_ms)
+        self.assertRaises(IllegalArgumentException,
+                          utc_to_epoch_ms,
+                          "vasco")
+        return
+
+    def test_resolution_to_seconds(self):
+        self.assertEqual(resolution_to_seconds("5m"), 300)
+        self.assertEqual(resolution_to_seconds("1H"), 3600)
+        self.assertEqual(resolution_to_seconds("1d"), 86400)
+        self.assertRaises(IllegalArgumentException,
+                          resolution_to_seconds,
+                          "0h")
+        self.assertRaises(IllegalArgumentException,
+                          resolution_to_seconds,
+                          "vasco")
+        return
+
+
+    def test_convert_unit(self):
+        self.assertIs(get_unit_registry(), get_unit_registry())
+        self.assertEqual(convert_unit(UNIT_TYPES_ENUM.temperature,
+                                      "degC", 100, "degF"), 212.0)
+        self.assertEqual(convert_unit(UNIT_TYPES_ENUM.temperature,
+                                      "degF", "32", "degK"), 273.15)
+        self.assertEqual(convert_unit(UNIT_TYPES_ENUM.length,
+                                      "mile", 2, "km"), 3.22)
+        self.assertRaises(IllegalArgumentException,
+                          convert_unit,
+                          UNIT_TYPES_ENUM.length, "kg", 1, "km")
+        return
+
+
+    def test_convert_values(self):
+        self.assertEqual(convert_values(UNIT_TYPES_ENUM.temperature,
+                                        [0, "100"], "DEGC", "degf"),
+                         [32.0, 212.0])
+        self.assertRaises(IllegalArgumentException,
+                          convert_values,
+                          UNIT_TYPES_ENUM.length, [1], "km", "KM")
+        self.assertRaises(IllegalArgumentException,
+                          convert_values,
+                          UNIT_TYPES_ENUM.length, [], "km", "mile")
+        return
+
+
+    def test_resolve_unit(self):
+        self.assertEqual(resolve_unit("DEGC", UNIT_TYPES_ENUM.temperature),
+                         "degC")
+        self.assertEqual(resolve_unit(" Mile ", UNIT_TYPES_ENUM.length),
+                         "mile")
+        self.assertEqual(resolve_unit("mm", UNIT_TYPES_ENUM.length), "mm")
+        self.assertEqual(resolve_unit("KG", UNIT_TYPES_ENUM.mass), "kg")
+        self.assertRaises(IllegalArgumentException,
+                          resolve_unit,
+                          "kg", UNIT_TYPES_ENUM.length)
+        self.assertRaises(IllegalArgumentException,
+                          resolve_unit,
+                          "vasco", UNIT_TYPES_ENUM.length)
+        return